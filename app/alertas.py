@@ -0,0 +1,324 @@
+# Arquivo: solarys_api/app/alertas.py
+# Motor de alertas: pontua com o modelo de atraso as tarefas que mudaram desde a última
+# execução e grava em AlertasAI / SugestoesAI as que passam dos limiares de severidade.
+#
+# - Incremental: Tarefas.VersaoLinha (rowversion, sql/003_alertas.sql) muda a cada INSERT
+#   ou UPDATE; a maior versão já processada (a "marca") fica em MarcasProcessamento. Só
+#   as linhas abaixo de MIN_ACTIVE_ROWVERSION() são lidas, para não pular uma transação
+#   que pegou uma versão menor e ainda não fez commit.
+# - Em blocos: cada bloco de tarefas (em ordem de VersaoLinha) tem as features calculadas
+#   no SQL (mesma consulta de app/features.py), uma chamada vetorizada ao modelo e uma
+#   transação que avança a marca junto com os alertas. Uma falha desfaz o bloco e a marca
+#   não anda.
+# - Um alerta aberto por tarefa, com identidade estável: só é resolvido quando a tarefa é
+#   concluída ou cai abaixo dos limiares. Se ela continua em risco, o alerta aberto é
+#   atualizado no lugar (severidade, probabilidade, descrição, data) e as sugestões já
+#   aprovadas ou rejeitadas continuam nele; alerta e sugestão novos (em lote, por
+#   app/insercao.py) só para as tarefas sem alerta aberto.
+# - Exclusivo: o UPDATE na linha da marca no começo de cada bloco trava a linha até o
+#   commit, então dois processos (ou workers) nunca pontuam o mesmo bloco.
+
+import datetime
+import threading
+import time
+
+from . import features, metricas
+from .insercao import inserir_blocos
+from .listagem import ALERTAS, SUGESTOES
+
+# Nome da linha de MarcasProcessamento usada por este motor
+PROCESSO = "alertas_atraso"
+TIPO_ALERTA = "Risco de Atraso"
+STATUS_ABERTO = "Aberto"
+STATUS_RESOLVIDO = "Resolvido"
+
+# O SQL Server aceita no máximo 2100 parâmetros por comando (IN com os TarefaIDs do bloco)
+_MAX_PARAMETROS_IN = 1000
+
+SQL_TAREFAS_ALTERADAS = features.montar_sql_features(
+    "t.VersaoLinha > CAST(? AS BINARY(8)) AND t.VersaoLinha < MIN_ACTIVE_ROWVERSION()",
+    ordem="f.VersaoLinha OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY",
+    extras=(("t.ProjetoID", "ProjetoID"), ("t.VersaoLinha", "VersaoLinha"), ("", "Concluida")),
+)
+
+
+def limiares_severidade(alta: float, media: float) -> tuple:
+    """Pares (nível, probabilidade mínima), do mais severo para o menos severo."""
+    if not 0 <= media <= alta <= 1:
+        raise ValueError("Limiares inválidos: é preciso 0 <= média <= alta <= 1.")
+    return (("Alta", alta), ("Média", media))
+
+
+def classificar(probabilidade: float, limiares: tuple) -> str | None:
+    for nivel, minimo in limiares:
+        if probabilidade >= minimo:
+            return nivel
+    return None
+
+
+def sugerir(dados: dict) -> str:
+    """Sugestão de ação a partir das features que mais pesam no risco da tarefa."""
+    if dados["DiferencaDuracao"] > 0:
+        return (f"A tarefa já passou {dados['DiferencaDuracao']} dia(s) da duração prevista: "
+                "reavaliar o prazo final e reforçar a equipe alocada.")
+    if dados["DuracaoPrevista"] <= 7:
+        return (f"Prazo de {dados['DuracaoPrevista']} dia(s) é curto para o risco estimado: "
+                "incluir folga no cronograma ou antecipar o início.")
+    return "Revisar dependências, materiais e equipe antes do início previsto para reduzir o risco de atraso."
+
+
+def montar_alertas(linhas: list, colunas: list, probabilidades: list, limiares: tuple, versao: str, agora: datetime.datetime) -> tuple:
+    """(alertas, sugestões) como dicts com as colunas de AlertasAI / SugestoesAI (sem os IDs)."""
+    alertas, sugestoes = [], []
+    for linha, probabilidade in zip(linhas, probabilidades):
+        nivel = classificar(probabilidade, limiares)
+        if nivel is None:
+            continue
+        dados = dict(zip(colunas, linha))
+        alertas.append({
+            "ProjetoID": dados["ProjetoID"],
+            "TarefaID": dados["TarefaID"],
+            "TipoAlerta": TIPO_ALERTA,
+            "DescricaoAlerta": f"Tarefa {dados['TarefaID']}: probabilidade de atraso de {probabilidade:.0%} (modelo {versao}).",
+            "NivelSeveridade": nivel,
+            "Status": STATUS_ABERTO,
+            "ProbabilidadeAtraso": probabilidade,
+            "DataGeracao": agora,
+        })
+        sugestoes.append({
+            "DescricaoSugestao": sugerir(dados),
+            "ImpactoEstimado": "Alto" if nivel == "Alta" else "Médio",
+            "StatusAprovacao": "Pendente",
+        })
+    return alertas, sugestoes
+
+
+def _travar_marca(cursor, agora: datetime.datetime) -> int:
+    """Trava a linha da marca até o fim da transação e devolve a última versão processada."""
+    cursor.execute("UPDATE MarcasProcessamento SET AtualizadoEm = ? WHERE Processo = ?", agora, PROCESSO)
+    if cursor.rowcount == 0:
+        cursor.execute("INSERT INTO MarcasProcessamento (Processo, Marca, AtualizadoEm) VALUES (?, 0, ?)", PROCESSO, agora)
+    cursor.execute("SELECT Marca FROM MarcasProcessamento WHERE Processo = ?", PROCESSO)
+    return cursor.fetchone()[0]
+
+
+def _alertas_abertos(cursor, tarefa_ids: list) -> dict:
+    """{TarefaID: AlertaID} do alerta aberto mais recente de cada tarefa."""
+    abertos = {}
+    for inicio in range(0, len(tarefa_ids), _MAX_PARAMETROS_IN):
+        grupo = tarefa_ids[inicio:inicio + _MAX_PARAMETROS_IN]
+        cursor.execute(
+            # Status como literal: com parâmetro, o SQL Server não usa o índice filtrado
+            # IX_AlertasAI_TarefaID_Abertos (sql/003_alertas.sql)
+            f"SELECT TarefaID, MAX(AlertaID) FROM AlertasAI WHERE Status = '{STATUS_ABERTO}' "
+            f"AND TarefaID IN ({', '.join('?' * len(grupo))}) GROUP BY TarefaID",
+            *grupo
+        )
+        abertos.update(cursor.fetchall())
+    return abertos
+
+
+def _atualizar_abertos(cursor, alertas: list):
+    """Grava a nova pontuação nos alertas abertos (`alertas` com o AlertaID existente)."""
+    if alertas:
+        cursor.executemany(
+            "UPDATE AlertasAI SET NivelSeveridade = ?, ProbabilidadeAtraso = ?, DescricaoAlerta = ?, DataGeracao = ? "
+            "WHERE AlertaID = ?",
+            [(a["NivelSeveridade"], a["ProbabilidadeAtraso"], a["DescricaoAlerta"], a["DataGeracao"], a["AlertaID"]) for a in alertas]
+        )
+
+
+def _resolver_abertos(cursor, tarefa_ids: list) -> int:
+    resolvidos = 0
+    for inicio in range(0, len(tarefa_ids), _MAX_PARAMETROS_IN):
+        grupo = tarefa_ids[inicio:inicio + _MAX_PARAMETROS_IN]
+        cursor.execute(
+            f"UPDATE AlertasAI SET Status = ? WHERE Status = ? AND TarefaID IN ({', '.join('?' * len(grupo))})",
+            STATUS_RESOLVIDO, STATUS_ABERTO, *grupo
+        )
+        resolvidos += max(cursor.rowcount, 0)
+    return resolvidos
+
+
+def processar_bloco(db, versao, limiares: tuple, tamanho_bloco: int, tamanho_lote: int) -> dict | None:
+    """
+    Pontua o próximo bloco de tarefas alteradas e grava o resultado em uma transação.
+    Devolve as estatísticas do bloco, ou None se não havia nada novo.
+    """
+    agora = datetime.datetime.now()
+    cursor = db.cursor()
+    try:
+        marca = _travar_marca(cursor, agora)
+        cursor.execute(SQL_TAREFAS_ALTERADAS, marca, tamanho_bloco)
+        colunas = [coluna[0] for coluna in cursor.description]
+        linhas = cursor.fetchall()
+        if not linhas:
+            db.rollback()
+            return None
+
+        indice_versao, indice_concluida = colunas.index("VersaoLinha"), colunas.index("Concluida")
+        nova_marca = features.versao_linha(linhas[-1][indice_versao])
+
+        # Tarefas concluídas só têm os alertas resolvidos; as abertas são pontuadas de novo
+        abertas = [linha for linha in linhas if not linha[indice_concluida]]
+        lista_dados = [dict(zip(features.CAMPOS_FEATURES, linha[1:1 + len(features.CAMPOS_FEATURES)])) for linha in abertas]
+        probabilidades = [previsao["probabilidade_de_atraso"] for previsao in versao.prever_lista(lista_dados, tamanho_lote)]
+        alertas, sugestoes = montar_alertas(abertas, colunas, probabilidades, limiares, versao.versao, agora)
+
+        # Em risco com alerta aberto: atualiza no lugar; sem alerta aberto: alerta e sugestão novos
+        existentes = _alertas_abertos(cursor, [linha[0] for linha in linhas])
+        atualizados, novos, novas_sugestoes = [], [], []
+        for alerta, sugestao in zip(alertas, sugestoes):
+            alerta_id = existentes.get(alerta["TarefaID"])
+            if alerta_id is not None:
+                atualizados.append({**alerta, "AlertaID": alerta_id})
+            else:
+                novos.append(alerta)
+                novas_sugestoes.append(sugestao)
+        em_risco = {alerta["TarefaID"] for alerta in alertas}
+        # Os demais abertos das tarefas do bloco (concluídas ou abaixo dos limiares) são resolvidos
+        resolvidos = _resolver_abertos(cursor, [tarefa_id for tarefa_id in existentes if tarefa_id not in em_risco])
+        _atualizar_abertos(cursor, atualizados)
+
+        alerta_ids = inserir_blocos(db, ALERTAS, novos, tamanho_lote)
+        for alerta_id, sugestao in zip(alerta_ids, novas_sugestoes):
+            sugestao["AlertaID"] = alerta_id
+        inserir_blocos(db, SUGESTOES, novas_sugestoes, tamanho_lote)
+
+        cursor.execute("UPDATE MarcasProcessamento SET Marca = ? WHERE Processo = ?", nova_marca, PROCESSO)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    por_severidade = {}
+    for alerta in alertas:
+        por_severidade[alerta["NivelSeveridade"]] = por_severidade.get(alerta["NivelSeveridade"], 0) + 1
+    return {
+        "tarefas_lidas": len(linhas),
+        "tarefas_pontuadas": len(abertas),
+        "alertas_resolvidos": resolvidos,
+        "alertas_atualizados": len(atualizados),
+        "alertas_gerados": len(novos),
+        "por_severidade": por_severidade,
+        "marca": nova_marca,
+    }
+
+
+def executar_ciclo(db, versao, limiares: tuple, tamanho_bloco: int, tamanho_lote: int) -> dict:
+    """Processa blocos até não restar tarefa alterada. Devolve o total do ciclo."""
+    inicio = time.perf_counter()
+    total = {"blocos": 0, "tarefas_lidas": 0, "tarefas_pontuadas": 0, "alertas_resolvidos": 0,
+             "alertas_atualizados": 0, "alertas_gerados": 0, "por_severidade": {}, "marca": None, "versao_modelo": versao.versao}
+    while True:
+        bloco = processar_bloco(db, versao, limiares, tamanho_bloco, tamanho_lote)
+        if bloco is None:
+            break
+        total["blocos"] += 1
+        for chave in ("tarefas_lidas", "tarefas_pontuadas", "alertas_resolvidos", "alertas_atualizados", "alertas_gerados"):
+            total[chave] += bloco[chave]
+        for nivel, quantidade in bloco["por_severidade"].items():
+            total["por_severidade"][nivel] = total["por_severidade"].get(nivel, 0) + quantidade
+        total["marca"] = bloco["marca"]
+        if bloco["tarefas_lidas"] < tamanho_bloco:
+            break
+    total["duracao_s"] = time.perf_counter() - inicio
+    return total
+
+
+def reiniciar_marca(db):
+    """Zera a marca: o próximo ciclo pontua todas as tarefas de novo."""
+    cursor = db.cursor()
+    cursor.execute("UPDATE MarcasProcessamento SET Marca = 0 WHERE Processo = ?", PROCESSO)
+    db.commit()
+    cursor.close()
+
+
+class MotorAlertas:
+    """
+    Roda os ciclos em segundo plano (a cada `intervalo` segundos, 0 = desligado) ou sob
+    demanda. `abrir_conexao` devolve um context manager com uma conexão (ex.: pool.conexao())
+    e `obter_versao` a versão ativa do modelo (ou None, se nenhuma estiver carregada).
+    """
+
+    def __init__(self, abrir_conexao, obter_versao, limiares: tuple, tamanho_bloco: int,
+                 tamanho_lote: int, intervalo: float = 0):
+        self._abrir_conexao = abrir_conexao
+        self._obter_versao = obter_versao
+        self.limiares = limiares
+        self.tamanho_bloco = tamanho_bloco
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+
+        # Um ciclo por vez neste processo (entre processos, a trava é a linha da marca)
+        self._executando = threading.Lock()
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+
+        self._ciclos = 0
+        self._falhas = 0
+        self._alertas_gerados = 0
+        self._ultimo_ciclo = None
+        self._ultimo_erro = None
+
+    def processar(self) -> dict | None:
+        """Executa um ciclo agora. Devolve None se já havia um ciclo em andamento."""
+        if not self._executando.acquire(blocking=False):
+            return None
+        try:
+            versao = self._obter_versao()
+            if versao is None:
+                raise RuntimeError("Modelo de IA não está carregado no servidor.")
+            with self._abrir_conexao() as conexao:
+                resultado = executar_ciclo(
+                    metricas.ConexaoMedida(conexao), versao, self.limiares, self.tamanho_bloco, self.tamanho_lote
+                )
+        except Exception as ex:
+            with self._trava:
+                self._falhas += 1
+                self._ultimo_erro = f"{type(ex).__name__}: {ex}"
+            raise
+        finally:
+            self._executando.release()
+
+        with self._trava:
+            self._ciclos += 1
+            self._alertas_gerados += resultado["alertas_gerados"]
+            self._ultimo_ciclo = {**resultado, "terminado_em": datetime.datetime.now().isoformat()}
+            self._ultimo_erro = None
+        return resultado
+
+    def iniciar(self):
+        if not self.intervalo or self._thread is not None:
+            return
+
+        def executar():
+            while not self._parar.wait(self.intervalo):
+                try:
+                    self.processar()
+                except Exception as ex:
+                    print(f"Aviso: falha no ciclo do motor de alertas: {ex}")
+
+        self._thread = threading.Thread(target=executar, name="solarys-motor-alertas", daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def metricas(self) -> dict:
+        with self._trava:
+            return {
+                "intervalo_s": self.intervalo,
+                "em_segundo_plano": self._thread is not None,
+                "executando": self._executando.locked(),
+                "limiares": dict(self.limiares),
+                "tamanho_bloco": self.tamanho_bloco,
+                "ciclos": self._ciclos,
+                "falhas": self._falhas,
+                "alertas_gerados": self._alertas_gerados,
+                "ultimo_ciclo": self._ultimo_ciclo,
+                "ultimo_erro": self._ultimo_erro,
+            }
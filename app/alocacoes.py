@@ -0,0 +1,236 @@
+# Arquivo: solarys_api/app/alocacoes.py
+# Índice em memória das alocações por funcionário, para detectar conflitos (o mesmo
+# funcionário em dois períodos que se sobrepõem) sem varrer AlocacaoFuncionarios:
+#
+# - Por funcionário, os períodos ficam ordenados pelo início, com o maior fim visto até
+#   cada posição (não decrescente). Uma consulta de sobreposição com [inicio, fim] acha por
+#   bisect a primeira posição em que esse maior fim alcança `inicio` e a última cujo início
+#   não passa de `fim`, e só percorre o que está entre as duas: O(log n + k) quando os
+#   períodos do funcionário não se sobrepõem (o que as escritas passam a garantir).
+# - Carregado uma vez, na primeira consulta, e atualizado a cada escrita pela API. As datas
+#   são inclusivas; DataFimAlocacao nula é uma alocação sem fim previsto.
+# - Escritas: dentro da transação, os períodos do funcionário são relidos com UPDLOCK/HOLDLOCK
+#   (pelo índice em FuncionarioID, sql/004_alocacoes.sql). Isso trava o intervalo de chaves até o
+#   commit, então duas escritas concorrentes (mesmo em workers diferentes) não passam juntas
+#   pela verificação, e o índice deste processo fica em dia com o que os outros gravaram.
+# - Alterações feitas fora da API (ou por outros workers, para as consultas) aparecem na
+#   recarga completa, a cada `ttl` segundos.
+
+import bisect
+import datetime
+import threading
+import time
+
+FIM_ABERTO = datetime.date.max
+
+SQL_CARREGAR = "SELECT AlocacaoID, FuncionarioID, ProjetoID, DataInicioAlocacao, DataFimAlocacao FROM AlocacaoFuncionarios"
+SQL_DO_FUNCIONARIO = (
+    "SELECT AlocacaoID, FuncionarioID, ProjetoID, DataInicioAlocacao, DataFimAlocacao "
+    "FROM AlocacaoFuncionarios WITH (UPDLOCK, HOLDLOCK) WHERE FuncionarioID = ?"
+)
+
+
+class ConflitoAlocacao(Exception):
+    """A alocação se sobrepõe a outras do mesmo funcionário (`conflitos`: as alocações existentes)."""
+
+    def __init__(self, conflitos: list):
+        super().__init__(f"{len(conflitos)} alocação(ões) do funcionário no mesmo período")
+        self.conflitos = conflitos
+
+
+def _data(valor) -> datetime.date | None:
+    return valor.date() if isinstance(valor, datetime.datetime) else valor
+
+
+def como_dict(item: tuple) -> dict:
+    """Item do índice no formato de AlocacaoFuncionario."""
+    inicio, fim, alocacao_id, funcionario_id, projeto_id = item
+    return {
+        "FuncionarioID": funcionario_id,
+        "ProjetoID": projeto_id,
+        "DataInicioAlocacao": inicio,
+        "DataFimAlocacao": None if fim == FIM_ABERTO else fim,
+        "AlocacaoID": alocacao_id,
+    }
+
+
+def _item(linha) -> tuple:
+    alocacao_id, funcionario_id, projeto_id, inicio, fim = linha
+    return (_data(inicio), _data(fim) or FIM_ABERTO, alocacao_id, funcionario_id, projeto_id)
+
+
+class PeriodosFuncionario:
+    """Períodos de um funcionário: (inicio, fim, AlocacaoID, FuncionarioID, ProjetoID) ordenados pelo início."""
+
+    def __init__(self, itens=()):
+        self.itens = sorted(itens)
+        self._recalcular(0)
+
+    def _recalcular(self, a_partir: int):
+        # fim_maximo[i] = maior fim entre itens[0..i]
+        if a_partir == 0:
+            self.fim_maximo = []
+        else:
+            del self.fim_maximo[a_partir:]
+        maior = self.fim_maximo[-1] if self.fim_maximo else datetime.date.min
+        for item in self.itens[a_partir:]:
+            maior = max(maior, item[1])
+            self.fim_maximo.append(maior)
+
+    def inserir(self, item: tuple):
+        posicao = bisect.bisect_left(self.itens, item)
+        self.itens.insert(posicao, item)
+        self._recalcular(posicao)
+
+    def remover(self, alocacao_id: int) -> bool:
+        for posicao, item in enumerate(self.itens):
+            if item[2] == alocacao_id:
+                del self.itens[posicao]
+                self._recalcular(posicao)
+                return True
+        return False
+
+    def sobrepostos(self, inicio: datetime.date, fim: datetime.date, ignorar: int | None = None) -> list:
+        """Itens que se sobrepõem a [inicio, fim] (inclusivo), em ordem de início."""
+        primeiro = bisect.bisect_left(self.fim_maximo, inicio)
+        ultimo = bisect.bisect_right(self.itens, (fim, FIM_ABERTO, float("inf")))
+        return [item for item in self.itens[primeiro:ultimo] if item[1] >= inicio and item[2] != ignorar]
+
+    def conflitos(self) -> list:
+        """Pares de itens sobrepostos: uma passada com cada item contra os seguintes que começam antes do seu fim."""
+        pares = []
+        for i, item in enumerate(self.itens):
+            for outro in self.itens[i + 1:]:
+                if outro[0] > item[1]:
+                    break
+                pares.append((item, outro))
+        return pares
+
+
+class IndiceAlocacoes:
+    def __init__(self, ttl: float = 0):
+        self.ttl = ttl
+        self._trava = threading.RLock()
+        self._por_funcionario = {}
+        self._funcionario_da_alocacao = {}
+        self._carregado_em = None
+        self.alocacoes = 0
+        self.tempo_carga_s = None
+
+    def _garantir_carregado(self, db):
+        if self._carregado_em is not None and not (self.ttl and time.monotonic() - self._carregado_em > self.ttl):
+            return
+        with self._trava:
+            if self._carregado_em is not None and not (self.ttl and time.monotonic() - self._carregado_em > self.ttl):
+                return
+            inicio = time.perf_counter()
+            cursor = db.cursor()
+            cursor.execute(SQL_CARREGAR)
+            agrupados = {}
+            while True:
+                linhas = cursor.fetchmany(10000)
+                if not linhas:
+                    break
+                for linha in linhas:
+                    item = _item(linha)
+                    agrupados.setdefault(item[3], []).append(item)
+            cursor.close()
+            self._por_funcionario = {funcionario: PeriodosFuncionario(itens) for funcionario, itens in agrupados.items()}
+            self._funcionario_da_alocacao = {item[2]: item[3] for itens in agrupados.values() for item in itens}
+            self.alocacoes = len(self._funcionario_da_alocacao)
+            self.tempo_carga_s = time.perf_counter() - inicio
+            self._carregado_em = time.monotonic()
+
+    # --- consultas ---
+
+    def sobrepostas(self, db, funcionario_id: int, inicio: datetime.date, fim: datetime.date | None, ignorar: int | None = None) -> list:
+        """Alocações do funcionário que se sobrepõem a [inicio, fim] (fim None = em aberto)."""
+        self._garantir_carregado(db)
+        with self._trava:
+            periodos = self._por_funcionario.get(funcionario_id)
+            itens = periodos.sobrepostos(inicio, fim or FIM_ABERTO, ignorar) if periodos else []
+        return [como_dict(item) for item in itens]
+
+    def disponibilidade(self, db, funcionario_id: int, data_de: datetime.date, data_ate: datetime.date) -> dict:
+        """Alocações do funcionário em [data_de, data_ate] e os intervalos livres que sobram."""
+        self._garantir_carregado(db)
+        with self._trava:
+            periodos = self._por_funcionario.get(funcionario_id)
+            itens = periodos.sobrepostos(data_de, data_ate) if periodos else []
+        livres, proximo_livre = [], data_de
+        for item in itens:
+            if item[0] > proximo_livre:
+                livres.append({"inicio": proximo_livre, "fim": item[0] - datetime.timedelta(days=1)})
+            if item[1] >= data_ate:
+                proximo_livre = None
+                break
+            proximo_livre = max(proximo_livre, item[1] + datetime.timedelta(days=1))
+        if proximo_livre is not None and proximo_livre <= data_ate:
+            livres.append({"inicio": proximo_livre, "fim": data_ate})
+        return {
+            "FuncionarioID": funcionario_id,
+            "data_de": data_de,
+            "data_ate": data_ate,
+            "disponivel": not itens,
+            "alocacoes": [como_dict(item) for item in itens],
+            "periodos_livres": livres,
+        }
+
+    def conflitos(self, db, funcionario_id: int | None = None, projeto_id: int | None = None) -> list:
+        """Pares de alocações sobrepostas já gravadas (dados antigos ou escritos fora da API)."""
+        self._garantir_carregado(db)
+        with self._trava:
+            if funcionario_id is not None:
+                grupos = [self._por_funcionario[funcionario_id]] if funcionario_id in self._por_funcionario else []
+            else:
+                grupos = [self._por_funcionario[chave] for chave in sorted(self._por_funcionario)]
+            pares = [par for periodos in grupos for par in periodos.conflitos()]
+        resultado = []
+        for a, b in pares:
+            if projeto_id is not None and projeto_id not in (a[4], b[4]):
+                continue
+            fim = min(a[1], b[1])
+            resultado.append({
+                "FuncionarioID": a[3],
+                "inicio": b[0],
+                "fim": None if fim == FIM_ABERTO else fim,
+                "alocacoes": [como_dict(a), como_dict(b)],
+            })
+        return resultado
+
+    # --- escritas (chamadas dentro da transação, antes do commit) ---
+
+    def _recarregar_funcionario(self, db, funcionario_id: int):
+        """Relê (e trava até o commit) os períodos do funcionário, atualizando o índice."""
+        cursor = db.cursor()
+        cursor.execute(SQL_DO_FUNCIONARIO, funcionario_id)
+        itens = [_item(linha) for linha in cursor.fetchall()]
+        cursor.close()
+        with self._trava:
+            anteriores = self._por_funcionario.get(funcionario_id)
+            for item in anteriores.itens if anteriores else ():
+                self._funcionario_da_alocacao.pop(item[2], None)
+            self._por_funcionario[funcionario_id] = PeriodosFuncionario(itens)
+            self._funcionario_da_alocacao.update((item[2], funcionario_id) for item in itens)
+            self.alocacoes = len(self._funcionario_da_alocacao)
+
+    def verificar(self, db, alocacao, ignorar: int | None = None):
+        """Levanta ConflitoAlocacao se `alocacao` (um AlocacaoFuncionarioCreate) conflitar com outra do funcionário."""
+        if alocacao.DataFimAlocacao is not None and alocacao.DataFimAlocacao < alocacao.DataInicioAlocacao:
+            raise ValueError("DataFimAlocacao anterior a DataInicioAlocacao.")
+        self._garantir_carregado(db)
+        self._recarregar_funcionario(db, alocacao.FuncionarioID)
+        conflitos = self.sobrepostas(db, alocacao.FuncionarioID, alocacao.DataInicioAlocacao, alocacao.DataFimAlocacao, ignorar)
+        if conflitos:
+            raise ConflitoAlocacao(conflitos)
+
+    def registrar(self, alocacao_id: int, alocacao):
+        """Depois do commit: grava (ou move, numa atualização) a alocação no índice."""
+        item = (alocacao.DataInicioAlocacao, alocacao.DataFimAlocacao or FIM_ABERTO, alocacao_id, alocacao.FuncionarioID, alocacao.ProjetoID)
+        with self._trava:
+            anterior = self._funcionario_da_alocacao.get(alocacao_id)
+            if anterior is not None and anterior in self._por_funcionario:
+                self._por_funcionario[anterior].remover(alocacao_id)
+            self._por_funcionario.setdefault(alocacao.FuncionarioID, PeriodosFuncionario()).inserir(item)
+            self._funcionario_da_alocacao[alocacao_id] = alocacao.FuncionarioID
+            self.alocacoes = len(self._funcionario_da_alocacao)
@@ -0,0 +1,229 @@
+# Arquivo: solarys_api/app/cache_previsao.py
+# Cache das probabilidades de atraso, chaveado pelo vetor de features já na ordem de
+# colunas_modelo. O espaço de entradas é pequeno (mês 1-12, dia 0-6, durações curtas)
+# e os clientes repetem os mesmos vetores o tempo todo.
+#
+# Nível 1: LRU em memória, limitado por tamanho e (opcionalmente) por TTL.
+# Nível 2 (opcional): um backend compartilhado entre os workers do uvicorn. Aqui há um
+# em SQLite (arquivo local), mas qualquer objeto com obter_varios/guardar_varios/limpar serve.
+#
+# As entradas são sempre da versão do modelo carregado: ao trocar de modelo o cache é
+# invalidado e, no backend compartilhado, a versão faz parte da chave.
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def versao_artefatos(*caminhos: str) -> str:
+    """Impressão digital (SHA-256 do conteúdo) dos arquivos do modelo: muda sempre que o artefato muda."""
+    resumo = hashlib.sha256()
+    for caminho in caminhos:
+        with open(caminho, "rb") as f:
+            for pedaco in iter(lambda: f.read(1 << 20), b""):
+                resumo.update(pedaco)
+    return resumo.hexdigest()[:16]
+
+
+def serializar_chave(chave: tuple) -> str:
+    return ",".join(map(repr, chave))
+
+
+class BackendSQLite:
+    """Backend compartilhado em um arquivo SQLite (modo WAL), uma conexão por thread."""
+
+    def __init__(self, caminho: str, timeout: float = 5.0):
+        self.caminho = caminho
+        self.timeout = timeout
+        self._local = threading.local()
+        if hasattr(os, "register_at_fork"):
+            # Um worker criado por fork (python -m app.serve) não pode usar a conexão do processo pai
+            os.register_at_fork(after_in_child=self._apos_fork)
+        conexao = self._conexao()
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.execute(
+            "CREATE TABLE IF NOT EXISTS CachePrevisao ("
+            " Versao TEXT NOT NULL, Chave TEXT NOT NULL, Probabilidade REAL NOT NULL, ExpiraEm REAL NOT NULL,"
+            " PRIMARY KEY (Versao, Chave)) WITHOUT ROWID"
+        )
+        conexao.commit()
+
+    def _apos_fork(self):
+        self._local = threading.local()
+
+    def _conexao(self) -> sqlite3.Connection:
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=self.timeout)
+            self._local.conexao = conexao
+        return conexao
+
+    def obter_varios(self, versao: str, chaves: list) -> dict:
+        """Devolve {chave: probabilidade} das chaves encontradas e ainda válidas."""
+        agora = time.time()
+        encontrados = {}
+        conexao = self._conexao()
+        for inicio in range(0, len(chaves), 500):
+            bloco = chaves[inicio:inicio + 500]
+            sql = (f"SELECT Chave, Probabilidade FROM CachePrevisao WHERE Versao = ? "
+                   f"AND (ExpiraEm = 0 OR ExpiraEm > ?) AND Chave IN ({', '.join('?' * len(bloco))})")
+            encontrados.update(conexao.execute(sql, (versao, agora, *bloco)).fetchall())
+        return encontrados
+
+    def guardar_varios(self, versao: str, itens: list, ttl: float):
+        expira_em = time.time() + ttl if ttl else 0
+        conexao = self._conexao()
+        conexao.executemany(
+            "INSERT OR REPLACE INTO CachePrevisao (Versao, Chave, Probabilidade, ExpiraEm) VALUES (?, ?, ?, ?)",
+            [(versao, chave, probabilidade, expira_em) for chave, probabilidade in itens]
+        )
+        conexao.commit()
+
+    def limpar(self, manter_versao: str | None = None):
+        """Remove as entradas de outras versões do modelo (ou todas) e as expiradas."""
+        conexao = self._conexao()
+        conexao.execute("DELETE FROM CachePrevisao WHERE Versao != ? OR (ExpiraEm != 0 AND ExpiraEm <= ?)",
+                        (manter_versao or "", time.time()))
+        conexao.commit()
+
+
+class CachePrevisao:
+    """
+    LRU thread-safe de vetor de features -> probabilidade de atraso. `capacidade` limita o
+    número de entradas em memória; `ttl` (segundos, 0 = sem expiração) limita a idade.
+    """
+
+    def __init__(self, capacidade: int = 50000, ttl: float = 0, backend=None):
+        self.capacidade = capacidade
+        self.ttl = ttl
+        self.backend = backend
+        self.versao_modelo = None
+        self._entradas = OrderedDict()  # chave -> (probabilidade, expira_em)
+        self._trava = threading.Lock()
+
+        self._acertos = 0
+        self._acertos_compartilhado = 0
+        self._falhas = 0
+        self._remocoes = 0
+        self._expiradas = 0
+        self._invalidacoes = 0
+        self._erros_backend = 0
+
+    def definir_versao(self, versao: str):
+        """Troca a versão do modelo; se mudou, descarta todas as entradas em memória."""
+        with self._trava:
+            if versao == self.versao_modelo:
+                return
+            self.versao_modelo = versao
+            if self._entradas:
+                self._invalidacoes += 1
+            self._entradas.clear()
+        if self.backend is not None:
+            try:
+                self.backend.limpar(versao)
+            except Exception as ex:
+                self._erro_backend(ex)
+
+    def _erro_backend(self, ex: Exception):
+        # O backend compartilhado é só uma otimização: falhas dele nunca derrubam a previsão
+        with self._trava:
+            self._erros_backend += 1
+        print(f"Aviso: cache compartilhado de previsões indisponível: {ex}")
+
+    def obter_varios(self, chaves: list) -> list:
+        """Probabilidade de cada chave (None quando não está no cache), na mesma ordem."""
+        agora = time.monotonic()
+        resultado = [None] * len(chaves)
+        faltando = []
+        with self._trava:
+            for i, chave in enumerate(chaves):
+                entrada = self._entradas.get(chave)
+                if entrada is not None and (not entrada[1] or entrada[1] > agora):
+                    self._entradas.move_to_end(chave)
+                    resultado[i] = entrada[0]
+                    self._acertos += 1
+                    continue
+                if entrada is not None:
+                    del self._entradas[chave]
+                    self._expiradas += 1
+                faltando.append(i)
+
+        if faltando and self.backend is not None:
+            versao = self.versao_modelo
+            # Chave serializada -> posições em que aparece (o mesmo vetor pode se repetir no lote)
+            textos = {}
+            for i in faltando:
+                textos.setdefault(serializar_chave(chaves[i]), []).append(i)
+            try:
+                encontrados = self.backend.obter_varios(versao, list(textos))
+            except Exception as ex:
+                self._erro_backend(ex)
+                encontrados = {}
+            if encontrados:
+                self._guardar_local([(chaves[textos[texto][0]], p) for texto, p in encontrados.items()], versao)
+                for texto, probabilidade in encontrados.items():
+                    for i in textos[texto]:
+                        resultado[i] = probabilidade
+                acertos = len(faltando)
+                faltando = [i for i in faltando if resultado[i] is None]
+                with self._trava:
+                    self._acertos_compartilhado += acertos - len(faltando)
+
+        with self._trava:
+            self._falhas += len(faltando)
+        return resultado
+
+    def obter(self, chave: tuple):
+        return self.obter_varios([chave])[0]
+
+    def guardar_varios(self, itens: list, versao: str | None = None):
+        """Guarda pares (chave, probabilidade) calculados pelo modelo da versão `versao`."""
+        versao = versao or self.versao_modelo
+        self._guardar_local(itens, versao)
+        if self.backend is not None and itens:
+            try:
+                self.backend.guardar_varios(versao, [(serializar_chave(chave), p) for chave, p in itens], self.ttl)
+            except Exception as ex:
+                self._erro_backend(ex)
+
+    def guardar(self, chave: tuple, probabilidade: float, versao: str | None = None):
+        self.guardar_varios([(chave, probabilidade)], versao)
+
+    def _guardar_local(self, itens: list, versao: str):
+        expira_em = time.monotonic() + self.ttl if self.ttl else 0
+        with self._trava:
+            # Resultado de um modelo que já foi trocado enquanto a previsão rodava: descarta
+            if versao != self.versao_modelo:
+                return
+            for chave, probabilidade in itens:
+                self._entradas[chave] = (probabilidade, expira_em)
+                self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+                self._remocoes += 1
+
+    def limpar(self):
+        with self._trava:
+            self._entradas.clear()
+
+    def metricas(self) -> dict:
+        with self._trava:
+            consultas = self._acertos + self._acertos_compartilhado + self._falhas
+            return {
+                "versao_modelo": self.versao_modelo,
+                "tamanho": len(self._entradas),
+                "capacidade": self.capacidade,
+                "ttl_s": self.ttl,
+                "acertos": self._acertos,
+                "acertos_compartilhado": self._acertos_compartilhado,
+                "falhas": self._falhas,
+                "taxa_acerto": (self._acertos + self._acertos_compartilhado) / consultas if consultas else 0.0,
+                "remocoes": self._remocoes,
+                "expiradas": self._expiradas,
+                "invalidacoes": self._invalidacoes,
+                "backend_compartilhado": type(self.backend).__name__ if self.backend is not None else None,
+                "erros_backend": self._erros_backend,
+            }
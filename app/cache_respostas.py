@@ -0,0 +1,264 @@
+# Arquivo: solarys_api/app/cache_respostas.py
+# Cache de respostas já serializadas (bytes JSON) para as leituras que mudam pouco:
+# GET /projetos/, GET /projetos/{id} e GET /funcionarios/.
+#
+# - A chave é (rota, parâmetros); cada entrada guarda o corpo, o ETag e os cabeçalhos.
+# - A memória é limitada em bytes, com remoção LRU.
+# - Cada entrada pertence a "marcadores" (ex.: "projetos", "projeto:7"). Os handlers de
+#   escrita invalidam só os marcadores afetados; uma versão por marcador impede que uma
+#   leitura iniciada antes da escrita guarde no cache o resultado antigo.
+# - Com If-None-Match igual ao ETag a resposta é 304, sem tocar no banco.
+#
+# Com vários workers, as versões dos marcadores podem ficar em um SQLite compartilhado
+# (VersoesSQLite): uma escrita em um worker invalida as entradas de todos.
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Response
+
+# Cabeçalho que informa se a resposta veio do cache (HIT) ou do banco (MISS)
+CABECALHO_CACHE = "X-Cache"
+
+
+class VersoesLocais:
+    """Versão de cada marcador, em memória (um único processo)."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._versoes = {}
+
+    def ler(self, marcadores: tuple) -> tuple:
+        with self._trava:
+            return tuple(self._versoes.get(marcador, 0) for marcador in marcadores)
+
+    def incrementar(self, marcadores: tuple):
+        with self._trava:
+            for marcador in marcadores:
+                self._versoes[marcador] = self._versoes.get(marcador, 0) + 1
+
+
+class VersoesSQLite:
+    """Versão de cada marcador em um arquivo SQLite (modo WAL) compartilhado entre os workers."""
+
+    def __init__(self, caminho: str, timeout: float = 5.0):
+        self.caminho = caminho
+        self.timeout = timeout
+        self._local = threading.local()
+        if hasattr(os, "register_at_fork"):
+            # Um worker criado por fork (python -m app.serve) não pode usar a conexão do processo pai
+            os.register_at_fork(after_in_child=self._apos_fork)
+        conexao = self._conexao()
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.execute("CREATE TABLE IF NOT EXISTS VersoesCache (Marcador TEXT PRIMARY KEY, Versao INTEGER NOT NULL) WITHOUT ROWID")
+        conexao.commit()
+
+    def _apos_fork(self):
+        self._local = threading.local()
+
+    def _conexao(self) -> sqlite3.Connection:
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=self.timeout)
+            self._local.conexao = conexao
+        return conexao
+
+    def ler(self, marcadores: tuple) -> tuple:
+        sql = f"SELECT Marcador, Versao FROM VersoesCache WHERE Marcador IN ({', '.join('?' * len(marcadores))})"
+        versoes = dict(self._conexao().execute(sql, marcadores).fetchall())
+        return tuple(versoes.get(marcador, 0) for marcador in marcadores)
+
+    def incrementar(self, marcadores: tuple):
+        conexao = self._conexao()
+        conexao.executemany(
+            "INSERT INTO VersoesCache (Marcador, Versao) VALUES (?, 1) "
+            "ON CONFLICT(Marcador) DO UPDATE SET Versao = Versao + 1",
+            [(marcador,) for marcador in marcadores]
+        )
+        conexao.commit()
+
+
+def calcular_etag(corpo: bytes) -> str:
+    return '"' + hashlib.blake2b(corpo, digest_size=12).hexdigest() + '"'
+
+
+def etag_confere(if_none_match: str | None, etag: str) -> bool:
+    """Compara If-None-Match (lista separada por vírgulas, aceita W/ e *) com o ETag."""
+    if not if_none_match:
+        return False
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato == "*" or candidato.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class EntradaResposta:
+    __slots__ = ("corpo", "etag", "cabecalhos", "marcadores", "versoes", "expira_em")
+
+    def __init__(self, corpo: bytes, cabecalhos: dict, marcadores: tuple, versoes: tuple, expira_em: float):
+        self.corpo = corpo
+        self.etag = calcular_etag(corpo)
+        self.cabecalhos = cabecalhos
+        self.marcadores = marcadores
+        self.versoes = versoes
+        self.expira_em = expira_em
+
+
+class CacheRespostas:
+    """
+    LRU thread-safe de respostas serializadas, limitado a `capacidade_bytes`. `ttl` (segundos,
+    0 = sem expiração) é só uma rede de segurança para escritas feitas fora da API.
+    """
+
+    def __init__(self, capacidade_bytes: int, ttl: float = 0, tamanho_max_item: int | None = None, versoes=None):
+        self.capacidade_bytes = capacidade_bytes
+        self.ttl = ttl
+        self.tamanho_max_item = tamanho_max_item if tamanho_max_item is not None else capacidade_bytes // 8
+        self.versoes = versoes or VersoesLocais()
+        self._entradas = OrderedDict()  # chave -> EntradaResposta
+        self._bytes = 0
+        self._trava = threading.Lock()
+
+        self._por_rota = {}  # rota -> [acertos, falhas, não modificados (304)]
+        self._remocoes = 0
+        self._expiradas = 0
+        self._invalidadas = 0
+        self._descartadas = 0
+        self._grandes_demais = 0
+
+    def _contar(self, chave: tuple, indice: int):
+        # Chamado com a trava adquirida
+        self._por_rota.setdefault(chave[0], [0, 0, 0])[indice] += 1
+
+    def _remover(self, chave: tuple):
+        entrada = self._entradas.pop(chave)
+        self._bytes -= len(entrada.corpo)
+
+    def obter(self, chave: tuple, marcadores: tuple) -> EntradaResposta | None:
+        """Entrada válida para `chave` (e que nenhum marcador tenha sido invalidado), ou None."""
+        with self._trava:
+            entrada = self._entradas.get(chave)
+        if entrada is not None:
+            if entrada.expira_em and entrada.expira_em <= time.monotonic():
+                motivo = "expirada"
+            elif self.versoes.ler(marcadores) != entrada.versoes:
+                # Invalidada por outro worker (versões compartilhadas)
+                motivo = "invalidada"
+            else:
+                with self._trava:
+                    if chave in self._entradas:
+                        self._entradas.move_to_end(chave)
+                    self._contar(chave, 0)
+                return entrada
+            with self._trava:
+                if self._entradas.get(chave) is entrada:
+                    self._remover(chave)
+                    if motivo == "expirada":
+                        self._expiradas += 1
+                    else:
+                        self._invalidadas += 1
+        with self._trava:
+            self._contar(chave, 1)
+        return None
+
+    def versoes_atuais(self, marcadores: tuple) -> tuple:
+        """Versões a capturar ANTES de consultar o banco (e passar depois para `guardar`)."""
+        return self.versoes.ler(marcadores)
+
+    def guardar(self, chave: tuple, marcadores: tuple, versoes: tuple, corpo: bytes, cabecalhos: dict) -> EntradaResposta:
+        """
+        Monta a entrada e a guarda se ainda for atual. Uma escrita que aconteceu durante a
+        consulta mudou a versão de algum marcador: a entrada é devolvida, mas não guardada.
+        """
+        entrada = EntradaResposta(corpo, cabecalhos, marcadores, versoes, time.monotonic() + self.ttl if self.ttl else 0)
+        if len(corpo) > self.tamanho_max_item:
+            with self._trava:
+                self._grandes_demais += 1
+            return entrada
+        if self.versoes.ler(marcadores) != versoes:
+            with self._trava:
+                self._descartadas += 1
+            return entrada
+        with self._trava:
+            if chave in self._entradas:
+                self._remover(chave)
+            self._entradas[chave] = entrada
+            self._bytes += len(corpo)
+            while self._bytes > self.capacidade_bytes:
+                self._remover(next(iter(self._entradas)))
+                self._remocoes += 1
+        return entrada
+
+    def invalidar(self, *marcadores: str):
+        """Chamado pelos handlers de escrita depois do commit."""
+        self.versoes.incrementar(marcadores)
+        alvo = set(marcadores)
+        with self._trava:
+            for chave in [chave for chave, entrada in self._entradas.items() if alvo.intersection(entrada.marcadores)]:
+                self._remover(chave)
+                self._invalidadas += 1
+
+    def nao_modificado(self, chave: tuple):
+        with self._trava:
+            self._contar(chave, 2)
+
+    def limpar(self):
+        with self._trava:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def metricas(self) -> dict:
+        with self._trava:
+            por_rota = {
+                rota: {
+                    "acertos": acertos,
+                    "falhas": falhas,
+                    "nao_modificados": nao_modificados,
+                    "taxa_acerto": acertos / (acertos + falhas) if acertos + falhas else 0.0,
+                }
+                for rota, (acertos, falhas, nao_modificados) in sorted(self._por_rota.items())
+            }
+            acertos = sum(rota["acertos"] for rota in por_rota.values())
+            falhas = sum(rota["falhas"] for rota in por_rota.values())
+            return {
+                "entradas": len(self._entradas),
+                "bytes": self._bytes,
+                "capacidade_bytes": self.capacidade_bytes,
+                "ttl_s": self.ttl,
+                "acertos": acertos,
+                "falhas": falhas,
+                "taxa_acerto": acertos / (acertos + falhas) if acertos + falhas else 0.0,
+                "nao_modificados": sum(rota["nao_modificados"] for rota in por_rota.values()),
+                "remocoes": self._remocoes,
+                "expiradas": self._expiradas,
+                "invalidadas": self._invalidadas,
+                "descartadas_por_escrita": self._descartadas,
+                "grandes_demais": self._grandes_demais,
+                "versoes_compartilhadas": isinstance(self.versoes, VersoesSQLite),
+                "por_rota": por_rota,
+            }
+
+
+async def responder_em_cache(cache: CacheRespostas, if_none_match: str | None, chave: tuple, marcadores: tuple, gerar) -> Response:
+    """
+    Devolve a resposta de `chave` do cache ou, numa falha, chama `gerar()` (corrotina que
+    consulta o banco e devolve (corpo em bytes, cabeçalhos)) e guarda o resultado.
+    """
+    entrada = cache.obter(chave, marcadores)
+    origem = "HIT"
+    if entrada is None:
+        origem = "MISS"
+        versoes = cache.versoes_atuais(marcadores)
+        corpo, cabecalhos = await gerar()
+        entrada = cache.guardar(chave, marcadores, versoes, corpo, cabecalhos)
+
+    cabecalhos = {**entrada.cabecalhos, "ETag": entrada.etag, "Cache-Control": "no-cache", CABECALHO_CACHE: origem}
+    if etag_confere(if_none_match, entrada.etag):
+        cache.nao_modificado(chave)
+        return Response(status_code=304, headers=cabecalhos)
+    return Response(content=entrada.corpo, media_type="application/json", headers=cabecalhos)
@@ -7,3 +7,118 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 
 if not DATABASE_URL:
     raise ValueError("A variável de ambiente DATABASE_URL não foi definida.")
+
+# Quantas linhas vão para cada chamada de predict_proba nos endpoints de previsão em lote
+PREVISAO_TAMANHO_LOTE = int(os.getenv("PREVISAO_TAMANHO_LOTE", "5000"))
+
+# --- MODELOS ---
+# Diretório com os artefatos versionados (modelo_atraso_v<N>.joblib + colunas_modelo_v<N>.json).
+# Por padrão a raiz do projeto, independente do diretório de onde o uvicorn foi iniciado.
+MODELOS_DIR = os.getenv("MODELOS_DIR", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 0 = este worker não carrega o modelo (só CRUD: não importa pandas/sklearn e /health/ready já nasce pronto)
+MODELOS_CARREGAR = os.getenv("MODELOS_CARREGAR", "1") == "1"
+# Carrega os arrays do artefato com mmap (somente leitura), compartilhando páginas entre os workers
+MODELOS_MMAP = os.getenv("MODELOS_MMAP", "1") == "1"
+# Segundos entre as verificações de novas versões no diretório (0 = só pelo POST /modelos/verificar)
+MODELOS_VERIFICAR_INTERVALO = float(os.getenv("MODELOS_VERIFICAR_INTERVALO", "0"))
+# Arquivo JSON com a versão ativa / em sombra pedida pela API, seguido por todos os workers
+# (vazio = só o processo que atendeu o pedido; o python -m app.serve define um com vários workers)
+MODELOS_ESTADO_COMPARTILHADO = os.getenv("MODELOS_ESTADO_COMPARTILHADO", "")
+# Fração padrão do tráfego pontuada também pela versão candidata (modo sombra)
+MODELOS_SOMBRA_FRACAO = float(os.getenv("MODELOS_SOMBRA_FRACAO", "0.1"))
+
+# --- CACHE DE PREVISÕES ---
+# Entradas (vetores de features) no LRU em memória; 0 desliga o cache
+PREVISAO_CACHE_TAMANHO = int(os.getenv("PREVISAO_CACHE_TAMANHO", "50000"))
+# Segundos de validade de cada entrada (0 = só expira por LRU ou troca de modelo)
+PREVISAO_CACHE_TTL = float(os.getenv("PREVISAO_CACHE_TTL", "0"))
+# Lotes maiores que isso vão direto ao modelo: o predict_proba vetorizado sai mais barato que N consultas ao cache
+PREVISAO_CACHE_LOTE_MAX = int(os.getenv("PREVISAO_CACHE_LOTE_MAX", "1000"))
+# Arquivo SQLite compartilhado entre os workers (vazio = só o cache em memória de cada processo)
+PREVISAO_CACHE_COMPARTILHADO = os.getenv("PREVISAO_CACHE_COMPARTILHADO", "")
+
+# --- CACHE DE RESPOSTAS ---
+# Bytes de JSON guardados para GET /projetos/, /projetos/{id} e /funcionarios/ (0 desliga o cache;
+# o ETag e o 304 continuam valendo)
+RESPOSTAS_CACHE_BYTES = int(os.getenv("RESPOSTAS_CACHE_BYTES", str(64 * 1024 * 1024)))
+# Segundos de validade: só uma rede de segurança para escritas feitas fora da API (0 = sem expiração)
+RESPOSTAS_CACHE_TTL = float(os.getenv("RESPOSTAS_CACHE_TTL", "300"))
+# Arquivo SQLite com as versões das invalidações, compartilhado entre os workers (vazio = só no
+# processo; o python -m app.serve define um com vários workers)
+RESPOSTAS_CACHE_COMPARTILHADO = os.getenv("RESPOSTAS_CACHE_COMPARTILHADO", "")
+
+# --- POOL DE CONEXÕES COM O BANCO ---
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "2"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "20"))
+# Segundos: vida máxima de uma conexão e tempo máximo ociosa antes de ser reciclada
+DB_POOL_MAX_VIDA = float(os.getenv("DB_POOL_MAX_VIDA", "1800"))
+DB_POOL_MAX_OCIOSO = float(os.getenv("DB_POOL_MAX_OCIOSO", "300"))
+# Conexões ociosas há mais que isso passam por um "SELECT 1" antes de serem entregues
+DB_POOL_VERIFICAR_APOS = float(os.getenv("DB_POOL_VERIFICAR_APOS", "10"))
+# Quanto tempo uma requisição espera por uma conexão livre antes de receber 503
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Conexões abertas no total por todos os workers do python -m app.serve: cada worker fica com
+# DB_CONEXOES_TOTAL // workers (no lugar do DB_POOL_MAX), para o SQL Server ver o mesmo limite
+# com 1 ou 8 workers
+DB_CONEXOES_TOTAL = int(os.getenv("DB_CONEXOES_TOTAL", str(DB_POOL_MAX)))
+
+# --- EXECUTORES ---
+# Threads dedicadas às consultas pyodbc; por padrão uma por conexão do pool
+DB_EXECUTOR_THREADS = int(os.getenv("DB_EXECUTOR_THREADS", str(DB_POOL_MAX)))
+# Threads dedicadas às previsões do modelo (CPU)
+PREVISAO_EXECUTOR_THREADS = int(os.getenv("PREVISAO_EXECUTOR_THREADS", str(os.cpu_count() or 1)))
+
+# --- LISTAGENS ---
+# Maior `limit` aceito nas listagens paginadas
+LISTAGEM_LIMITE_MAX = int(os.getenv("LISTAGEM_LIMITE_MAX", "10000"))
+# `limit` aplicado quando o cliente não informa nenhum (0 = sem limite, comportamento original)
+LISTAGEM_LIMITE_PADRAO = int(os.getenv("LISTAGEM_LIMITE_PADRAO", "0"))
+# Páginas das listagens vão direto do banco para o orjson, sem a validação pelo response_model
+# (0 = caminho original, validando cada linha; o JSON é o mesmo)
+RESPOSTAS_RAPIDAS = os.getenv("RESPOSTAS_RAPIDAS", "1") == "1"
+# Linhas lidas por fetchmany (e codificadas por bloco) nas listagens em streaming
+LISTAGEM_STREAM_LOTE = int(os.getenv("LISTAGEM_STREAM_LOTE", "1000"))
+
+# --- RESUMO DE PROJETOS ---
+# Máximo de IDs em GET /projetos/resumo (cada ID vira um parâmetro em cada um dos cinco SELECTs
+# do lote, e o SQL Server aceita no máximo 2100 parâmetros por comando)
+RESUMO_PROJETOS_MAX = int(os.getenv("RESUMO_PROJETOS_MAX", "200"))
+
+# --- INSERÇÃO EM LOTE ---
+# Linhas por bloco nos endpoints /bulk (um executemany + um INSERT ... SELECT por bloco)
+INSERCAO_TAMANHO_LOTE = int(os.getenv("INSERCAO_TAMANHO_LOTE", "1000"))
+# Maior `tamanho_lote` aceito na query dos endpoints /bulk
+INSERCAO_TAMANHO_LOTE_MAX = int(os.getenv("INSERCAO_TAMANHO_LOTE_MAX", "10000"))
+
+# --- MOTOR DE ALERTAS ---
+# Segundos entre os ciclos do motor de alertas em segundo plano (0 = desligado; os ciclos
+# podem ser disparados por POST /alertas/processar). Com vários workers, ligar em só um deles.
+ALERTAS_INTERVALO = float(os.getenv("ALERTAS_INTERVALO", "0"))
+# Probabilidade de atraso a partir da qual uma tarefa aberta gera alerta de severidade Alta / Média
+ALERTAS_LIMIAR_ALTA = float(os.getenv("ALERTAS_LIMIAR_ALTA", "0.8"))
+ALERTAS_LIMIAR_MEDIA = float(os.getenv("ALERTAS_LIMIAR_MEDIA", "0.6"))
+# Tarefas alteradas lidas por bloco; cada bloco é pontuado e gravado em uma transação
+ALERTAS_TAMANHO_BLOCO = int(os.getenv("ALERTAS_TAMANHO_BLOCO", "5000"))
+
+# --- ALOCAÇÕES ---
+# Segundos entre as recargas completas do índice de alocações em memória: só uma rede de
+# segurança para escritas feitas fora da API (0 = carrega uma vez e segue só pelas escritas)
+ALOCACOES_INDICE_TTL = float(os.getenv("ALOCACOES_INDICE_TTL", "300"))
+
+# --- TREINAMENTO (python -m app.treinamento) ---
+# Pasta do cache das features extraídas (Parquet + marca da última extração)
+TREINAMENTO_CACHE_DIR = os.getenv("TREINAMENTO_CACHE_DIR", os.path.join(MODELOS_DIR, "dados_treino"))
+# Linhas lidas do banco por fetchmany durante a extração
+TREINAMENTO_TAMANHO_BLOCO = int(os.getenv("TREINAMENTO_TAMANHO_BLOCO", "50000"))
+
+# --- SERVIDOR (python -m app.serve) ---
+SERVIDOR_HOST = os.getenv("SERVIDOR_HOST", "127.0.0.1")
+SERVIDOR_PORTA = int(os.getenv("SERVIDOR_PORTA", "8000"))
+# Processos que atendem as requisições (o modelo é carregado uma vez, antes do fork)
+SERVIDOR_WORKERS = int(os.getenv("SERVIDOR_WORKERS", str(os.cpu_count() or 1)))
+# Segundos que cada worker espera as requisições em andamento terminarem depois do SIGTERM
+SERVIDOR_DRENAGEM_TIMEOUT = float(os.getenv("SERVIDOR_DRENAGEM_TIMEOUT", "30"))
+
+# --- DIAGNÓSTICO ---
+# Modo de depuração: ?profile=1 em qualquer rota devolve o relatório do cProfile no lugar da resposta
+PERFIL_HABILITADO = os.getenv("PERFIL_HABILITADO", "0") == "1"
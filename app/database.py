@@ -1,17 +1,151 @@
 # Arquivo: solarys_api/app/database.py
 
+import asyncio
+import contextlib
+import threading
+import time
+import weakref
+
 import pyodbc
-from . import config
+from fastapi import HTTPException, status
+
+from . import config, metricas
+from .executores import EstatisticaEspera, executor_db
+from .pool import PoolConexoes, TempoEsgotadoPool
+
+_pool = None
+_trava_pool = threading.Lock()
+
+# Um semáforo por event loop limita as requisições com conexão ao tamanho máximo do pool.
+# A espera por uma conexão livre acontece aqui, no event loop, e não dentro de uma thread
+# do executor_db: assim as threads ficam livres para as consultas de quem já tem conexão.
+_semaforos = weakref.WeakKeyDictionary()
+espera_conexao = EstatisticaEspera()
+
+# Conexões entregues pela dependência (id da ConexaoMedida -> (conexão do pool, semáforo))
+# e as que foram transferidas para um stream
+_conexoes_em_uso = {}
+_conexoes_transferidas = set()
+
+
+def get_pool() -> PoolConexoes:
+    """Cria o pool na primeira chamada (e não no import) para a API subir sem depender do banco."""
+    global _pool
+    if _pool is None:
+        with _trava_pool:
+            if _pool is None:
+                # Nota: Não usamos autocommit=True aqui para termos controle sobre as transações.
+                pool = PoolConexoes(
+                    metricas.medir_fabrica(lambda: pyodbc.connect(config.DATABASE_URL)),
+                    tamanho_minimo=config.DB_POOL_MIN,
+                    tamanho_maximo=config.DB_POOL_MAX,
+                    tempo_max_vida=config.DB_POOL_MAX_VIDA,
+                    tempo_max_ocioso=config.DB_POOL_MAX_OCIOSO,
+                    verificar_apos=config.DB_POOL_VERIFICAR_APOS,
+                    timeout_espera=config.DB_POOL_TIMEOUT,
+                )
+                try:
+                    pool.preencher()
+                except pyodbc.Error as ex:
+                    print(f"Erro ao pré-abrir conexões do pool: {ex}")
+                _pool = pool
+    return _pool
+
 
-def get_db_connection():
+def usar_pool(pool: PoolConexoes):
+    """Troca o pool global (ex.: por um pool do banco local nos benchmarks offline)."""
+    global _pool
+    with _trava_pool:
+        _pool = pool
 
-    conn = None
+
+def fechar_pool():
+    """Fecha as conexões ociosas do pool, se ele chegou a ser criado (desligamento da API)."""
+    global _pool
+    with _trava_pool:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.fechar()
+
+
+def _semaforo_conexoes() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaforo = _semaforos.get(loop)
+    if semaforo is None:
+        semaforo = _semaforos[loop] = asyncio.Semaphore(config.DB_POOL_MAX)
+    return semaforo
+
+
+async def _liberar_conexao(conn, semaforo: asyncio.Semaphore):
     try:
-        # Nota: Não usamos autocommit=True aqui para termos controle sobre as transações.
-        conn = pyodbc.connect(config.DATABASE_URL)
-        yield conn
+        # Devolve ao pool com rollback: um handler que falhou não deixa transação aberta
+        await executor_db.executar(get_pool().devolver, conn)
+    finally:
+        semaforo.release()
+
+
+def transferir_conexao(conn):
+    """
+    Passa para quem chamou a responsabilidade de devolver `conn` (ex.: um StreamingResponse,
+    que continua lendo do cursor depois que a dependência get_db_connection já terminou).
+    Devolve uma corrotina sem argumentos que libera a conexão; ela deve ser chamada uma vez.
+    """
+    conexao, semaforo = _conexoes_em_uso[id(conn)]
+    _conexoes_transferidas.add(id(conn))
+
+    async def liberar():
+        await _liberar_conexao(conexao, semaforo)
+    return liberar
+
+
+async def get_db_connection():
+
+    semaforo = _semaforo_conexoes()
+    inicio = time.perf_counter()
+    espera_conexao.entrou()
+    try:
+        await asyncio.wait_for(semaforo.acquire(), timeout=config.DB_POOL_TIMEOUT)
+    except asyncio.TimeoutError:
+        print(f"Pool de conexões esgotado: nenhuma conexão livre após {config.DB_POOL_TIMEOUT:.1f}s")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Banco de dados sobrecarregado, tente novamente.")
+    finally:
+        espera = time.perf_counter() - inicio
+        espera_conexao.saiu(espera)
+        metricas.checkout_segundos.observar(espera, "fila")
+
+    inicio = time.perf_counter()
+    try:
+        # Abrir uma conexão nova (handshake com o SQL Server) também bloqueia: vai para o executor
+        conn = await executor_db.executar(get_pool().obter)
     except pyodbc.Error as ex:
+        semaforo.release()
         print(f"Erro de conexão com o banco de dados: {ex}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Banco de dados indisponível.")
+    except TempoEsgotadoPool as ex:
+        semaforo.release()
+        print(f"Pool de conexões esgotado: {ex}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Banco de dados sobrecarregado, tente novamente.")
+    except BaseException:
+        semaforo.release()
+        raise
+
+    metricas.checkout_segundos.observar(time.perf_counter() - inicio, "pool")
+
+    # Os endpoints recebem a conexão com cursores medidos (tempo de execute/fetch por comando)
+    db = metricas.ConexaoMedida(conn)
+    _conexoes_em_uso[id(db)] = (conn, semaforo)
+    try:
+        yield db
     finally:
-        if conn:
-            conn.close()
\ No newline at end of file
+        del _conexoes_em_uso[id(db)]
+        if id(db) in _conexoes_transferidas:
+            # Quem recebeu a conexão (transferir_conexao) é que vai devolvê-la
+            _conexoes_transferidas.discard(id(db))
+        else:
+            await _liberar_conexao(conn, semaforo)
+
+
+# Mesma conexão da dependência, para quem só precisa do banco em parte das chamadas
+# (ex.: as leituras em cache, que numa resposta do cache não retiram conexão nenhuma):
+#   async with abrir_conexao() as db: ...
+abrir_conexao = contextlib.asynccontextmanager(get_db_connection)
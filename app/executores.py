@@ -0,0 +1,120 @@
+# Arquivo: solarys_api/app/executores.py
+
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import config, perfil
+
+
+class EstatisticaEspera:
+    """Contadores thread-safe de uma fila: quantos esperam agora e quanto tempo esperaram."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.na_fila = 0
+        self.pico_fila = 0
+        self.atendidos = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+
+    def entrou(self):
+        with self._trava:
+            self.na_fila += 1
+            self.pico_fila = max(self.pico_fila, self.na_fila)
+
+    def saiu(self, espera: float):
+        with self._trava:
+            self.na_fila -= 1
+            self.atendidos += 1
+            self.espera_total += espera
+            self.espera_max = max(self.espera_max, espera)
+
+    def metricas(self) -> dict:
+        with self._trava:
+            return {
+                "na_fila": self.na_fila,
+                "pico_fila": self.pico_fila,
+                "atendidos": self.atendidos,
+                "espera_media_ms": (self.espera_total / self.atendidos * 1000) if self.atendidos else 0.0,
+                "espera_max_ms": self.espera_max * 1000,
+            }
+
+
+class ExecutorMedido:
+    """
+    ThreadPoolExecutor dedicado, com profundidade de fila, tempo de espera e tempo de
+    execução medidos. Os endpoints `async def` fazem `await executor.executar(funcao)`
+    e o event loop fica livre enquanto a função bloqueante roda em uma das threads.
+    """
+
+    def __init__(self, nome: str, max_workers: int):
+        self.nome = nome
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"solarys-{nome}")
+        self._fila = EstatisticaEspera()
+        self._trava = threading.Lock()
+        self._ativos = 0
+        self._execucao_total = 0.0
+        self._execucao_max = 0.0
+        self._erros = 0
+
+    async def executar(self, funcao, *args):
+        loop = asyncio.get_running_loop()
+        # Copia o contexto (contextvars) da requisição para a thread, como o run_in_threadpool faz
+        contexto = contextvars.copy_context()
+        enviado_em = time.perf_counter()
+        self._fila.entrou()
+
+        def tarefa():
+            inicio = time.perf_counter()
+            self._fila.saiu(inicio - enviado_em)
+            with self._trava:
+                self._ativos += 1
+            try:
+                # perfil.executar só liga o cProfile se a requisição pediu ?profile=1
+                return contexto.run(perfil.executar, funcao, *args)
+            except Exception:
+                with self._trava:
+                    self._erros += 1
+                raise
+            finally:
+                duracao = time.perf_counter() - inicio
+                with self._trava:
+                    self._ativos -= 1
+                    self._execucao_total += duracao
+                    self._execucao_max = max(self._execucao_max, duracao)
+
+        futuro = loop.run_in_executor(self._executor, tarefa)
+        try:
+            return await asyncio.shield(futuro)
+        except asyncio.CancelledError:
+            # Cliente desconectou: esperamos a thread terminar antes de propagar, para que a
+            # conexão não volte ao pool (com rollback) enquanto ainda está sendo usada.
+            await asyncio.wait([futuro])
+            raise
+
+    def metricas(self) -> dict:
+        with self._trava:
+            execucao = {
+                "threads": self.max_workers,
+                "ativos": self._ativos,
+                "erros": self._erros,
+                "execucao_max_ms": self._execucao_max * 1000,
+            }
+            execucao_total = self._execucao_total
+        fila = self._fila.metricas()
+        execucao["execucao_media_ms"] = (execucao_total / fila["atendidos"] * 1000) if fila["atendidos"] else 0.0
+        return {**execucao, **fila}
+
+    def desligar(self, esperar: bool = True):
+        self._executor.shutdown(wait=esperar)
+
+
+# Executor das consultas ao banco (pyodbc bloqueia a thread durante toda a ida ao SQL Server)
+executor_db = ExecutorMedido("banco", config.DB_EXECUTOR_THREADS)
+
+# Executor das previsões do modelo (CPU), separado para não disputar threads com o banco
+executor_previsao = ExecutorMedido("previsao", config.PREVISAO_EXECUTOR_THREADS)
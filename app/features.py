@@ -0,0 +1,119 @@
+# Arquivo: solarys_api/app/features.py
+# Extração das features do modelo de atraso direto do banco, com a mesma lógica de
+# DATEDIFF do notebook de treinamento (01_analise_exploratoria.ipynb), para prever
+# pelo TarefaID sem o cliente ter que montar o TarefaPredictionInput.
+
+from . import metricas
+
+# DuracaoPrevista, MesInicioPrevisto e DiaDaSemanaInicioPrevisto são calculados como no
+# notebook. 1900-01-01 foi uma segunda-feira: DATEDIFF(...) % 7 dá segunda=0 ... domingo=6
+# (o mesmo que .dt.dayofweek do pandas) sem depender do SET DATEFIRST da sessão.
+#
+# DiferencaDuracao (DuracaoReal - DuracaoPrevista) só existe para tarefas concluídas. Nas
+# tarefas em andamento usamos o atraso já acumulado até hoje (nunca negativo) e nas que
+# ainda não começaram, 0 (sem desvio conhecido).
+#
+# O texto é um modelo: {filtro} é a condição sobre Tarefas t / Projetos p, {extras_internos}
+# e {extras} acrescentam colunas (ex.: o ProjetoID e a versão da linha, usados pelo motor
+# de alertas) e {ordem} ordena (e pode limitar, com OFFSET/FETCH) o resultado.
+SQL_FEATURES_TAREFAS = """
+SELECT
+    f.TarefaID,
+    f.DuracaoPrevista,
+    f.StatusProjeto,
+    f.MesInicioPrevisto,
+    f.DiaDaSemanaInicioPrevisto,
+    CASE
+        WHEN f.DuracaoReal IS NULL THEN 0
+        WHEN f.Concluida = 1 THEN f.DuracaoReal - f.DuracaoPrevista
+        WHEN f.DuracaoReal > f.DuracaoPrevista THEN f.DuracaoReal - f.DuracaoPrevista
+        ELSE 0
+    END AS DiferencaDuracao{extras}
+FROM (
+    SELECT
+        t.TarefaID,
+        DATEDIFF(day, t.DataInicioPrevista, t.DataFimPrevista) AS DuracaoPrevista,
+        p.Status AS StatusProjeto,
+        MONTH(t.DataInicioPrevista) AS MesInicioPrevisto,
+        DATEDIFF(day, '19000101', t.DataInicioPrevista) % 7 AS DiaDaSemanaInicioPrevisto,
+        DATEDIFF(day, t.DataInicioReal, COALESCE(t.DataFimReal, GETDATE())) AS DuracaoReal,
+        CASE WHEN t.DataFimReal IS NULL THEN 0 ELSE 1 END AS Concluida{extras_internos}
+    FROM Tarefas t
+    JOIN Projetos p ON p.ProjetoID = t.ProjetoID
+    WHERE {filtro}
+) AS f
+ORDER BY {ordem}
+"""
+
+# Colunas de SQL_FEATURES_TAREFAS que formam o TarefaPredictionInput, na ordem do SELECT
+CAMPOS_FEATURES = ("DuracaoPrevista", "StatusProjeto", "MesInicioPrevisto", "DiaDaSemanaInicioPrevisto", "DiferencaDuracao")
+
+
+def montar_sql_features(filtro: str, ordem: str = "f.TarefaID", extras: tuple = ()) -> str:
+    """
+    SQL das features com a condição `filtro`. `extras` são pares (expressão sobre t/p, alias)
+    devolvidos depois das features; "Concluida" também pode ser pedida como extra (sem expressão).
+    """
+    extras_internos = "".join(f",\n        {expressao} AS {alias}" for expressao, alias in extras if expressao)
+    colunas_extras = "".join(f",\n    f.{alias}" for _, alias in extras)
+    return SQL_FEATURES_TAREFAS.format(
+        filtro=filtro, ordem=ordem, extras=colunas_extras, extras_internos=extras_internos
+    )
+
+
+def versao_linha(valor) -> int:
+    # rowversion chega do pyodbc como 8 bytes big-endian (no banco local já é inteiro)
+    return int.from_bytes(valor, "big") if isinstance(valor, (bytes, bytearray)) else int(valor)
+
+
+# Só estes filtros são aceitos (o nome da coluna entra no texto do SQL)
+FILTROS = ("TarefaID", "ProjetoID")
+
+
+def extrair_features_tarefas(db, coluna_filtro: str, valor: int) -> tuple:
+    """
+    Devolve (TarefaIDs, lista de dicts no formato do TarefaPredictionInput) das tarefas
+    com `coluna_filtro` = valor, em ordem de TarefaID.
+    """
+    if coluna_filtro not in FILTROS:
+        raise ValueError(f"Filtro inválido: {coluna_filtro}")
+    cursor = db.cursor()
+    cursor.execute(montar_sql_features(f"t.{coluna_filtro} = ?"), valor)
+    columns = [column[0] for column in cursor.description]
+    rows = cursor.fetchall()
+    cursor.close()
+
+    with metricas.serializacao_segundos.medir("linhas"):
+        ids = [row[0] for row in rows]
+        lista_dados = [dict(zip(columns[1:], row[1:])) for row in rows]
+    return ids, lista_dados
+
+
+# --- CODIFICAÇÃO (a mesma no treinamento e na API) ---
+# Campos categóricos viram uma coluna 0/1 por categoria, '<Campo>_<Categoria>' (o formato do
+# get_dummies do notebook), e a previsão lê essas colunas por predicao.extratores_features.
+# Sem drop_first: com uma categoria só nos dados (todos os projetos "Em Andamento"), o
+# get_dummies(drop_first=True) do notebook não gerou coluna nenhuma e o v1 ignora o StatusProjeto.
+CAMPOS_CATEGORICOS = ("StatusProjeto",)
+
+
+def colunas_modelo(categorias: dict) -> list:
+    """
+    Colunas do modelo na ordem de CAMPOS_FEATURES: os campos numéricos como estão e, para cada
+    campo categórico, uma coluna por categoria de `categorias[campo]` (em ordem alfabética).
+    """
+    colunas = []
+    for campo in CAMPOS_FEATURES:
+        if campo in CAMPOS_CATEGORICOS:
+            colunas += [f"{campo}_{categoria}" for categoria in sorted(categorias[campo])]
+        else:
+            colunas.append(campo)
+    return colunas
+
+
+def campos_sem_coluna(colunas: list, campos=CAMPOS_FEATURES) -> list:
+    """Campos de entrada que nenhuma coluna do modelo usa: a previsão os ignora sem avisar."""
+    return [
+        campo for campo in campos
+        if campo not in colunas and not any(coluna.startswith(f"{campo}_") for coluna in colunas)
+    ]
@@ -0,0 +1,80 @@
+# Arquivo: solarys_api/app/insercao.py
+# Inserção em lote (endpoints /bulk): as linhas vão para uma tabela temporária com
+# fast_executemany e de lá para a tabela real em um único INSERT ... SELECT por bloco,
+# tudo na mesma transação. Um round trip e um commit por bloco, e não por linha.
+
+from .listagem import Tabela
+
+# Coluna com a posição de cada linha na requisição (só existe na tabela temporária)
+COLUNA_ORDEM = "Ordem"
+
+
+def colunas_insercao(tabela: Tabela) -> list:
+    """Colunas gravadas no INSERT: todas as do schema, menos o ID (IDENTITY)."""
+    return [coluna for coluna in tabela.colunas if coluna != tabela.coluna_id]
+
+
+def _blocos(itens: list, tamanho_lote: int):
+    for inicio in range(0, len(itens), tamanho_lote):
+        yield inicio, itens[inicio:inicio + tamanho_lote]
+
+
+def _ler_coluna(item, coluna: str):
+    # Schemas *Create (atributos) ou dicts montados pela própria API (ex.: o motor de alertas)
+    return item[coluna] if isinstance(item, dict) else getattr(item, coluna)
+
+
+def inserir_blocos(db, tabela: Tabela, itens: list, tamanho_lote: int) -> list:
+    """
+    Insere os itens em blocos de `tamanho_lote` e devolve os IDs gerados na mesma ordem da
+    entrada, SEM commit: quem chama decide o que mais entra na mesma transação.
+
+    A ordem dos IDs é garantida pelo SQL Server: em um INSERT ... SELECT ... ORDER BY os
+    valores de IDENTITY são gerados na ordem do ORDER BY (a ordem das linhas do OUTPUT não
+    é), então basta ordenar os IDs devolvidos por cada bloco.
+    """
+    if not itens:
+        return []
+
+    colunas = colunas_insercao(tabela)
+    lista_colunas = ", ".join(colunas)
+    temporaria = f"#Lote{tabela.nome}"
+    sql_temporaria = f"INSERT INTO {temporaria} ({COLUNA_ORDEM}, {lista_colunas}) VALUES ({', '.join('?' * (len(colunas) + 1))})"
+    sql_destino = (
+        f"INSERT INTO {tabela.nome} ({lista_colunas}) OUTPUT INSERTED.{tabela.coluna_id} "
+        f"SELECT {lista_colunas} FROM {temporaria} ORDER BY {COLUNA_ORDEM}"
+    )
+
+    cursor = db.cursor()
+    try:
+        # Copia os tipos das colunas da tabela real (TOP 0: só a estrutura)
+        cursor.execute(f"SELECT TOP 0 CAST(0 AS INT) AS {COLUNA_ORDEM}, {lista_colunas} INTO {temporaria} FROM {tabela.nome}")
+        cursor.fast_executemany = True
+
+        ids = []
+        for inicio, bloco in _blocos(itens, tamanho_lote):
+            linhas = [(inicio + i, *(_ler_coluna(item, coluna) for coluna in colunas)) for i, item in enumerate(bloco)]
+            cursor.executemany(sql_temporaria, linhas)
+            cursor.execute(sql_destino)
+            ids.extend(sorted(row[0] for row in cursor.fetchall()))
+            cursor.execute(f"TRUNCATE TABLE {temporaria}")
+
+        cursor.execute(f"DROP TABLE {temporaria}")
+        return ids
+    finally:
+        cursor.close()
+
+
+def inserir_lote(db, tabela: Tabela, itens: list, tamanho_lote: int) -> list:
+    """
+    Insere os itens (schemas *Create) com `inserir_blocos` e grava tudo em um commit.
+    Se qualquer bloco falhar, nada é gravado (rollback).
+    """
+    try:
+        ids = inserir_blocos(db, tabela, itens, tamanho_lote)
+        db.commit()
+        return ids
+    except Exception:
+        # O rollback também desfaz a criação da tabela temporária
+        db.rollback()
+        raise
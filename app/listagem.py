@@ -0,0 +1,241 @@
+# Arquivo: solarys_api/app/listagem.py
+# Paginação por cursor (keyset na coluna de ID), projeção de colunas, filtros simples e
+# modo streaming, compartilhados por todos os endpoints de listagem.
+
+import datetime
+from dataclasses import dataclass
+
+import anyio
+from fastapi import Header, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+
+from . import config, metricas, schemas, serializacao, transmissao
+from .database import transferir_conexao
+from .executores import executor_db
+
+# Cabeçalho com o valor a passar em `after` para buscar a próxima página
+CABECALHO_PROXIMO_CURSOR = "X-Proximo-Cursor"
+
+
+@dataclass(frozen=True)
+class Tabela:
+    nome: str
+    coluna_id: str
+    colunas: tuple
+    coluna_status: str | None = None
+    coluna_data: str | None = None
+    # Schema de resposta: as conversões da fábrica de linhas (serializacao.fabrica_linhas)
+    modelo: type | None = None
+
+
+def _tabela(nome: str, modelo, coluna_id: str, coluna_status: str | None = None, coluna_data: str | None = None) -> Tabela:
+    # As colunas vêm do schema de resposta: só elas podem aparecer no SELECT (whitelist para `fields`)
+    colunas = (coluna_id,) + tuple(campo for campo in modelo.model_fields if campo != coluna_id)
+    return Tabela(nome, coluna_id, colunas, coluna_status, coluna_data, modelo)
+
+
+PROJETOS = _tabela("Projetos", schemas.Projeto, "ProjetoID", coluna_status="Status", coluna_data="DataInicio")
+TAREFAS = _tabela("Tarefas", schemas.Tarefa, "TarefaID", coluna_status="Status", coluna_data="DataInicioPrevista")
+RECURSOS_FINANCEIROS = _tabela("RecursosFinanceiros", schemas.RecursoFinanceiro, "RecursoFinanceiroID", coluna_data="Data")
+MATERIAIS = _tabela("Materiais", schemas.Material, "MaterialID")
+FUNCIONARIOS = _tabela("Funcionarios", schemas.Funcionario, "FuncionarioID", coluna_status="Status")
+ALOCACOES = _tabela("AlocacaoFuncionarios", schemas.AlocacaoFuncionario, "AlocacaoID", coluna_data="DataInicioAlocacao")
+ALERTAS = _tabela("AlertasAI", schemas.AlertaAI, "AlertaID", coluna_status="Status", coluna_data="DataGeracao")
+SUGESTOES = _tabela("SugestoesAI", schemas.SugestaoAI, "SugestaoID", coluna_status="StatusAprovacao")
+
+
+@dataclass(frozen=True)
+class ParametrosListagem:
+    limit: int | None = None
+    after: int | None = None
+    fields: tuple | None = None
+    status: str | None = None
+    data_de: datetime.date | None = None
+    data_ate: datetime.date | None = None
+    # None = resposta normal; FORMATO_JSON / FORMATO_NDJSON = streaming
+    formato_stream: str | None = None
+
+
+def parametros_listagem(
+    limit: int | None = Query(None, ge=1, le=config.LISTAGEM_LIMITE_MAX, description="Máximo de linhas na página."),
+    after: int | None = Query(None, description=f"Cursor: devolve só IDs maiores que este (veja o cabeçalho {CABECALHO_PROXIMO_CURSOR})."),
+    fields: str | None = Query(None, description="Colunas a devolver, separadas por vírgula (o ID sempre vem)."),
+    status: str | None = Query(None, description="Filtra pela coluna Status (Projetos, Tarefas, Funcionários, Alertas e Sugestões)."),
+    data_de: datetime.date | None = Query(None, description="Data inicial (inclusive) da coluna de data principal."),
+    data_ate: datetime.date | None = Query(None, description="Data final (inclusive) da coluna de data principal."),
+    stream: bool = Query(False, description="Envia as linhas em streaming (array JSON), lendo o banco aos blocos."),
+    accept: str | None = Header(None, include_in_schema=False),
+) -> ParametrosListagem:
+    """Dependência com os parâmetros de query comuns a todas as listagens."""
+    campos = tuple(campo.strip() for campo in fields.split(",") if campo.strip()) if fields else None
+    if limit is None and config.LISTAGEM_LIMITE_PADRAO:
+        limit = config.LISTAGEM_LIMITE_PADRAO
+
+    # Streaming é opcional: Accept: application/x-ndjson (uma linha JSON por registro) ou ?stream=true
+    formato_stream = None
+    if accept and transmissao.MEDIA_TYPES[transmissao.FORMATO_NDJSON] in accept:
+        formato_stream = transmissao.FORMATO_NDJSON
+    elif stream:
+        formato_stream = transmissao.FORMATO_JSON
+    return ParametrosListagem(limit, after, campos, status, data_de, data_ate, formato_stream)
+
+
+def resolver_colunas(tabela: Tabela, campos: tuple | None) -> list:
+    """Transforma `fields` em uma lista explícita de colunas, sempre começando pelo ID (usado pelo cursor)."""
+    if not campos:
+        return list(tabela.colunas)
+    desconhecidas = [campo for campo in campos if campo not in tabela.colunas]
+    if desconhecidas:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos inválidos para {tabela.nome}: {', '.join(desconhecidas)}. Disponíveis: {', '.join(tabela.colunas)}."
+        )
+    return [tabela.coluna_id] + [campo for campo in dict.fromkeys(campos) if campo != tabela.coluna_id]
+
+
+def montar_consulta(tabela: Tabela, parametros: ParametrosListagem, filtros: dict | None = None, linha_extra: bool = True):
+    """
+    Monta o SELECT (colunas explícitas, WHERE, ORDER BY no ID e limite) e devolve (sql, params, colunas).
+    Com `linha_extra` busca uma linha além do limite, para saber se existe próxima página.
+    """
+    colunas = resolver_colunas(tabela, parametros.fields)
+    condicoes, params = [], []
+
+    for coluna, valor in (filtros or {}).items():
+        condicoes.append(f"{coluna} = ?")
+        params.append(valor)
+
+    if parametros.after is not None:
+        condicoes.append(f"{tabela.coluna_id} > ?")
+        params.append(parametros.after)
+
+    if parametros.status is not None:
+        if not tabela.coluna_status:
+            raise HTTPException(status_code=400, detail=f"{tabela.nome} não tem filtro por status.")
+        condicoes.append(f"{tabela.coluna_status} = ?")
+        params.append(parametros.status)
+
+    if parametros.data_de is not None or parametros.data_ate is not None:
+        if not tabela.coluna_data:
+            raise HTTPException(status_code=400, detail=f"{tabela.nome} não tem filtro por data.")
+        if parametros.data_de is not None:
+            condicoes.append(f"{tabela.coluna_data} >= ?")
+            params.append(parametros.data_de)
+        if parametros.data_ate is not None:
+            # "< dia seguinte" inclui o dia inteiro também nas colunas datetime
+            condicoes.append(f"{tabela.coluna_data} < ?")
+            params.append(parametros.data_ate + datetime.timedelta(days=1))
+
+    sql = f"SELECT {', '.join(colunas)} FROM {tabela.nome}"
+    if condicoes:
+        sql += " WHERE " + " AND ".join(condicoes)
+    sql += f" ORDER BY {tabela.coluna_id}"
+    if parametros.limit is not None:
+        sql += " OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY"
+        params.append(parametros.limit + 1 if linha_extra else parametros.limit)
+    return sql, params, colunas
+
+
+def listar(db, tabela: Tabela, parametros: ParametrosListagem, filtros: dict | None = None):
+    """Executa a listagem e devolve (linhas como dicts, cursor da próxima página ou None)."""
+    sql, params, _ = montar_consulta(tabela, parametros, filtros)
+    cursor = db.cursor()
+    cursor.execute(sql, *params)
+    columns = [column[0] for column in cursor.description]
+    rows = cursor.fetchall()
+
+    proximo_cursor = None
+    if parametros.limit is not None and len(rows) > parametros.limit:
+        rows = rows[:parametros.limit]
+        proximo_cursor = rows[-1][0]
+    with metricas.serializacao_segundos.medir("linhas"):
+        linhas = list(map(serializacao.fabrica_linhas(tabela.modelo, tuple(columns)), rows))
+    return linhas, proximo_cursor
+
+
+def responder(linhas: list, proximo_cursor, parametros: ParametrosListagem, response: Response):
+    """
+    Devolve a página com o cursor no cabeçalho. No caminho rápido (RESPOSTAS_RAPIDAS) as linhas
+    vão direto para o orjson; senão, com `fields` as linhas não têm todos os campos do
+    response_model, então vão direto em um JSONResponse (sem validação do modelo).
+    """
+    cabecalhos = {CABECALHO_PROXIMO_CURSOR: str(proximo_cursor)} if proximo_cursor is not None else {}
+    if config.RESPOSTAS_RAPIDAS:
+        return serializacao.RespostaRapida(linhas, headers=cabecalhos)
+    if parametros.fields:
+        with metricas.serializacao_segundos.medir("jsonable"):
+            conteudo = jsonable_encoder(linhas)
+        return metricas.RespostaJSONMedida(conteudo, headers=cabecalhos)
+    response.headers.update(cabecalhos)
+    return linhas
+
+
+def serializar_pagina(linhas: list, proximo_cursor, parametros: ParametrosListagem, adaptador) -> tuple:
+    """
+    Bytes JSON da página (e os cabeçalhos), iguais aos que `responder` produziria: pelo
+    orjson no caminho rápido, com `fields` pelo jsonable_encoder, senão validando pelo
+    response_model (`adaptador`, um TypeAdapter).
+    """
+    cabecalhos = {CABECALHO_PROXIMO_CURSOR: str(proximo_cursor)} if proximo_cursor is not None else {}
+    with metricas.serializacao_segundos.medir("json"):
+        if config.RESPOSTAS_RAPIDAS:
+            corpo = serializacao.dumps(linhas)
+        elif parametros.fields:
+            corpo = JSONResponse(jsonable_encoder(linhas)).body
+        else:
+            corpo = adaptador.dump_json(adaptador.validate_python(linhas))
+    return corpo, cabecalhos
+
+
+def abrir_transmissao(db, tabela: Tabela, parametros: ParametrosListagem, filtros: dict | None = None):
+    """Executa a consulta e devolve o gerador de blocos de bytes (ainda sem ler nenhuma linha)."""
+    sql, params, _ = montar_consulta(tabela, parametros, filtros, linha_extra=False)
+    cursor = db.cursor()
+    cursor.execute(sql, *params)
+    return transmissao.iterar_blocos(cursor, parametros.formato_stream, config.LISTAGEM_STREAM_LOTE, parametros.limit)
+
+
+def transmitir(blocos, formato: str, liberar_conexao) -> StreamingResponse:
+    """
+    StreamingResponse que lê cada bloco no executor_db e o envia assim que fica pronto.
+    A conexão é devolvida ao terminar, quando o cliente desconecta ou, em último caso,
+    pela BackgroundTask (se o gerador nem chegar a ser iniciado).
+    """
+    liberada = False
+
+    async def fechar():
+        nonlocal liberada
+        if liberada:
+            return
+        liberada = True
+        try:
+            await executor_db.executar(blocos.close)
+        finally:
+            await liberar_conexao()
+
+    async def gerar():
+        try:
+            while True:
+                bloco = await executor_db.executar(next, blocos, None)
+                if bloco is None:
+                    break
+                yield bloco
+        finally:
+            # Blindado: se o cliente desconectou, o cancelamento não pode impedir a devolução da conexão
+            with anyio.CancelScope(shield=True):
+                await fechar()
+
+    return StreamingResponse(gerar(), media_type=transmissao.MEDIA_TYPES[formato], background=BackgroundTask(fechar))
+
+
+async def responder_listagem(db, tabela: Tabela, parametros: ParametrosListagem, response: Response, filtros: dict | None = None):
+    """Ponto único usado pelos endpoints de listagem: página normal ou streaming."""
+    if parametros.formato_stream:
+        # A consulta roda antes de responder, para que erros ainda virem um 400/500 normal
+        blocos = await executor_db.executar(abrir_transmissao, db, tabela, parametros, filtros)
+        return transmitir(blocos, parametros.formato_stream, transferir_conexao(db))
+
+    linhas, proximo_cursor = await executor_db.executar(listar, db, tabela, parametros, filtros)
+    return responder(linhas, proximo_cursor, parametros, response)
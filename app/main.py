@@ -1,180 +1,573 @@
-from fastapi import FastAPI, HTTPException, status, Depends
+from fastapi import FastAPI, HTTPException, status, Depends, Request, Response, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 import pyodbc
 from typing import List
 
-from . import schemas
-from .database import get_db_connection
-import joblib
-import json
-import pandas as pd
+from . import schemas, config, listagem, insercao, features, cache_previsao, modelos, metricas, perfil, resumo, cache_respostas, alertas, alocacoes
+from .database import get_db_connection, get_pool, espera_conexao, abrir_conexao, fechar_pool
+from .executores import executor_db, executor_previsao
+import asyncio
+import contextlib
+import datetime
 
-app = FastAPI(
-    title="SolarysAI API",
-    description="API para gerenciar dados de construção civil e fornecer insights de IA.",
-    version="1.0.0"
+# --- CARREGAMENTO DO MODELO DE IA ---
+# O registro descobre as versões (modelo_atraso_v<N>.joblib + colunas_modelo_v<N>.json) no
+# diretório de modelos e carrega a mais nova quando a API inicia, em segundo plano (veja o
+# lifespan abaixo): o servidor já atende enquanto isso e /health/ready só responde 200
+# depois que o modelo está aquecido. Versões novas também são carregadas em segundo plano
+# e trocadas sem interromper as requisições em andamento.
+#
+# O pandas/sklearn (app/predicao.py) só é importado junto com o modelo: com
+# MODELOS_CARREGAR=0 um worker só de CRUD nunca paga por eles.
+
+# Campos de entrada da previsão, usados para montar a matriz de features em lote
+CAMPOS_PREVISAO = list(schemas.TarefaPredictionInput.model_fields)
+
+registro = modelos.RegistroModelos(
+    config.MODELOS_DIR, CAMPOS_PREVISAO, mmap=config.MODELOS_MMAP, intervalo_verificacao=config.MODELOS_VERIFICAR_INTERVALO,
+    arquivo_estado=config.MODELOS_ESTADO_COMPARTILHADO
 )
 
-# Alias para a nossa função de conexão para facilitar o uso
-DbConnection = Depends(get_db_connection)
 
-@app.get("/", tags=["Root"])
+def _modelo_inicial_carregado(versao: modelos.VersaoModelo | None):
+    if versao is not None:
+        print(f"Modelo {versao.versao} carregado com sucesso em {versao.tempo_carga_s:.2f}s!")
+        if versao.arvore_compilada:
+            print("Árvore de decisão compilada para o caminho rápido de previsão.")
+    else:
+        print(f"ERRO: {registro.metricas()['ultimo_erro']}. Execute o notebook de treinamento primeiro.")
+
+# Cache das previsões por vetor de features, invalidado a cada troca de versão do modelo.
+# Só fica na frente do predict_proba do sklearn: a árvore compilada percorre a entrada no
+# mesmo tempo de uma consulta ao cache (~4 µs) e, em lote, é mais rápida que ele.
+cache = None
+if config.PREVISAO_CACHE_TAMANHO > 0:
+    backend_cache = cache_previsao.BackendSQLite(config.PREVISAO_CACHE_COMPARTILHADO) if config.PREVISAO_CACHE_COMPARTILHADO else None
+    cache = cache_previsao.CachePrevisao(config.PREVISAO_CACHE_TAMANHO, config.PREVISAO_CACHE_TTL, backend_cache)
+    registro.ao_trocar(lambda versao: cache.definir_versao(versao.impressao))
+
+
+def modelo_ativo() -> modelos.VersaoModelo:
+    """A versão ativa, lida uma vez por requisição (uma troca no meio não afeta quem já começou)."""
+    versao = registro.ativo
+    if versao is None:
+        if registro.carregando is not None:
+            # Subida da API: o modelo ainda está sendo carregado em segundo plano
+            raise HTTPException(status_code=503, detail="Modelo de IA ainda está carregando.", headers={"Retry-After": "1"})
+        raise HTTPException(status_code=500, detail="Modelo de IA não está carregado no servidor.")
+    return versao
 
-def read_root():
-    return {"message": "Bem-vindo à API SolarysAI"}
 
-# --------------------------------------------------------------------------
-# --- ENDPOINTS PARA PROJETOS ---
-# --------------------------------------------------------------------------
-# --- CARREGAMENTO DO MODELO DE IA ---
-# O modelo e as colunas são carregados UMA VEZ quando a API inicia.
-try:
-    print("Carregando modelo de IA e colunas...")
-    modelo_ia = joblib.load('modelo_atraso_v1.joblib')
-    with open('colunas_modelo_v1.json', 'r') as f:
-        colunas_modelo = json.load(f)
-    print("Modelo e colunas carregados com sucesso!")
-except FileNotFoundError:
-    print("ERRO: Arquivos do modelo não encontrados. Execute o notebook de treinamento primeiro.")
-    modelo_ia = None
-    colunas_modelo = None
+def prever_lista(versao: modelos.VersaoModelo, lista_dados: list, tamanho_lote: int = config.PREVISAO_TAMANHO_LOTE) -> list:
+    """Previsão vetorizada de uma lista de entradas, passando pelo cache quando compensa (roda no executor_previsao)."""
+    usar_cache = cache is not None and versao.arvore_compilada is None and len(lista_dados) <= config.PREVISAO_CACHE_LOTE_MAX
+    return versao.prever_lista(lista_dados, tamanho_lote, cache if usar_cache else None)
+
+
+# Pontuações em sombra em andamento (a referência evita que a tarefa seja coletada antes de terminar)
+_tarefas_sombra = set()
+
+
+def pontuar_em_sombra(lista_dados: list, probabilidades: list):
+    """Em uma amostra das chamadas, roda a versão candidata nas mesmas entradas, sem atrasar a resposta."""
+    sombra = registro.amostrar_sombra()
+    if sombra is None or not lista_dados:
+        return
+    tarefa = asyncio.ensure_future(executor_previsao.executar(
+        registro.pontuar_sombra, sombra, lista_dados, probabilidades, config.PREVISAO_TAMANHO_LOTE
+    ))
+    _tarefas_sombra.add(tarefa)
+    tarefa.add_done_callback(_tarefas_sombra.discard)
+
 # ------------------------------------
 
 
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Nada pesado antes do uvicorn abrir a porta: o modelo carrega em uma thread
+    # (com python -m app.serve ele já vem carregado do processo principal, antes do fork)
+    if config.MODELOS_CARREGAR:
+        if registro.ativo is None:
+            print("Carregando modelo de IA e colunas em segundo plano...")
+            registro.carregar_inicial_em_segundo_plano(_modelo_inicial_carregado)
+        registro.iniciar_monitoramento()
+    motor_alertas.iniciar()
+    yield
+    motor_alertas.parar()
+    registro.parar()
+    fechar_pool()
+
+
 app = FastAPI(
     title="SolarysAI API",
     description="API para gerenciar dados de construção civil e fornecer insights de IA.",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=metricas.RespostaJSONMedida,
+    lifespan=lifespan,
 )
 
+# Latência por rota (Prometheus em /metrics) e, em modo de depuração, o profiler do ?profile=1
+app.add_middleware(metricas.MiddlewareMetricas)
+if config.PERFIL_HABILITADO:
+    app.add_middleware(perfil.MiddlewarePerfil)
+
 # Alias para a nossa função de conexão
 DbConnection = Depends(get_db_connection)
 
+# Parâmetros comuns das listagens: limit/after (cursor), fields (projeção), status e datas
+Listagem = Depends(listagem.parametros_listagem)
+
+# Leituras frequentes que mudam pouco (projetos e funcionários) respondem do cache de JSON
+# já serializado; os handlers de escrita invalidam os marcadores que afetam
+cache_leituras = cache_respostas.CacheRespostas(
+    config.RESPOSTAS_CACHE_BYTES, config.RESPOSTAS_CACHE_TTL,
+    versoes=cache_respostas.VersoesSQLite(config.RESPOSTAS_CACHE_COMPARTILHADO) if config.RESPOSTAS_CACHE_COMPARTILHADO else None
+)
+ADAPTADOR_PROJETO = TypeAdapter(schemas.Projeto)
+ADAPTADOR_PROJETOS = TypeAdapter(List[schemas.Projeto])
+ADAPTADOR_FUNCIONARIOS = TypeAdapter(List[schemas.Funcionario])
+
+
+async def listar_em_cache(request: Request, tabela: listagem.Tabela, parametros: listagem.ParametrosListagem, marcadores: tuple, adaptador):
+    # A conexão só é retirada do pool numa falha do cache
+    async def gerar():
+        async with abrir_conexao() as db:
+            linhas, proximo_cursor = await executor_db.executar(listagem.listar, db, tabela, parametros)
+        return listagem.serializar_pagina(linhas, proximo_cursor, parametros, adaptador)
+    return await cache_respostas.responder_em_cache(
+        cache_leituras, request.headers.get("if-none-match"), (tabela.nome, parametros), marcadores, gerar
+    )
+
+# Linhas por bloco nos endpoints de inserção em lote (/bulk)
+TamanhoLote = Query(config.INSERCAO_TAMANHO_LOTE, ge=1, le=config.INSERCAO_TAMANHO_LOTE_MAX, description="Linhas por bloco de inserção.")
+
+
+async def inserir_em_lote(db, tabela: listagem.Tabela, itens: list, tamanho_lote: int) -> schemas.InsercaoLoteOutput:
+    # Tudo ou nada: uma linha inválida (ex.: ProjetoID inexistente) desfaz o lote inteiro
+    try:
+        ids = await executor_db.executar(insercao.inserir_lote, db, tabela, itens, tamanho_lote)
+    except pyodbc.IntegrityError as ex:
+        raise HTTPException(status_code=409, detail=f"Lote rejeitado, nenhuma linha foi inserida: {ex}")
+    return schemas.InsercaoLoteOutput(quantidade=len(ids), ids=ids)
+
 @app.get("/", tags=["Root"])
 def read_root():
     return {"message": "Bem-vindo à API SolarysAI com IA integrada!"}
 
 
+@app.get("/health/live", tags=["Diagnóstico"])
+def health_live():
+    # O processo está de pé e o event loop responde (não depende do banco nem do modelo)
+    return {"status": "ok"}
+
+
+@app.get("/health/ready", tags=["Diagnóstico"])
+def health_ready(response: Response):
+    # 200 só com o modelo aquecido (ou com MODELOS_CARREGAR=0, worker só de CRUD); senão 503
+    versao = registro.ativo
+    if versao is not None:
+        return {"status": "pronto", "modelo": versao.versao, "tempo_carga_s": versao.tempo_carga_s}
+    if not config.MODELOS_CARREGAR:
+        return {"status": "pronto", "modelo": None}
+    response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    if registro.carregando is not None:
+        response.headers["Retry-After"] = "1"
+        return {"status": "carregando", "modelo": None}
+    return {"status": "sem_modelo", "modelo": None, "erro": registro.metricas()["ultimo_erro"]}
+
+
+@app.get("/db/pool", tags=["Diagnóstico"])
+def get_metricas_pool():
+    # Conexões em uso/ociosas, reciclagens e tempo de espera por uma conexão livre
+    return {**get_pool().metricas(), "fila_conexao": espera_conexao.metricas()}
+
+
+@app.get("/prever/cache", tags=["Diagnóstico"])
+def get_metricas_cache_previsao():
+    # Acertos/falhas/remoções do cache de previsões e a versão do modelo a que as entradas pertencem
+    if cache is None:
+        return {"ativo": False, "motivo": "desligado (PREVISAO_CACHE_TAMANHO=0)"}
+    if registro.ativo is not None and registro.ativo.arvore_compilada is not None:
+        return {"ativo": False, "motivo": "árvore compilada", **cache.metricas()}
+    return {"ativo": True, **cache.metricas()}
+
+
+@app.get("/cache/respostas", tags=["Diagnóstico"])
+def get_metricas_cache_respostas():
+    # Taxa de acerto (geral e por rota), 304s, memória usada e invalidações do cache de respostas
+    return cache_leituras.metricas()
+
+
+@app.get("/executores", tags=["Diagnóstico"])
+def get_metricas_executores():
+    # Profundidade de fila, tempo de espera e tempo de execução de cada executor dedicado
+    return {executor.nome: executor.metricas() for executor in (executor_db, executor_previsao)}
+
+
+# Estado atual do pool, dos executores e do cache, lido a cada coleta do /metrics
+metricas.medidor(
+    "solarys_db_pool_conexoes", "Conexões do pool por estado.", ("estado",),
+    lambda: {(estado,): get_pool().metricas()[estado] for estado in ("em_uso", "ociosas")},
+)
+metricas.medidor(
+    "solarys_executor_tarefas", "Tarefas na fila e em execução em cada executor.", ("executor", "estado"),
+    lambda: {(executor.nome, estado): executor.metricas()[estado]
+             for executor in (executor_db, executor_previsao) for estado in ("na_fila", "ativos")},
+)
+metricas.medidor(
+    "solarys_previsao_cache_entradas", "Entradas no cache de previsões em memória.", (),
+    lambda: {(): cache.metricas()["tamanho"]} if cache is not None else {},
+)
+
+
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Diagnóstico"])
+def get_metrics():
+    # Histogramas de latência (rotas, banco, serialização e modelo) no formato do Prometheus
+    return PlainTextResponse(metricas.renderizar(), media_type=metricas.TIPO_CONTEUDO)
+
+
 # --------------------------------------------------------------------------
 # --- ENDPOINT DE PREVISÃO DA IA ---
 # --------------------------------------------------------------------------
 
 @app.post("/prever/tarefa-atraso/", response_model=schemas.PredictionOutput, tags=["Inteligência Artificial"])
-def prever_atraso_tarefa(dados_tarefa: schemas.TarefaPredictionInput):
+async def prever_atraso_tarefa(dados_tarefa: schemas.TarefaPredictionInput):
+
+    versao = modelo_ativo()
+    dados = vars(dados_tarefa)
+    if versao.arvore_compilada:
+        # Os campos já validados pelo Pydantic vão direto para a árvore, sem DataFrame.
+        # Percorrer a árvore leva microssegundos: roda no próprio event loop, mais barato que trocar de thread.
+        probabilidade = versao.probabilidade_um(dados)
+    elif cache is not None and cache.backend is None:
+        # Acerto no LRU em memória responde sem sair do event loop; só a falha vai ao modelo
+        chave = versao.vetor_features(dados)
+        probabilidade = cache.obter(chave) if cache.versao_modelo == versao.impressao else None
+        if probabilidade is None:
+            probabilidade = await executor_previsao.executar(versao.prever_vetor, chave)
+            cache.guardar(chave, probabilidade, versao.impressao)
+    else:
+        # Sem cache, ou com o cache compartilhado (I/O de disco): tudo no executor
+        previsoes = await executor_previsao.executar(prever_lista, versao, [dados])
+        probabilidade = previsoes[0]["probabilidade_de_atraso"]
+
+    pontuar_em_sombra([dados], [probabilidade])
+    return versao.formatar_previsao(probabilidade)
+
+
+@app.post("/prever/tarefa-atraso/lote/", response_model=List[schemas.PredictionOutput], tags=["Inteligência Artificial"])
+async def prever_atraso_tarefas_lote(lista_tarefas: List[schemas.TarefaPredictionInput]):
+
+    versao = modelo_ativo()
+    # Uma única matriz de features e um predict_proba por bloco, na mesma ordem da entrada
+    lista_dados = [tarefa.dict() for tarefa in lista_tarefas]
+    previsoes = await executor_previsao.executar(prever_lista, versao, lista_dados)
+    pontuar_em_sombra(lista_dados, [p["probabilidade_de_atraso"] for p in previsoes])
+    return previsoes
+
+
+async def _ler_linhas_ndjson(request: Request):
+    """Lê o corpo da requisição aos pedaços e devolve (número da linha, linha) das linhas não vazias."""
+    resto, numero_linha = b"", 0
+    async for pedaco in request.stream():
+        linhas = (resto + pedaco).split(b"\n")
+        resto = linhas.pop()
+        for linha in linhas:
+            numero_linha += 1
+            if linha.strip():
+                yield numero_linha, linha
+    if resto.strip():
+        yield numero_linha + 1, resto
+
+
+@app.post("/prever/tarefa-atraso/lote/ndjson/", tags=["Inteligência Artificial"])
+async def prever_atraso_tarefas_ndjson(request: Request):
+    """
+    Variante NDJSON: recebe um TarefaPredictionInput por linha e devolve, em streaming,
+    um PredictionOutput por linha, processando a entrada em blocos de PREVISAO_TAMANHO_LOTE.
+    """
+    versao = modelo_ativo()
+
+    # 1. Validar toda a entrada antes de responder: assim um erro ainda vira um 422 normal.
+    #    (O corpo não pode ser lido de dentro do StreamingResponse, que também consome o receive().)
+    entradas = []
+    async for numero_linha, linha in _ler_linhas_ndjson(request):
+        try:
+            entradas.append(schemas.TarefaPredictionInput.model_validate_json(linha).dict())
+        except ValidationError as ex:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={"linha": numero_linha, "erros": ex.errors(include_url=False, include_input=False)}
+            )
+
+    # 2. Prever e enviar bloco a bloco: o cliente recebe o primeiro bloco sem esperar o último
+    async def gerar_linhas():
+        tamanho_lote = config.PREVISAO_TAMANHO_LOTE
+        for inicio in range(0, len(entradas), tamanho_lote):
+            bloco = entradas[inicio:inicio + tamanho_lote]
+            previsoes = await executor_previsao.executar(prever_lista, versao, bloco, tamanho_lote)
+            pontuar_em_sombra(bloco, [p["probabilidade_de_atraso"] for p in previsoes])
+            yield b"".join(schemas.PredictionOutput(**p).model_dump_json().encode() + b"\n" for p in previsoes)
+
+    return StreamingResponse(gerar_linhas(), media_type="application/x-ndjson")
+
+
+async def prever_tarefas_do_banco(db, coluna_filtro: str, valor: int) -> list:
+    """Features calculadas no SQL (executor_db) e uma única chamada vetorizada ao modelo (executor_previsao)."""
+    versao = modelo_ativo()
+    ids, lista_dados = await executor_db.executar(features.extrair_features_tarefas, db, coluna_filtro, valor)
+    previsoes = await executor_previsao.executar(prever_lista, versao, lista_dados)
+    pontuar_em_sombra(lista_dados, [p["probabilidade_de_atraso"] for p in previsoes])
+    return [
+        {"TarefaID": tarefa_id, **previsao, "features": dados}
+        for tarefa_id, previsao, dados in zip(ids, previsoes, lista_dados)
+    ]
+
+
+@app.get("/tarefas/{tarefa_id}/previsao", response_model=schemas.PrevisaoTarefaOutput, tags=["Inteligência Artificial"])
+async def prever_atraso_por_tarefa_id(tarefa_id: int, db: pyodbc.Connection = DbConnection):
+    previsoes = await prever_tarefas_do_banco(db, "TarefaID", tarefa_id)
+    if not previsoes:
+        raise HTTPException(status_code=404, detail="Tarefa não encontrada.")
+    return previsoes[0]
+
+
+@app.get("/projetos/{projeto_id}/tarefas/previsoes", response_model=List[schemas.PrevisaoTarefaOutput], tags=["Inteligência Artificial"])
+async def prever_atraso_tarefas_do_projeto(projeto_id: int, db: pyodbc.Connection = DbConnection):
+    return await prever_tarefas_do_banco(db, "ProjetoID", projeto_id)
 
-    if not modelo_ia or not colunas_modelo:
-        raise HTTPException(status_code=500, detail="Modelo de IA não está carregado no servidor.")
 
-    # 1. Converter os dados de entrada em um DataFrame do Pandas
-    dados_dict = dados_tarefa.dict()
-    df_para_prever = pd.DataFrame([dados_dict])
+# --------------------------------------------------------------------------
+# --- REGISTRO DE MODELOS ---
+# --------------------------------------------------------------------------
 
-    # 2. Fazer o One-Hot Encoding das variáveis categóricas
-    #    Isso garante que os dados de entrada tenham o mesmo formato dos dados de treino.
-    df_para_prever_encoded = pd.get_dummies(df_para_prever)
-    
-    # 3. Alinhar as colunas com as colunas originais do modelo
-    #    Isso cria colunas de '0' para categorias que não estavam nesta entrada, mas que o modelo espera.
-    df_alinhado = df_para_prever_encoded.reindex(columns=colunas_modelo, fill_value=0)
+@app.get("/modelos", tags=["Modelos"])
+def get_modelos():
+    # Versão ativa, tempo de carga, latência por versão, candidata em sombra e versões anteriores
+    return registro.metricas()
 
-    # 4. Fazer a previsão de probabilidade
-    #    predict_proba retorna a probabilidade para cada classe: [prob_no_prazo, prob_atrasada]
-    probabilidades = modelo_ia.predict_proba(df_alinhado)[0]
-    
-    probabilidade_de_atraso = probabilidades[1] # Pegamos a probabilidade da classe '1' (Atrasada)
 
-    # 5. Definir a previsão final
-    previsao_texto = "Atrasada" if probabilidade_de_atraso > 0.5 else "No Prazo"
-    
-    return {
-        "previsao": previsao_texto,
-        "probabilidade_de_atraso": probabilidade_de_atraso
-    }
+@app.post("/modelos/verificar", status_code=status.HTTP_202_ACCEPTED, tags=["Modelos"])
+def verificar_modelos():
+    # Procura agora (sem esperar o monitoramento) uma versão mais nova ou artefatos alterados
+    versao = registro.verificar_novas_versoes()
+    if versao is not None:
+        registro.publicar(ativa=versao)
+    return {"carregando": versao}
+
+
+@app.post("/modelos/{versao}/ativar", status_code=status.HTTP_202_ACCEPTED, tags=["Modelos"])
+def ativar_modelo(versao: str):
+    # Carrega, valida e aquece em segundo plano; só então troca a versão ativa
+    return _carregar_modelo(versao, como_sombra=False)
+
+
+@app.post("/modelos/{versao}/sombra", status_code=status.HTTP_202_ACCEPTED, tags=["Modelos"])
+def sombrear_modelo(versao: str, fracao: float = Query(config.MODELOS_SOMBRA_FRACAO, gt=0, le=1, description="Fração do tráfego pontuada também pela candidata.")):
+    return _carregar_modelo(versao, como_sombra=True, fracao_sombra=fracao)
+
+
+@app.delete("/modelos/sombra", status_code=status.HTTP_204_NO_CONTENT, tags=["Modelos"])
+def remover_sombra():
+    registro.remover_sombra()
+    registro.publicar(remover_sombra=True)
+
+
+def _carregar_modelo(versao: str, como_sombra: bool, fracao_sombra: float = 0.0):
+    try:
+        iniciado = registro.carregar_em_segundo_plano(versao, como_sombra, fracao_sombra)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Versão {versao} não encontrada em {registro.diretorio}.")
+    if not iniciado:
+        raise HTTPException(status_code=409, detail=f"Já existe uma carga em andamento ({registro.carregando}).")
+    # Com vários workers, os demais seguem o pedido pelo arquivo de estado
+    if como_sombra:
+        registro.publicar(sombra=versao, fracao=fracao_sombra)
+    else:
+        registro.publicar(ativa=versao)
+    return {"carregando": versao}
 
 
 # --------------------------------------------------------------------------
-# --- Endpoints de CRUD (O código anterior completo vai aqui) ---
-# (Cole aqui todos os endpoints de CRUD para Projetos, Tarefas, etc. que já fizemos)
+# --- MOTOR DE ALERTAS ---
 # --------------------------------------------------------------------------
-@app.get("/projetos/", response_model=List[schemas.Projeto], tags=["Projetos"])
-def get_projetos(db: pyodbc.Connection = DbConnection):
-    # seu código aqui...
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM Projetos")
-    columns = [column[0] for column in cursor.description]
-    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+# Pontua as tarefas alteradas desde o último ciclo e grava alertas e sugestões acima dos
+# limiares (app/alertas.py). Roda em segundo plano com ALERTAS_INTERVALO > 0 ou sob demanda.
+
+motor_alertas = alertas.MotorAlertas(
+    lambda: get_pool().conexao(),
+    lambda: registro.ativo,
+    alertas.limiares_severidade(config.ALERTAS_LIMIAR_ALTA, config.ALERTAS_LIMIAR_MEDIA),
+    tamanho_bloco=config.ALERTAS_TAMANHO_BLOCO,
+    tamanho_lote=config.PREVISAO_TAMANHO_LOTE,
+    intervalo=config.ALERTAS_INTERVALO,
+)
+
+
+@app.get("/alertas/motor", tags=["Alertas"])
+def get_motor_alertas():
+    # Ciclos executados, último ciclo (tarefas lidas, alertas gerados/resolvidos, marca) e último erro
+    return motor_alertas.metricas()
+
+
+@app.post("/alertas/processar", tags=["Alertas"])
+async def processar_alertas(desde_o_inicio: bool = Query(False, description="Zera a marca e pontua todas as tarefas de novo.")):
+    def executar():
+        if desde_o_inicio:
+            with get_pool().conexao() as conexao:
+                alertas.reiniciar_marca(conexao)
+        return motor_alertas.processar()
+
+    try:
+        resultado = await executor_db.executar(executar)
+    except RuntimeError as ex:
+        raise HTTPException(status_code=500, detail=str(ex))
+    if resultado is None:
+        raise HTTPException(status_code=409, detail="Já existe um ciclo do motor de alertas em andamento.")
+    return resultado
+
 
-# (E assim por diante para TODOS os outros endpoints que você já tem)
+@app.get("/projetos/{projeto_id}/alertas/", response_model=List[schemas.AlertaAI], tags=["Alertas"])
+async def get_alertas_by_projeto(projeto_id: int, response: Response, parametros: listagem.ParametrosListagem = Listagem, db: pyodbc.Connection = DbConnection):
+    # ?status=Aberto para só os alertas em aberto
+    return await listagem.responder_listagem(db, listagem.ALERTAS, parametros, response, {"ProjetoID": projeto_id})
 
+
+@app.get("/alertas/{alerta_id}/sugestoes/", response_model=List[schemas.SugestaoAI], tags=["Alertas"])
+async def get_sugestoes_by_alerta(alerta_id: int, response: Response, parametros: listagem.ParametrosListagem = Listagem, db: pyodbc.Connection = DbConnection):
+    return await listagem.responder_listagem(db, listagem.SUGESTOES, parametros, response, {"AlertaID": alerta_id})
+
+
+# --------------------------------------------------------------------------
+# --- Endpoints de CRUD (O código anterior completo vai aqui) ---
+# (Cole aqui todos os endpoints de CRUD para Projetos, Tarefas, etc. que já fizemos)
+# --------------------------------------------------------------------------
 @app.post("/projetos/", response_model=schemas.Projeto, status_code=status.HTTP_201_CREATED, tags=["Projetos"])
-def create_projeto(projeto: schemas.ProjetoCreate, db: pyodbc.Connection = DbConnection):
+async def create_projeto(projeto: schemas.ProjetoCreate, db: pyodbc.Connection = DbConnection):
     # (código existente)
-    cursor = db.cursor()
-    sql = "INSERT INTO Projetos (Nome, Descricao, Localizacao, DataInicio, DataPrevistaFim, Status) OUTPUT INSERTED.ProjetoID VALUES (?,?,?,?,?,?)"
-    cursor.execute(sql, projeto.Nome, projeto.Descricao, projeto.Localizacao, projeto.DataInicio, projeto.DataPrevistaFim, projeto.Status)
-    novo_id = cursor.fetchone()[0]
-    db.commit()
-    return schemas.Projeto(ProjetoID=novo_id, **projeto.dict())
+    def consultar():
+        cursor = db.cursor()
+        sql = "INSERT INTO Projetos (Nome, Descricao, Localizacao, DataInicio, DataPrevistaFim, Status) OUTPUT INSERTED.ProjetoID VALUES (?,?,?,?,?,?)"
+        cursor.execute(sql, projeto.Nome, projeto.Descricao, projeto.Localizacao, projeto.DataInicio, projeto.DataPrevistaFim, projeto.Status)
+        novo_id = cursor.fetchone()[0]
+        db.commit()
+        return schemas.Projeto(ProjetoID=novo_id, **projeto.dict())
+    novo_projeto = await executor_db.executar(consultar)
+    cache_leituras.invalidar("projetos")
+    return novo_projeto
+
+@app.post("/projetos/bulk", response_model=schemas.InsercaoLoteOutput, status_code=status.HTTP_201_CREATED, tags=["Projetos"])
+async def create_projetos_bulk(projetos: List[schemas.ProjetoCreate], tamanho_lote: int = TamanhoLote, db: pyodbc.Connection = DbConnection):
+    # Os IDs voltam na ordem da requisição: o cliente associa as tarefas a cada projeto por posição
+    resultado = await inserir_em_lote(db, listagem.PROJETOS, projetos, tamanho_lote)
+    cache_leituras.invalidar("projetos")
+    return resultado
 
 @app.get("/projetos/", response_model=List[schemas.Projeto], tags=["Projetos"])
-def get_projetos(db: pyodbc.Connection = DbConnection):
+async def get_projetos(request: Request, parametros: listagem.ParametrosListagem = Listagem):
     # (código existente)
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM Projetos")
-    columns = [column[0] for column in cursor.description]
-    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    if parametros.formato_stream:
+        # Streaming não passa pelo cache: a resposta nunca é materializada
+        async with abrir_conexao() as db:
+            return await listagem.responder_listagem(db, listagem.PROJETOS, parametros, None)
+    return await listar_em_cache(request, listagem.PROJETOS, parametros, ("projetos",), ADAPTADOR_PROJETOS)
+
+# Declarada antes de /projetos/{projeto_id}, senão "resumo" seria lido como um ID
+@app.get("/projetos/resumo", response_model=List[schemas.ResumoProjeto], tags=["Projetos"])
+async def get_resumo_projetos(
+    ids: str = Query(..., description=f"IDs dos projetos separados por vírgula (até {config.RESUMO_PROJETOS_MAX})."),
+    db: pyodbc.Connection = DbConnection
+):
+    # Visão de portfólio: o mesmo lote do resumo de um projeto, para vários projetos de uma vez
+    try:
+        projeto_ids = [int(valor) for valor in ids.split(",") if valor.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="`ids` deve ser uma lista de inteiros separados por vírgula.")
+    if not projeto_ids or len(projeto_ids) > config.RESUMO_PROJETOS_MAX:
+        raise HTTPException(status_code=400, detail=f"Informe de 1 a {config.RESUMO_PROJETOS_MAX} IDs de projeto.")
+    return await executor_db.executar(resumo.resumir_projetos, db, projeto_ids)
+
+@app.get("/projetos/{projeto_id}/resumo", response_model=schemas.ResumoProjeto, tags=["Projetos"])
+async def get_resumo_projeto(projeto_id: int, db: pyodbc.Connection = DbConnection):
+    # Projeto + tarefas por status, gasto por tipo, materiais em falta e alocações ativas, em uma ida ao banco
+    resumos = await executor_db.executar(resumo.resumir_projetos, db, [projeto_id])
+    if not resumos:
+        raise HTTPException(status_code=404, detail="Projeto não encontrado.")
+    return resumos[0]
 
 @app.get("/projetos/{projeto_id}", response_model=schemas.Projeto, tags=["Projetos"])
-def get_projeto_by_id(projeto_id: int, db: pyodbc.Connection = DbConnection):
+async def get_projeto_by_id(projeto_id: int, request: Request):
     # (código existente)
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM Projetos WHERE ProjetoID = ?", projeto_id)
-    row = cursor.fetchone()
-    if not row:
-        raise HTTPException(status_code=404, detail="Projeto não encontrado.")
-    columns = [column[0] for column in cursor.description]
-    return dict(zip(columns, row))
+    def consultar(db):
+        cursor = db.cursor()
+        cursor.execute(f"SELECT {', '.join(listagem.PROJETOS.colunas)} FROM Projetos WHERE ProjetoID = ?", projeto_id)
+        row = cursor.fetchone()
+        if not row:
+            raise HTTPException(status_code=404, detail="Projeto não encontrado.")
+        columns = [column[0] for column in cursor.description]
+        return dict(zip(columns, row))
+
+    async def gerar():
+        async with abrir_conexao() as db:
+            projeto = await executor_db.executar(consultar, db)
+        return ADAPTADOR_PROJETO.dump_json(ADAPTADOR_PROJETO.validate_python(projeto)), {}
+    return await cache_respostas.responder_em_cache(
+        cache_leituras, request.headers.get("if-none-match"), ("Projeto", projeto_id), (f"projeto:{projeto_id}",), gerar
+    )
 
 @app.put("/projetos/{projeto_id}", response_model=schemas.Projeto, tags=["Projetos"])
-def update_projeto(projeto_id: int, projeto_update: schemas.ProjetoCreate, db: pyodbc.Connection = DbConnection):
+async def update_projeto(projeto_id: int, projeto_update: schemas.ProjetoCreate, db: pyodbc.Connection = DbConnection):
     # (código existente)
-    cursor = db.cursor()
-    sql = "UPDATE Projetos SET Nome=?, Descricao=?, Localizacao=?, DataInicio=?, DataPrevistaFim=?, Status=? WHERE ProjetoID = ?"
-    cursor.execute(sql, projeto_update.Nome, projeto_update.Descricao, projeto_update.Localizacao, projeto_update.DataInicio, projeto_update.DataPrevistaFim, projeto_update.Status, projeto_id)
-    if cursor.rowcount == 0:
-        raise HTTPException(status_code=404, detail="Projeto não encontrado para atualização.")
-    db.commit()
-    return schemas.Projeto(ProjetoID=projeto_id, **projeto_update.dict())
+    def consultar():
+        cursor = db.cursor()
+        sql = "UPDATE Projetos SET Nome=?, Descricao=?, Localizacao=?, DataInicio=?, DataPrevistaFim=?, Status=? WHERE ProjetoID = ?"
+        cursor.execute(sql, projeto_update.Nome, projeto_update.Descricao, projeto_update.Localizacao, projeto_update.DataInicio, projeto_update.DataPrevistaFim, projeto_update.Status, projeto_id)
+        if cursor.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Projeto não encontrado para atualização.")
+        db.commit()
+        return schemas.Projeto(ProjetoID=projeto_id, **projeto_update.dict())
+    projeto = await executor_db.executar(consultar)
+    cache_leituras.invalidar("projetos", f"projeto:{projeto_id}")
+    return projeto
 
 @app.delete("/projetos/{projeto_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Projetos"])
-def delete_projeto(projeto_id: int, db: pyodbc.Connection = DbConnection):
+async def delete_projeto(projeto_id: int, db: pyodbc.Connection = DbConnection):
     # (código existente)
-    cursor = db.cursor()
-    cursor.execute("DELETE FROM Projetos WHERE ProjetoID = ?", projeto_id)
-    if cursor.rowcount == 0:
-        raise HTTPException(status_code=404, detail="Projeto não encontrado para deleção.")
-    db.commit()
+    def consultar():
+        cursor = db.cursor()
+        cursor.execute("DELETE FROM Projetos WHERE ProjetoID = ?", projeto_id)
+        if cursor.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Projeto não encontrado para deleção.")
+        db.commit()
+    await executor_db.executar(consultar)
+    cache_leituras.invalidar("projetos", f"projeto:{projeto_id}")
 
 # --------------------------------------------------------------------------
 # --- ENDPOINTS PARA TAREFAS ---
 # --------------------------------------------------------------------------
 
 @app.post("/tarefas/", response_model=schemas.Tarefa, status_code=status.HTTP_201_CREATED, tags=["Tarefas"])
-def create_tarefa(tarefa: schemas.TarefaCreate, db: pyodbc.Connection = DbConnection):
+async def create_tarefa(tarefa: schemas.TarefaCreate, db: pyodbc.Connection = DbConnection):
     # (código existente)
-    cursor = db.cursor()
-    sql = "INSERT INTO Tarefas (ProjetoID, Descricao, DataInicioPrevista, DataFimPrevista, DataInicioReal, DataFimReal, Status) OUTPUT INSERTED.TarefaID VALUES (?,?,?,?,?,?,?)"
-    cursor.execute(sql, tarefa.ProjetoID, tarefa.Descricao, tarefa.DataInicioPrevista, tarefa.DataFimPrevista, tarefa.DataInicioReal, tarefa.DataFimReal, tarefa.Status)
-    novo_id = cursor.fetchone()[0]
-    db.commit()
-    return schemas.Tarefa(TarefaID=novo_id, **tarefa.dict())
+    def consultar():
+        cursor = db.cursor()
+        sql = "INSERT INTO Tarefas (ProjetoID, Descricao, DataInicioPrevista, DataFimPrevista, DataInicioReal, DataFimReal, Status) OUTPUT INSERTED.TarefaID VALUES (?,?,?,?,?,?,?)"
+        cursor.execute(sql, tarefa.ProjetoID, tarefa.Descricao, tarefa.DataInicioPrevista, tarefa.DataFimPrevista, tarefa.DataInicioReal, tarefa.DataFimReal, tarefa.Status)
+        novo_id = cursor.fetchone()[0]
+        db.commit()
+        return schemas.Tarefa(TarefaID=novo_id, **tarefa.dict())
+    return await executor_db.executar(consultar)
+
+@app.post("/tarefas/bulk", response_model=schemas.InsercaoLoteOutput, status_code=status.HTTP_201_CREATED, tags=["Tarefas"])
+async def create_tarefas_bulk(tarefas: List[schemas.TarefaCreate], tamanho_lote: int = TamanhoLote, db: pyodbc.Connection = DbConnection):
+    return await inserir_em_lote(db, listagem.TAREFAS, tarefas, tamanho_lote)
 
 @app.get("/projetos/{projeto_id}/tarefas/", response_model=List[schemas.Tarefa], tags=["Tarefas"])
-def get_tarefas_by_projeto(projeto_id: int, db: pyodbc.Connection = DbConnection):
+async def get_tarefas_by_projeto(projeto_id: int, response: Response, parametros: listagem.ParametrosListagem = Listagem, db: pyodbc.Connection = DbConnection):
     # (código existente)
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM Tarefas WHERE ProjetoID = ?", projeto_id)
-    columns = [column[0] for column in cursor.description]
-    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    return await listagem.responder_listagem(db, listagem.TAREFAS, parametros, response, {"ProjetoID": projeto_id})
     
 # (CRUD completo para Tarefas seria análogo ao de Projetos)
 
@@ -183,97 +576,167 @@ def get_tarefas_by_projeto(projeto_id: int, db: pyodbc.Connection = DbConnection
 # --------------------------------------------------------------------------
 
 @app.post("/recursos_financeiros/", response_model=schemas.RecursoFinanceiro, status_code=status.HTTP_201_CREATED, tags=["Financeiro"])
-def create_recurso_financeiro(recurso: schemas.RecursoFinanceiroCreate, db: pyodbc.Connection = DbConnection):
-    cursor = db.cursor()
-    sql = "INSERT INTO RecursosFinanceiros (ProjetoID, Tipo, Descricao, Valor, Data) OUTPUT INSERTED.RecursoFinanceiroID VALUES (?,?,?,?,?)"
-    cursor.execute(sql, recurso.ProjetoID, recurso.Tipo, recurso.Descricao, recurso.Valor, recurso.Data)
-    novo_id = cursor.fetchone()[0]
-    db.commit()
-    return schemas.RecursoFinanceiro(RecursoFinanceiroID=novo_id, **recurso.dict())
+async def create_recurso_financeiro(recurso: schemas.RecursoFinanceiroCreate, db: pyodbc.Connection = DbConnection):
+    def consultar():
+        cursor = db.cursor()
+        sql = "INSERT INTO RecursosFinanceiros (ProjetoID, Tipo, Descricao, Valor, Data) OUTPUT INSERTED.RecursoFinanceiroID VALUES (?,?,?,?,?)"
+        cursor.execute(sql, recurso.ProjetoID, recurso.Tipo, recurso.Descricao, recurso.Valor, recurso.Data)
+        novo_id = cursor.fetchone()[0]
+        db.commit()
+        return schemas.RecursoFinanceiro(RecursoFinanceiroID=novo_id, **recurso.dict())
+    return await executor_db.executar(consultar)
+
+@app.post("/recursos_financeiros/bulk", response_model=schemas.InsercaoLoteOutput, status_code=status.HTTP_201_CREATED, tags=["Financeiro"])
+async def create_recursos_financeiros_bulk(recursos: List[schemas.RecursoFinanceiroCreate], tamanho_lote: int = TamanhoLote, db: pyodbc.Connection = DbConnection):
+    return await inserir_em_lote(db, listagem.RECURSOS_FINANCEIROS, recursos, tamanho_lote)
 
 @app.get("/projetos/{projeto_id}/recursos_financeiros/", response_model=List[schemas.RecursoFinanceiro], tags=["Financeiro"])
-def get_recursos_by_projeto(projeto_id: int, db: pyodbc.Connection = DbConnection):
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM RecursosFinanceiros WHERE ProjetoID = ?", projeto_id)
-    columns = [column[0] for column in cursor.description]
-    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+async def get_recursos_by_projeto(projeto_id: int, response: Response, parametros: listagem.ParametrosListagem = Listagem, db: pyodbc.Connection = DbConnection):
+    return await listagem.responder_listagem(db, listagem.RECURSOS_FINANCEIROS, parametros, response, {"ProjetoID": projeto_id})
 
 # --------------------------------------------------------------------------
 # --- ENDPOINTS PARA MATERIAIS ---
 # --------------------------------------------------------------------------
 
 @app.post("/materiais/", response_model=schemas.Material, status_code=status.HTTP_201_CREATED, tags=["Materiais"])
-def create_material(material: schemas.MaterialCreate, db: pyodbc.Connection = DbConnection):
-    cursor = db.cursor()
-    sql = "INSERT INTO Materiais (ProjetoID, NomeMaterial, QuantidadeNecessaria, QuantidadeEmEstoque, Unidade) OUTPUT INSERTED.MaterialID VALUES (?,?,?,?,?)"
-    cursor.execute(sql, material.ProjetoID, material.NomeMaterial, material.QuantidadeNecessaria, material.QuantidadeEmEstoque, material.Unidade)
-    novo_id = cursor.fetchone()[0]
-    db.commit()
-    return schemas.Material(MaterialID=novo_id, **material.dict())
+async def create_material(material: schemas.MaterialCreate, db: pyodbc.Connection = DbConnection):
+    def consultar():
+        cursor = db.cursor()
+        sql = "INSERT INTO Materiais (ProjetoID, NomeMaterial, QuantidadeNecessaria, QuantidadeEmEstoque, Unidade) OUTPUT INSERTED.MaterialID VALUES (?,?,?,?,?)"
+        cursor.execute(sql, material.ProjetoID, material.NomeMaterial, material.QuantidadeNecessaria, material.QuantidadeEmEstoque, material.Unidade)
+        novo_id = cursor.fetchone()[0]
+        db.commit()
+        return schemas.Material(MaterialID=novo_id, **material.dict())
+    return await executor_db.executar(consultar)
+
+@app.post("/materiais/bulk", response_model=schemas.InsercaoLoteOutput, status_code=status.HTTP_201_CREATED, tags=["Materiais"])
+async def create_materiais_bulk(materiais: List[schemas.MaterialCreate], tamanho_lote: int = TamanhoLote, db: pyodbc.Connection = DbConnection):
+    return await inserir_em_lote(db, listagem.MATERIAIS, materiais, tamanho_lote)
 
 @app.get("/projetos/{projeto_id}/materiais/", response_model=List[schemas.Material], tags=["Materiais"])
-def get_materiais_by_projeto(projeto_id: int, db: pyodbc.Connection = DbConnection):
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM Materiais WHERE ProjetoID = ?", projeto_id)
-    columns = [column[0] for column in cursor.description]
-    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+async def get_materiais_by_projeto(projeto_id: int, response: Response, parametros: listagem.ParametrosListagem = Listagem, db: pyodbc.Connection = DbConnection):
+    return await listagem.responder_listagem(db, listagem.MATERIAIS, parametros, response, {"ProjetoID": projeto_id})
 
 @app.put("/materiais/{material_id}", response_model=schemas.Material, tags=["Materiais"])
-def update_material(material_id: int, material_update: schemas.MaterialCreate, db: pyodbc.Connection = DbConnection):
-    cursor = db.cursor()
-    sql = "UPDATE Materiais SET ProjetoID=?, NomeMaterial=?, QuantidadeNecessaria=?, QuantidadeEmEstoque=?, Unidade=? WHERE MaterialID = ?"
-    cursor.execute(sql, material_update.ProjetoID, material_update.NomeMaterial, material_update.QuantidadeNecessaria, material_update.QuantidadeEmEstoque, material_update.Unidade, material_id)
-    if cursor.rowcount == 0:
-        raise HTTPException(status_code=404, detail="Material não encontrado para atualização.")
-    db.commit()
-    return schemas.Material(MaterialID=material_id, **material_update.dict())
+async def update_material(material_id: int, material_update: schemas.MaterialCreate, db: pyodbc.Connection = DbConnection):
+    def consultar():
+        cursor = db.cursor()
+        sql = "UPDATE Materiais SET ProjetoID=?, NomeMaterial=?, QuantidadeNecessaria=?, QuantidadeEmEstoque=?, Unidade=? WHERE MaterialID = ?"
+        cursor.execute(sql, material_update.ProjetoID, material_update.NomeMaterial, material_update.QuantidadeNecessaria, material_update.QuantidadeEmEstoque, material_update.Unidade, material_id)
+        if cursor.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Material não encontrado para atualização.")
+        db.commit()
+        return schemas.Material(MaterialID=material_id, **material_update.dict())
+    return await executor_db.executar(consultar)
 
 # --------------------------------------------------------------------------
 # --- ENDPOINTS PARA FUNCIONÁRIOS E ALOCAÇÕES ---
 # --------------------------------------------------------------------------
 
 @app.post("/funcionarios/", response_model=schemas.Funcionario, status_code=status.HTTP_201_CREATED, tags=["Funcionários e Alocações"])
-def create_funcionario(funcionario: schemas.FuncionarioCreate, db: pyodbc.Connection = DbConnection):
+async def create_funcionario(funcionario: schemas.FuncionarioCreate, db: pyodbc.Connection = DbConnection):
     # (código existente)
-    cursor = db.cursor()
-    sql = "INSERT INTO Funcionarios (NomeCompleto, Funcao, Status) OUTPUT INSERTED.FuncionarioID VALUES (?,?,?)"
-    cursor.execute(sql, funcionario.NomeCompleto, funcionario.Funcao, funcionario.Status)
-    novo_id = cursor.fetchone()[0]
-    db.commit()
-    return schemas.Funcionario(FuncionarioID=novo_id, **funcionario.dict())
+    def consultar():
+        cursor = db.cursor()
+        sql = "INSERT INTO Funcionarios (NomeCompleto, Funcao, Status) OUTPUT INSERTED.FuncionarioID VALUES (?,?,?)"
+        cursor.execute(sql, funcionario.NomeCompleto, funcionario.Funcao, funcionario.Status)
+        novo_id = cursor.fetchone()[0]
+        db.commit()
+        return schemas.Funcionario(FuncionarioID=novo_id, **funcionario.dict())
+    novo_funcionario = await executor_db.executar(consultar)
+    cache_leituras.invalidar("funcionarios")
+    return novo_funcionario
+
+@app.post("/funcionarios/bulk", response_model=schemas.InsercaoLoteOutput, status_code=status.HTTP_201_CREATED, tags=["Funcionários e Alocações"])
+async def create_funcionarios_bulk(funcionarios: List[schemas.FuncionarioCreate], tamanho_lote: int = TamanhoLote, db: pyodbc.Connection = DbConnection):
+    resultado = await inserir_em_lote(db, listagem.FUNCIONARIOS, funcionarios, tamanho_lote)
+    cache_leituras.invalidar("funcionarios")
+    return resultado
 
 @app.get("/funcionarios/", response_model=List[schemas.Funcionario], tags=["Funcionários e Alocações"])
-def get_funcionarios(db: pyodbc.Connection = DbConnection):
+async def get_funcionarios(request: Request, parametros: listagem.ParametrosListagem = Listagem):
     # (código existente)
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM Funcionarios")
-    columns = [column[0] for column in cursor.description]
-    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    if parametros.formato_stream:
+        async with abrir_conexao() as db:
+            return await listagem.responder_listagem(db, listagem.FUNCIONARIOS, parametros, None)
+    return await listar_em_cache(request, listagem.FUNCIONARIOS, parametros, ("funcionarios",), ADAPTADOR_FUNCIONARIOS)
+
+@app.get("/funcionarios/{funcionario_id}/disponibilidade", response_model=schemas.DisponibilidadeFuncionario, tags=["Funcionários e Alocações"])
+async def get_disponibilidade_funcionario(
+    funcionario_id: int,
+    data_de: datetime.date | None = Query(None, description="Início do período (padrão: hoje)."),
+    data_ate: datetime.date | None = Query(None, description="Fim do período, inclusivo (padrão: 30 dias após data_de)."),
+    db: pyodbc.Connection = DbConnection,
+):
+    data_de = data_de or datetime.date.today()
+    data_ate = data_ate or data_de + datetime.timedelta(days=30)
+    if data_ate < data_de:
+        raise HTTPException(status_code=400, detail="data_ate anterior a data_de.")
+
+    def consultar():
+        cursor = db.cursor()
+        cursor.execute("SELECT 1 FROM Funcionarios WHERE FuncionarioID = ?", funcionario_id)
+        existe = cursor.fetchone() is not None
+        cursor.close()
+        if not existe:
+            raise HTTPException(status_code=404, detail="Funcionário não encontrado.")
+        return indice_alocacoes.disponibilidade(db, funcionario_id, data_de, data_ate)
+    return await executor_db.executar(consultar)
+
+# Índice em memória das alocações por funcionário (conflitos e disponibilidade sem varrer a tabela)
+indice_alocacoes = alocacoes.IndiceAlocacoes(config.ALOCACOES_INDICE_TTL)
+
+
+def verificar_alocacao(db, alocacao: schemas.AlocacaoFuncionarioCreate, alocacao_id: int | None = None):
+    """Dentro da transação: 409 se o funcionário já estiver alocado no período (400 se o período for inválido)."""
+    try:
+        indice_alocacoes.verificar(db, alocacao, ignorar=alocacao_id)
+    except alocacoes.ConflitoAlocacao as ex:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail={
+            "mensagem": "Funcionário já alocado no período.",
+            "conflitos": jsonable_encoder(ex.conflitos),
+        })
+    except ValueError as ex:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(ex))
+
 
 @app.post("/alocacoes/", response_model=schemas.AlocacaoFuncionario, status_code=status.HTTP_201_CREATED, tags=["Funcionários e Alocações"])
-def create_alocacao(alocacao: schemas.AlocacaoFuncionarioCreate, db: pyodbc.Connection = DbConnection):
+async def create_alocacao(alocacao: schemas.AlocacaoFuncionarioCreate, db: pyodbc.Connection = DbConnection):
     # (código existente)
-    cursor = db.cursor()
-    sql = "INSERT INTO AlocacaoFuncionarios (FuncionarioID, ProjetoID, DataInicioAlocacao, DataFimAlocacao) OUTPUT INSERTED.AlocacaoID VALUES (?,?,?,?)"
-    cursor.execute(sql, alocacao.FuncionarioID, alocacao.ProjetoID, alocacao.DataInicioAlocacao, alocacao.DataFimAlocacao)
-    novo_id = cursor.fetchone()[0]
-    db.commit()
-    return schemas.AlocacaoFuncionario(AlocacaoID=novo_id, **alocacao.dict())
+    def consultar():
+        verificar_alocacao(db, alocacao)
+        cursor = db.cursor()
+        sql = "INSERT INTO AlocacaoFuncionarios (FuncionarioID, ProjetoID, DataInicioAlocacao, DataFimAlocacao) OUTPUT INSERTED.AlocacaoID VALUES (?,?,?,?)"
+        cursor.execute(sql, alocacao.FuncionarioID, alocacao.ProjetoID, alocacao.DataInicioAlocacao, alocacao.DataFimAlocacao)
+        novo_id = cursor.fetchone()[0]
+        db.commit()
+        indice_alocacoes.registrar(novo_id, alocacao)
+        return schemas.AlocacaoFuncionario(AlocacaoID=novo_id, **alocacao.dict())
+    return await executor_db.executar(consultar)
+
+@app.get("/alocacoes/conflitos", response_model=List[schemas.ConflitoAlocacao], tags=["Funcionários e Alocações"])
+async def get_conflitos_alocacao(funcionario_id: int | None = None, projeto_id: int | None = None, db: pyodbc.Connection = DbConnection):
+    # Conflitos já gravados (dados anteriores à verificação ou escritos fora da API)
+    return await executor_db.executar(indice_alocacoes.conflitos, db, funcionario_id, projeto_id)
 
 @app.get("/projetos/{projeto_id}/alocacoes/", response_model=List[schemas.AlocacaoFuncionario], tags=["Funcionários e Alocações"])
-def get_alocacoes_by_projeto(projeto_id: int, db: pyodbc.Connection = DbConnection):
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM AlocacaoFuncionarios WHERE ProjetoID = ?", projeto_id)
-    columns = [column[0] for column in cursor.description]
-    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+async def get_alocacoes_by_projeto(projeto_id: int, response: Response, parametros: listagem.ParametrosListagem = Listagem, db: pyodbc.Connection = DbConnection):
+    return await listagem.responder_listagem(db, listagem.ALOCACOES, parametros, response, {"ProjetoID": projeto_id})
 
 @app.put("/alocacoes/{alocacao_id}", response_model=schemas.AlocacaoFuncionario, tags=["Funcionários e Alocações"])
-def update_alocacao(alocacao_id: int, alocacao_update: schemas.AlocacaoFuncionarioCreate, db: pyodbc.Connection = DbConnection):
-    cursor = db.cursor()
-    sql = "UPDATE AlocacaoFuncionarios SET FuncionarioID=?, ProjetoID=?, DataInicioAlocacao=?, DataFimAlocacao=? WHERE AlocacaoID = ?"
-    cursor.execute(sql, alocacao_update.FuncionarioID, alocacao_update.ProjetoID, alocacao_update.DataInicioAlocacao, alocacao_update.DataFimAlocacao, alocacao_id)
-    if cursor.rowcount == 0:
-        raise HTTPException(status_code=404, detail="Alocação não encontrada para atualização.")
-    db.commit()
-    return schemas.AlocacaoFuncionario(AlocacaoID=alocacao_id, **alocacao_update.dict())
+async def update_alocacao(alocacao_id: int, alocacao_update: schemas.AlocacaoFuncionarioCreate, db: pyodbc.Connection = DbConnection):
+    def consultar():
+        verificar_alocacao(db, alocacao_update, alocacao_id)
+        cursor = db.cursor()
+        sql = "UPDATE AlocacaoFuncionarios SET FuncionarioID=?, ProjetoID=?, DataInicioAlocacao=?, DataFimAlocacao=? WHERE AlocacaoID = ?"
+        cursor.execute(sql, alocacao_update.FuncionarioID, alocacao_update.ProjetoID, alocacao_update.DataInicioAlocacao, alocacao_update.DataFimAlocacao, alocacao_id)
+        if cursor.rowcount == 0:
+            db.rollback()
+            raise HTTPException(status_code=404, detail="Alocação não encontrada para atualização.")
+        db.commit()
+        indice_alocacoes.registrar(alocacao_id, alocacao_update)
+        return schemas.AlocacaoFuncionario(AlocacaoID=alocacao_id, **alocacao_update.dict())
+    return await executor_db.executar(consultar)
 
@@ -0,0 +1,291 @@
+# Arquivo: solarys_api/app/metricas.py
+# Histogramas de latência no formato de exposição do Prometheus (texto, versão 0.0.4),
+# sem dependência externa: cada histograma guarda contadores por faixa ("bucket") para
+# cada combinação de rótulos, e GET /metrics junta tudo em um único texto.
+#
+# O que é medido:
+#   - por rota (middleware ASGI, do início da requisição ao último byte enviado);
+#   - retirada de conexão (fila do semáforo + pool) e abertura de conexões novas;
+#   - execute e fetch de cada comando SQL (rotulado por comando + tabela);
+#   - serialização: linhas -> dicts, codificação JSON e blocos do streaming;
+#   - modelo: montagem das features vs predict_proba.
+
+import bisect
+import functools
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from fastapi.responses import JSONResponse
+
+# Faixas padrão, em segundos: de 100 µs (árvore compilada, cache) a 10 s (listagens enormes)
+LIMITES_PADRAO = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+TIPO_CONTEUDO = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_rotulos(nomes: tuple, valores: tuple, extra: str = "") -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _formatar_numero(valor: float) -> str:
+    return repr(float(valor)) if valor != int(valor) else str(int(valor))
+
+
+class Histograma:
+    """Histograma thread-safe com rótulos: `observar(segundos, *valores_dos_rotulos)`."""
+
+    def __init__(self, nome: str, descricao: str, rotulos: tuple = (), limites: tuple = LIMITES_PADRAO):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        self.limites = tuple(sorted(limites))
+        self._trava = threading.Lock()
+        self._series = {}  # valores dos rótulos -> [contagens por faixa (+Inf no fim), soma]
+
+    def observar(self, valor: float, *valores_rotulos):
+        indice = bisect.bisect_left(self.limites, valor)
+        with self._trava:
+            serie = self._series.get(valores_rotulos)
+            if serie is None:
+                serie = self._series[valores_rotulos] = [[0] * (len(self.limites) + 1), 0.0]
+            serie[0][indice] += 1
+            serie[1] += valor
+
+    @contextmanager
+    def medir(self, *valores_rotulos):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, *valores_rotulos)
+
+    def contagem(self, *valores_rotulos) -> int:
+        with self._trava:
+            serie = self._series.get(valores_rotulos)
+            return sum(serie[0]) if serie else 0
+
+    def limpar(self):
+        with self._trava:
+            self._series.clear()
+
+    def renderizar(self) -> list:
+        with self._trava:
+            series = [(valores, list(contagens), soma) for valores, (contagens, soma) in sorted(self._series.items())]
+        linhas = [f"# HELP {self.nome} {self.descricao}", f"# TYPE {self.nome} histogram"]
+        for valores, contagens, soma in series:
+            acumulado = 0
+            for limite, contagem in zip(self.limites + (float("inf"),), contagens):
+                acumulado += contagem
+                le = "+Inf" if limite == float("inf") else _formatar_numero(limite)
+                rotulos = _formatar_rotulos(self.rotulos, valores, 'le="' + le + '"')
+                linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_formatar_rotulos(self.rotulos, valores)} {soma!r}")
+            linhas.append(f"{self.nome}_count{_formatar_rotulos(self.rotulos, valores)} {acumulado}")
+        return linhas
+
+
+class Medidor:
+    """Gauge lido na hora da coleta: `coletar()` devolve {valores_dos_rotulos: valor}."""
+
+    def __init__(self, nome: str, descricao: str, rotulos: tuple, coletar):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        self.coletar = coletar
+
+    def renderizar(self) -> list:
+        linhas = [f"# HELP {self.nome} {self.descricao}", f"# TYPE {self.nome} gauge"]
+        for valores, valor in self.coletar().items():
+            linhas.append(f"{self.nome}{_formatar_rotulos(self.rotulos, valores)} {_formatar_numero(valor)}")
+        return linhas
+
+
+_metricas = []
+
+
+def histograma(nome: str, descricao: str, rotulos: tuple = (), limites: tuple = LIMITES_PADRAO) -> Histograma:
+    metrica = Histograma(nome, descricao, rotulos, limites)
+    _metricas.append(metrica)
+    return metrica
+
+
+def medidor(nome: str, descricao: str, rotulos: tuple, coletar) -> Medidor:
+    metrica = Medidor(nome, descricao, rotulos, coletar)
+    _metricas.append(metrica)
+    return metrica
+
+
+def renderizar() -> str:
+    """Texto completo do /metrics. Um medidor que falha na coleta é omitido, sem derrubar os demais."""
+    linhas = []
+    for metrica in _metricas:
+        try:
+            linhas.extend(metrica.renderizar())
+        except Exception as ex:
+            linhas.append(f"# erro ao coletar {metrica.nome}: {_escapar(ex)}")
+    return "\n".join(linhas) + "\n"
+
+
+# --------------------------------------------------------------------------
+# Histogramas do caminho quente
+# --------------------------------------------------------------------------
+
+requisicao_segundos = histograma(
+    "solarys_http_requisicao_segundos", "Latência das requisições HTTP por rota (até o último byte).",
+    ("metodo", "rota", "status"),
+)
+checkout_segundos = histograma(
+    "solarys_db_checkout_segundos", "Tempo para obter uma conexão: fila (semáforo) e retirada do pool.", ("etapa",),
+)
+conexao_segundos = histograma(
+    "solarys_db_conexao_nova_segundos", "Tempo de abertura de uma conexão nova com o banco (handshake).",
+)
+sql_segundos = histograma(
+    "solarys_sql_segundos", "Tempo de execute e de fetch por comando SQL.", ("operacao", "comando"),
+)
+serializacao_segundos = histograma(
+    "solarys_serializacao_segundos", "Conversão das linhas em dicts, codificação JSON e blocos de streaming.", ("etapa",),
+)
+modelo_segundos = histograma(
+    "solarys_modelo_segundos", "Previsão: montagem das features e predict_proba.", ("etapa",),
+)
+
+
+# --------------------------------------------------------------------------
+# Instrumentação do banco: conexão e cursor que medem cada comando
+# --------------------------------------------------------------------------
+
+_PADRAO_COMANDO = re.compile(r"^\s*(\w+)")
+_PADRAO_TABELA = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE)\s+([#\w.\[\]]+)", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=1024)
+def rotulo_comando(sql: str) -> str:
+    """'SELECT Projetos', 'INSERT Tarefas', ... : rótulo de baixa cardinalidade para um comando SQL."""
+    comando = _PADRAO_COMANDO.match(sql)
+    tabela = _PADRAO_TABELA.search(sql)
+    rotulo = comando.group(1).upper() if comando else "?"
+    return f"{rotulo} {tabela.group(1).strip('[]')}" if tabela else rotulo
+
+
+class CursorMedido:
+    """Repassa tudo ao cursor DB-API, medindo execute/executemany e os fetch*."""
+
+    __slots__ = ("_cursor", "_comando")
+
+    def __init__(self, cursor):
+        object.__setattr__(self, "_cursor", cursor)
+        object.__setattr__(self, "_comando", "?")
+
+    def _medir(self, operacao: str, funcao, *args):
+        inicio = time.perf_counter()
+        try:
+            return funcao(*args)
+        finally:
+            sql_segundos.observar(time.perf_counter() - inicio, operacao, self._comando)
+
+    def execute(self, sql: str, *params):
+        object.__setattr__(self, "_comando", rotulo_comando(sql))
+        self._medir("execute", self._cursor.execute, sql, *params)
+        return self
+
+    def executemany(self, sql: str, seq_params):
+        object.__setattr__(self, "_comando", rotulo_comando(sql))
+        self._medir("execute", self._cursor.executemany, sql, seq_params)
+        return self
+
+    def fetchone(self):
+        return self._medir("fetch", self._cursor.fetchone)
+
+    def fetchall(self):
+        return self._medir("fetch", self._cursor.fetchall)
+
+    def fetchmany(self, *args):
+        return self._medir("fetch", self._cursor.fetchmany, *args)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+    def __setattr__(self, nome, valor):
+        # ex.: cursor.fast_executemany = True precisa chegar ao cursor do pyodbc
+        setattr(self._cursor, nome, valor)
+
+
+class ConexaoMedida:
+    """Conexão entregue aos endpoints: igual à original, mas com cursores medidos."""
+
+    __slots__ = ("conexao",)
+
+    def __init__(self, conexao):
+        self.conexao = conexao
+
+    def cursor(self):
+        return CursorMedido(self.conexao.cursor())
+
+    def __getattr__(self, nome):
+        return getattr(self.conexao, nome)
+
+
+def medir_fabrica(fabrica):
+    """Envolve a fábrica de conexões do pool medindo a abertura de cada conexão nova."""
+    def abrir():
+        with conexao_segundos.medir():
+            return fabrica()
+    return abrir
+
+
+# --------------------------------------------------------------------------
+# Serialização e middleware
+# --------------------------------------------------------------------------
+
+class RespostaJSONMedida(JSONResponse):
+    """JSONResponse padrão da API, medindo a codificação do conteúdo em bytes."""
+
+    def render(self, content) -> bytes:
+        with serializacao_segundos.medir("json"):
+            return super().render(content)
+
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI puro (não o BaseHTTPMiddleware, que passaria o corpo por uma fila):
+    mede da chegada da requisição até o fim do envio, inclusive das respostas em streaming.
+    A rota é o template ("/projetos/{projeto_id}"), para não criar uma série por ID.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        codigo = 500
+
+        async def enviar(mensagem):
+            nonlocal codigo
+            if mensagem["type"] == "http.response.start":
+                codigo = mensagem["status"]
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            rota = scope.get("route")
+            requisicao_segundos.observar(
+                time.perf_counter() - inicio, scope["method"], getattr(rota, "path", "(sem rota)"), str(codigo)
+            )
@@ -0,0 +1,528 @@
+# Arquivo: solarys_api/app/modelos.py
+# Registro de modelos versionados: descobre os artefatos no diretório de modelos,
+# carrega e aquece uma versão nova em segundo plano (com uma previsão de validação),
+# troca a versão ativa de forma atômica e, opcionalmente, pontua uma versão candidata
+# "em sombra" em uma amostra do tráfego real.
+#
+# Artefatos seguem o padrão do notebook de treinamento:
+#   modelo_atraso_v<N>.joblib  +  colunas_modelo_v<N>.json
+#
+# Vários workers (python -m app.serve): com `arquivo_estado`, os pedidos feitos pela API
+# (ativar, sombra, remover a sombra) são gravados em um arquivo compartilhado e cada worker
+# o relê a cada `intervalo_estado` segundos, carregando a mesma versão; um worker recriado
+# aplica o último estado ao subir.
+#
+# Troca atômica: os endpoints leem `registro.ativo` uma única vez por requisição e usam
+# aquele objeto até o fim, então uma troca no meio do caminho não afeta quem já começou.
+#
+# joblib e app.predicao (NumPy, pandas, sklearn) são importados só quando uma versão é
+# carregada: importar este módulo é barato e um worker sem modelo nunca paga por eles.
+
+import collections
+import datetime
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import warnings
+
+from . import features, metricas
+from .cache_previsao import versao_artefatos
+
+PADRAO_ARTEFATO = re.compile(r"^modelo_atraso_v(\d+)\.joblib$")
+
+
+class ErroCargaModelo(Exception):
+    pass
+
+
+class ArtefatoModelo:
+    """Arquivos de uma versão no disco, com a assinatura (mtime, tamanho) para detectar mudanças."""
+
+    def __init__(self, diretorio: str, numero: int):
+        self.numero = numero
+        self.versao = f"v{numero}"
+        self.caminho_modelo = os.path.join(diretorio, f"modelo_atraso_v{numero}.joblib")
+        self.caminho_colunas = os.path.join(diretorio, f"colunas_modelo_v{numero}.json")
+
+    def assinatura(self) -> tuple:
+        return tuple((os.stat(caminho).st_mtime_ns, os.stat(caminho).st_size)
+                     for caminho in (self.caminho_modelo, self.caminho_colunas))
+
+
+def descobrir_artefatos(diretorio: str) -> list:
+    """Versões com os dois arquivos presentes, da mais antiga para a mais nova."""
+    artefatos = []
+    for nome in os.listdir(diretorio):
+        encontrado = PADRAO_ARTEFATO.match(nome)
+        if encontrado:
+            artefato = ArtefatoModelo(diretorio, int(encontrado.group(1)))
+            if os.path.exists(artefato.caminho_colunas):
+                artefatos.append(artefato)
+    return sorted(artefatos, key=lambda artefato: artefato.numero)
+
+
+class EstatisticaLatencia:
+    """Latência das chamadas ao modelo: contadores totais e percentis das últimas `janela` chamadas."""
+
+    def __init__(self, janela: int = 1000):
+        self._trava = threading.Lock()
+        self._recentes = collections.deque(maxlen=janela)
+        self.chamadas = 0
+        self.linhas = 0
+        self.total = 0.0
+        self.maximo = 0.0
+
+    def registrar(self, duracao: float, linhas: int = 1):
+        with self._trava:
+            self._recentes.append(duracao)
+            self.chamadas += 1
+            self.linhas += linhas
+            self.total += duracao
+            self.maximo = max(self.maximo, duracao)
+
+    def metricas(self) -> dict:
+        with self._trava:
+            recentes = sorted(self._recentes)
+            chamadas, linhas, total, maximo = self.chamadas, self.linhas, self.total, self.maximo
+
+        def percentil(p):
+            return recentes[min(len(recentes) - 1, int(len(recentes) * p))] * 1000 if recentes else 0.0
+
+        return {
+            "chamadas": chamadas,
+            "linhas": linhas,
+            "media_ms": total / chamadas * 1000 if chamadas else 0.0,
+            "p50_ms": percentil(0.50),
+            "p99_ms": percentil(0.99),
+            "max_ms": maximo * 1000,
+        }
+
+
+class VersaoModelo:
+    """Uma versão carregada e validada: modelo, colunas, árvore compilada (se houver) e latência."""
+
+    def __init__(self, artefato: ArtefatoModelo, modelo, colunas_modelo: list, campos: list):
+        from . import predicao
+
+        self.artefato = artefato
+        self.versao = artefato.versao
+        self.modelo = modelo
+        self.colunas_modelo = colunas_modelo
+        self.campos = campos
+        self.arvore_compilada = predicao.compilar_arvore(modelo, colunas_modelo, campos)
+        # Se o modelo for uma árvore de decisão, a versão compilada substitui o predict_proba do sklearn
+        self.modelo_previsao = self.arvore_compilada or modelo
+        self.extratores = predicao.extratores_features(colunas_modelo, campos)
+        # Campos da entrada que o modelo não usa (ex.: o StatusProjeto no v1, treinado pelo notebook)
+        self.campos_ignorados = features.campos_sem_coluna(colunas_modelo, campos)
+        self.impressao = versao_artefatos(artefato.caminho_modelo, artefato.caminho_colunas)
+        self.assinatura = artefato.assinatura()
+        self.carregado_em = None
+        self.tempo_carga_s = None
+        self.latencia = EstatisticaLatencia()
+
+    def probabilidade_um(self, dados: dict) -> float:
+        """Caminho de uma linha da árvore compilada (microssegundos: pode rodar no event loop)."""
+        inicio = time.perf_counter()
+        probabilidade = self.arvore_compilada.probabilidade_atraso(dados)
+        duracao = time.perf_counter() - inicio
+        self.latencia.registrar(duracao)
+        # Extração dos campos e percurso da árvore acontecem juntos, em poucos microssegundos
+        metricas.modelo_segundos.observar(duracao, "arvore_uma_linha")
+        return probabilidade
+
+    def vetor_features(self, dados: dict) -> tuple:
+        """Chave do cache de previsões: o vetor de features da entrada, na ordem das colunas do modelo."""
+        from . import predicao
+
+        return predicao.vetor_features(dados, self.extratores)
+
+    @staticmethod
+    def formatar_previsao(probabilidade: float) -> dict:
+        from . import predicao
+
+        return predicao.formatar_previsao(probabilidade)
+
+    def prever_vetor(self, vetor: tuple) -> float:
+        from . import predicao
+
+        inicio = time.perf_counter()
+        probabilidade = predicao.prever_vetor(self.modelo_previsao, self.colunas_modelo, vetor)
+        self.latencia.registrar(time.perf_counter() - inicio)
+        return probabilidade
+
+    def prever_lista(self, lista_dados: list, tamanho_lote: int, cache=None) -> list:
+        """Previsão vetorizada (com o cache, se informado), medindo a latência desta versão."""
+        from . import predicao
+
+        inicio = time.perf_counter()
+        if cache is not None:
+            previsoes = predicao.prever_lote_com_cache(
+                cache, self.modelo_previsao, self.colunas_modelo, lista_dados, self.campos, tamanho_lote, self.impressao
+            )
+        else:
+            previsoes = predicao.prever_lote(self.modelo_previsao, self.colunas_modelo, lista_dados, self.campos, tamanho_lote)
+        self.latencia.registrar(time.perf_counter() - inicio, len(lista_dados))
+        return previsoes
+
+    def metricas(self) -> dict:
+        return {
+            "versao": self.versao,
+            "impressao": self.impressao,
+            "arvore_compilada": self.arvore_compilada is not None,
+            "campos_ignorados": self.campos_ignorados,
+            "carregado_em": self.carregado_em,
+            "tempo_carga_s": self.tempo_carga_s,
+            "latencia": self.latencia.metricas(),
+        }
+
+
+def carregar_versao(artefato: ArtefatoModelo, campos: list, mmap: bool = True) -> VersaoModelo:
+    """
+    Carrega, valida e aquece uma versão. Com `mmap` os arrays NumPy do artefato são mapeados
+    do arquivo (somente leitura) e as páginas ficam compartilhadas entre os workers.
+    """
+    import joblib
+
+    from . import predicao
+
+    inicio = time.perf_counter()
+    try:
+        with warnings.catch_warnings():
+            # Artefato comprimido não pode ser mapeado: o joblib avisa e carrega normalmente
+            warnings.filterwarnings("ignore", message=".*mmap.*")
+            modelo = joblib.load(artefato.caminho_modelo, mmap_mode="r" if mmap else None)
+        with open(artefato.caminho_colunas, "r") as f:
+            colunas_modelo = json.load(f)
+        versao = VersaoModelo(artefato, modelo, colunas_modelo, campos)
+
+        # Previsão de validação (e aquecimento): uma entrada "zerada" pelo mesmo caminho dos endpoints
+        previsoes = predicao.prever_lote(versao.modelo_previsao, colunas_modelo, [{campo: 0 for campo in campos}], campos)
+        probabilidade = previsoes[0]["probabilidade_de_atraso"]
+        if not math.isfinite(probabilidade) or not 0.0 <= probabilidade <= 1.0:
+            raise ErroCargaModelo(f"previsão de validação inválida: {probabilidade}")
+    except ErroCargaModelo:
+        raise
+    except Exception as ex:
+        raise ErroCargaModelo(f"falha ao carregar {artefato.versao}: {ex}") from ex
+
+    if versao.campos_ignorados:
+        print(f"Aviso: o modelo {artefato.versao} não tem colunas para {', '.join(versao.campos_ignorados)}; "
+              "esses campos são ignorados na previsão (retreine com python -m app.treinamento).")
+    versao.tempo_carga_s = time.perf_counter() - inicio
+    versao.carregado_em = datetime.datetime.now().isoformat(timespec="seconds")
+    return versao
+
+
+class EstatisticaSombra:
+    """Comparação entre a versão ativa e a candidata nas mesmas entradas."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.comparacoes = 0
+        self.concordancias = 0
+        self.diferenca_total = 0.0
+        self.diferenca_max = 0.0
+        self.erros = 0
+
+    def registrar(self, principais: list, candidatas: list):
+        from . import predicao
+
+        with self._trava:
+            for principal, candidata in zip(principais, candidatas):
+                diferenca = abs(principal - candidata)
+                self.comparacoes += 1
+                self.concordancias += (principal > predicao.LIMIAR_ATRASO) == (candidata > predicao.LIMIAR_ATRASO)
+                self.diferenca_total += diferenca
+                self.diferenca_max = max(self.diferenca_max, diferenca)
+
+    def erro(self):
+        with self._trava:
+            self.erros += 1
+
+    def metricas(self) -> dict:
+        with self._trava:
+            return {
+                "comparacoes": self.comparacoes,
+                "concordancia": self.concordancias / self.comparacoes if self.comparacoes else None,
+                "diferenca_media": self.diferenca_total / self.comparacoes if self.comparacoes else None,
+                "diferenca_max": self.diferenca_max,
+                "erros": self.erros,
+            }
+
+
+class RegistroModelos:
+    def __init__(self, diretorio: str, campos: list, mmap: bool = True, intervalo_verificacao: float = 0,
+                 arquivo_estado: str = "", intervalo_estado: float = 1.0):
+        self.diretorio = diretorio
+        self.campos = campos
+        self.mmap = mmap
+        self.intervalo_verificacao = intervalo_verificacao
+        self.arquivo_estado = arquivo_estado
+        self.intervalo_estado = intervalo_estado
+        self._estado_aplicado = None
+        self._tentativas = set()  # passos do estado atual já iniciados (uma carga que falha não se repete)
+        self._sincronizador = None
+        self._trava = threading.Lock()
+        self._ativo = None
+        self._sombra = None
+        self._fracao_sombra = 0.0
+        self._estatistica_sombra = None
+        self._carregando = None
+        self._ultimo_erro = None
+        # Métricas das versões que já saíram de cena (o modelo em si é liberado)
+        self._historico = {}
+        self._ao_trocar = []
+        self._parar = threading.Event()
+        self._monitor = None
+
+    @property
+    def ativo(self) -> VersaoModelo | None:
+        return self._ativo
+
+    @property
+    def carregando(self) -> str | None:
+        return self._carregando
+
+    def ao_trocar(self, callback):
+        """Registra uma função chamada com a nova VersaoModelo a cada troca (ex.: invalidar o cache)."""
+        self._ao_trocar.append(callback)
+
+    def artefato(self, versao: str) -> ArtefatoModelo | None:
+        return next((artefato for artefato in descobrir_artefatos(self.diretorio) if artefato.versao == versao), None)
+
+    def carregar_inicial(self) -> VersaoModelo | None:
+        """Carrega a versão mais nova de forma síncrona (usado na subida da API)."""
+        artefatos = descobrir_artefatos(self.diretorio)
+        if not artefatos:
+            self._ultimo_erro = f"nenhum artefato de modelo encontrado em {self.diretorio}"
+            return None
+        try:
+            versao = carregar_versao(artefatos[-1], self.campos, self.mmap)
+        except ErroCargaModelo as ex:
+            self._ultimo_erro = str(ex)
+            return None
+        self._ativar(versao)
+        return versao
+
+    def carregar_inicial_em_segundo_plano(self, ao_terminar=None) -> threading.Thread:
+        """
+        Como carregar_inicial, mas em uma thread: o servidor já atende (CRUD, health checks)
+        enquanto o modelo carrega. `ao_terminar` recebe a versão ativada (ou None, se falhou).
+        """
+        with self._trava:
+            self._carregando = "inicial"
+
+        def carregar():
+            versao = None
+            try:
+                versao = self.carregar_inicial()
+            finally:
+                with self._trava:
+                    self._carregando = None
+                if ao_terminar is not None:
+                    ao_terminar(versao)
+
+        thread = threading.Thread(target=carregar, name="solarys-carga-inicial", daemon=True)
+        thread.start()
+        return thread
+
+    def _ativar(self, versao: VersaoModelo):
+        with self._trava:
+            anterior, self._ativo = self._ativo, versao
+            # A candidata que acabou de virar ativa deixa de ser sombra
+            if self._sombra is not None and self._sombra.versao == versao.versao:
+                self._sombra = None
+            if anterior is not None and anterior is not versao:
+                self._historico[anterior.versao] = {**anterior.metricas(), "desativado_em": datetime.datetime.now().isoformat(timespec="seconds")}
+            self._historico.pop(versao.versao, None)
+        for callback in self._ao_trocar:
+            callback(versao)
+
+    def carregar_em_segundo_plano(self, versao: str, como_sombra: bool = False, fracao_sombra: float = 0.0) -> bool:
+        """
+        Carrega `versao` em uma thread e, se a validação passar, ativa (ou coloca em sombra).
+        Devolve False se já houver uma carga em andamento.
+        """
+        artefato = self.artefato(versao)
+        if artefato is None:
+            raise KeyError(versao)
+        with self._trava:
+            if self._carregando is not None:
+                return False
+            self._carregando = versao
+
+        def carregar():
+            try:
+                nova = carregar_versao(artefato, self.campos, self.mmap)
+                if como_sombra:
+                    with self._trava:
+                        self._sombra, self._fracao_sombra = nova, fracao_sombra
+                        self._estatistica_sombra = EstatisticaSombra()
+                else:
+                    self._ativar(nova)
+                self._ultimo_erro = None
+            except ErroCargaModelo as ex:
+                # A versão ativa continua atendendo: uma carga que falha não derruba nada
+                self._ultimo_erro = str(ex)
+                print(f"ERRO ao carregar o modelo {versao}: {ex}")
+            finally:
+                with self._trava:
+                    self._carregando = None
+
+        threading.Thread(target=carregar, name=f"solarys-carga-{versao}", daemon=True).start()
+        return True
+
+    def remover_sombra(self):
+        with self._trava:
+            self._sombra = None
+            self._fracao_sombra = 0.0
+
+    def amostrar_sombra(self) -> VersaoModelo | None:
+        """A candidata, para uma fração `fracao_sombra` das chamadas; None nas demais."""
+        sombra = self._sombra
+        if sombra is None or random.random() >= self._fracao_sombra:
+            return None
+        return sombra
+
+    def pontuar_sombra(self, sombra: VersaoModelo, lista_dados: list, probabilidades_principais: list, tamanho_lote: int):
+        """Roda a candidata nas mesmas entradas (fora do caminho da resposta) e compara."""
+        estatistica = self._estatistica_sombra
+        if estatistica is None:
+            return
+        try:
+            previsoes = sombra.prever_lista(lista_dados, tamanho_lote)
+            estatistica.registrar(probabilidades_principais, [p["probabilidade_de_atraso"] for p in previsoes])
+        except Exception as ex:
+            estatistica.erro()
+            print(f"Aviso: falha na pontuação em sombra de {sombra.versao}: {ex}")
+
+    def verificar_novas_versoes(self) -> str | None:
+        """
+        Procura artefatos novos: uma versão com número maior que a ativa, ou os arquivos da
+        versão ativa alterados no disco. Se achar, inicia a carga e devolve o nome da versão.
+        """
+        artefatos = descobrir_artefatos(self.diretorio)
+        if not artefatos:
+            return None
+        mais_nova, ativo = artefatos[-1], self._ativo
+        if ativo is not None and mais_nova.numero < ativo.artefato.numero:
+            return None
+        if ativo is not None and mais_nova.numero == ativo.artefato.numero and mais_nova.assinatura() == ativo.assinatura:
+            return None
+        return mais_nova.versao if self.carregar_em_segundo_plano(mais_nova.versao) else None
+
+    # --- estado compartilhado entre os workers ---
+
+    def _ler_estado(self) -> dict | None:
+        try:
+            with open(self.arquivo_estado) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def publicar(self, ativa: str | None = None, sombra: str | None = None, fracao: float = 0.0, remover_sombra: bool = False):
+        """
+        Grava no arquivo de estado o pedido que este worker acabou de atender, para os outros
+        workers seguirem (sem `arquivo_estado`, não faz nada).
+        """
+        if not self.arquivo_estado:
+            return
+        with self._trava:
+            estado = self._ler_estado() or {}
+            if ativa is not None:
+                estado["ativa"] = ativa
+                if estado.get("sombra") == ativa:
+                    estado["sombra"] = None
+            if sombra is not None:
+                estado["sombra"], estado["fracao"] = sombra, fracao
+            if remover_sombra:
+                estado["sombra"] = None
+            estado["id"] = f"{time.time_ns()}-{os.getpid()}"
+            temporario = f"{self.arquivo_estado}.{os.getpid()}.tmp"
+            with open(temporario, "w") as f:
+                json.dump(estado, f)
+            os.replace(temporario, self.arquivo_estado)
+            # Este worker já iniciou a carga pedida
+            self._estado_aplicado, self._tentativas = estado["id"], set()
+
+    def _carregar_pedido(self, versao: str, como_sombra: bool = False, fracao: float = 0.0):
+        try:
+            self.carregar_em_segundo_plano(versao, como_sombra, fracao)
+        except KeyError:
+            self._ultimo_erro = f"versão {versao} pedida por outro worker não encontrada em {self.diretorio}"
+
+    def sincronizar_estado(self):
+        """Aproxima este worker do estado publicado, um passo (uma carga) por chamada."""
+        estado = self._ler_estado() if self.arquivo_estado else None
+        if estado is None or estado.get("id") == self._estado_aplicado or self._carregando is not None:
+            return
+        ativa, sombra = estado.get("ativa"), estado.get("sombra")
+        if ativa and (self._ativo is None or self._ativo.versao != ativa) and ("ativa", ativa) not in self._tentativas:
+            self._tentativas.add(("ativa", ativa))
+            self._carregar_pedido(ativa)
+            return
+        atual = self._sombra.versao if self._sombra else None
+        if sombra != atual and ("sombra", sombra) not in self._tentativas:
+            self._tentativas.add(("sombra", sombra))
+            if sombra is None:
+                self.remover_sombra()
+            else:
+                self._carregar_pedido(sombra, True, estado.get("fracao", 0.0))
+                return
+        self._estado_aplicado, self._tentativas = estado.get("id"), set()
+
+    def iniciar_monitoramento(self):
+        """
+        Verifica o diretório a cada `intervalo_verificacao` segundos (0 = desligado) e, com
+        `arquivo_estado`, segue os pedidos publicados pelos outros workers.
+        """
+        if self.arquivo_estado and self._sincronizador is None:
+            def sincronizar():
+                while True:
+                    try:
+                        self.sincronizar_estado()
+                    except Exception as ex:
+                        print(f"Aviso: falha ao sincronizar o estado dos modelos: {ex}")
+                    if self._parar.wait(self.intervalo_estado):
+                        break
+
+            self._sincronizador = threading.Thread(target=sincronizar, name="solarys-estado-modelos", daemon=True)
+            self._sincronizador.start()
+
+        if not self.intervalo_verificacao or self._monitor is not None:
+            return
+
+        def monitorar():
+            while not self._parar.wait(self.intervalo_verificacao):
+                try:
+                    self.verificar_novas_versoes()
+                except Exception as ex:
+                    print(f"Aviso: falha ao verificar novas versões do modelo: {ex}")
+
+        self._monitor = threading.Thread(target=monitorar, name="solarys-monitor-modelos", daemon=True)
+        self._monitor.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def metricas(self) -> dict:
+        with self._trava:
+            ativo, sombra, estatistica = self._ativo, self._sombra, self._estatistica_sombra
+            historico = dict(self._historico)
+            fracao = self._fracao_sombra
+        return {
+            "diretorio": self.diretorio,
+            "pid": os.getpid(),
+            "mmap": self.mmap,
+            "disponiveis": [artefato.versao for artefato in descobrir_artefatos(self.diretorio)],
+            "ativo": ativo.metricas() if ativo else None,
+            "carregando": self._carregando,
+            "ultimo_erro": self._ultimo_erro,
+            "sombra": {**sombra.metricas(), "fracao": fracao, "comparacao": estatistica.metricas()} if sombra else None,
+            "anteriores": historico,
+        }
@@ -0,0 +1,113 @@
+# Arquivo: solarys_api/app/perfil.py
+# Profiler sob demanda para investigar regressões sem anexar ferramentas externas:
+# com PERFIL_HABILITADO=1, qualquer requisição com ?profile=1 roda sob o cProfile e a
+# resposta é substituída pelo relatório do pstats (texto), ordenado por tempo acumulado.
+#
+# O trabalho de um endpoint se divide entre o event loop e as threads dos executores
+# (banco e previsão). O perfil do event loop é feito aqui no middleware; as funções que
+# a requisição manda para os executores são perfiladas na própria thread (perfil_atual
+# viaja com o contexto copiado pelo ExecutorMedido) e os resultados são somados no fim.
+#
+# A partir do Python 3.12 o cProfile usa o sys.monitoring, que é do processo inteiro: um
+# segundo enable() em outra thread falha ("Another profiling tool is already active") e o
+# perfil do middleware já enxerga todas as threads. Nesse caso as chamadas aos executores
+# só são contadas, sem perfil próprio.
+
+import contextvars
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from urllib.parse import parse_qs
+
+# Lista onde as threads dos executores guardam os perfis desta requisição (None = sem perfil)
+perfil_atual = contextvars.ContextVar("perfil_atual", default=None)
+
+# O cProfile só admite um perfil ativo por thread (por processo no 3.12+): uma requisição perfilada por vez
+_trava = threading.Lock()
+
+# Python 3.12+: o perfil do middleware cobre também as threads dos executores
+PERFIL_DO_PROCESSO = sys.version_info >= (3, 12)
+
+
+def executar(funcao, *args):
+    """Chamado pelos executores: roda `funcao` sob um cProfile só quando a requisição pediu."""
+    coletados = perfil_atual.get()
+    if coletados is None:
+        return funcao(*args)
+    if PERFIL_DO_PROCESSO:
+        # None só conta a chamada: o perfil ativo no middleware já mede esta thread
+        coletados.append(None)
+        return funcao(*args)
+    perfil = cProfile.Profile()
+    perfil.enable()
+    try:
+        return funcao(*args)
+    finally:
+        perfil.disable()
+        coletados.append(perfil)
+
+
+def relatorio(perfis: list, duracao: float, codigo_original: int, linhas: int) -> str:
+    saida = io.StringIO()
+    saida.write(f"Perfil da requisição: {duracao * 1000:.1f} ms, status original {codigo_original}, "
+                f"{len(perfis) - 1} chamada(s) aos executores\n")
+    estatisticas = pstats.Stats(perfis[0], stream=saida)
+    for perfil in perfis[1:]:
+        if perfil is not None:
+            estatisticas.add(perfil)
+    estatisticas.strip_dirs().sort_stats("cumulative").print_stats(linhas)
+    return saida.getvalue()
+
+
+class MiddlewarePerfil:
+    """Intercepta ?profile=1 e devolve o relatório do pstats no lugar da resposta."""
+
+    def __init__(self, app, linhas: int = 60):
+        self.app = app
+        self.linhas = linhas
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or parse_qs(scope["query_string"].decode()).get("profile") != ["1"]:
+            await self.app(scope, receive, send)
+            return
+
+        if not _trava.acquire(blocking=False):
+            await _enviar_texto(send, 409, "Já existe uma requisição sendo perfilada; tente novamente.\n")
+            return
+
+        codigo_original = 500
+
+        async def descartar(mensagem):
+            # A resposta original é descartada: só interessa o status
+            nonlocal codigo_original
+            if mensagem["type"] == "http.response.start":
+                codigo_original = mensagem["status"]
+
+        perfis = [cProfile.Profile()]
+        token = perfil_atual.set(perfis)
+        inicio = time.perf_counter()
+        try:
+            # Perfil do event loop (no 3.12+, de todas as threads): inclui também o que outras
+            # requisições concorrentes fizerem nele
+            perfis[0].enable()
+            try:
+                await self.app(scope, receive, descartar)
+            finally:
+                perfis[0].disable()
+        finally:
+            perfil_atual.reset(token)
+            _trava.release()
+        await _enviar_texto(send, 200, relatorio(perfis, time.perf_counter() - inicio, codigo_original, self.linhas))
+
+
+async def _enviar_texto(send, codigo: int, texto: str):
+    corpo = texto.encode()
+    await send({
+        "type": "http.response.start",
+        "status": codigo,
+        "headers": [(b"content-type", b"text/plain; charset=utf-8"), (b"content-length", str(len(corpo)).encode())],
+    })
+    await send({"type": "http.response.body", "body": corpo})
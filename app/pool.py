@@ -0,0 +1,260 @@
+# Arquivo: solarys_api/app/pool.py
+
+import threading
+import time
+from collections import deque
+
+
+class TempoEsgotadoPool(Exception):
+    """Nenhuma conexão ficou livre dentro do tempo de espera configurado."""
+
+
+class _ConexaoNoPool:
+    """Guarda a conexão junto com os horários usados para reciclagem."""
+
+    __slots__ = ("conexao", "criada_em", "devolvida_em")
+
+    def __init__(self, conexao):
+        self.conexao = conexao
+        self.criada_em = time.monotonic()
+        self.devolvida_em = self.criada_em
+
+
+class PoolConexoes:
+    """
+    Pool de conexões thread-safe e de tamanho limitado.
+
+    - `fabrica` é qualquer função sem argumentos que abre uma conexão no estilo DB-API
+      (ex.: lambda: pyodbc.connect(DATABASE_URL)).
+    - Na retirada, conexões que passaram de `tempo_max_vida` ou ficaram ociosas mais que
+      `tempo_max_ocioso` são descartadas; as ociosas há mais de `verificar_apos` segundos
+      passam por um health check (`consulta_saude`).
+    - Na devolução sempre é feito rollback, para que um handler que falhou não deixe
+      uma transação aberta para a próxima requisição.
+    """
+
+    def __init__(self, fabrica, tamanho_minimo: int = 1, tamanho_maximo: int = 10,
+                 tempo_max_vida: float = 1800.0, tempo_max_ocioso: float = 300.0,
+                 verificar_apos: float = 10.0, timeout_espera: float = 30.0,
+                 consulta_saude: str = "SELECT 1"):
+        if tamanho_maximo < 1 or tamanho_minimo < 0 or tamanho_minimo > tamanho_maximo:
+            raise ValueError("Tamanhos do pool inválidos: é preciso 0 <= mínimo <= máximo e máximo >= 1.")
+
+        self._fabrica = fabrica
+        self.tamanho_minimo = tamanho_minimo
+        self.tamanho_maximo = tamanho_maximo
+        self.tempo_max_vida = tempo_max_vida
+        self.tempo_max_ocioso = tempo_max_ocioso
+        self.verificar_apos = verificar_apos
+        self.timeout_espera = timeout_espera
+        self.consulta_saude = consulta_saude
+
+        self._trava = threading.Lock()
+        self._livre = threading.Condition(self._trava)
+        self._ociosas = deque()   # LIFO: a conexão usada mais recentemente sai primeiro
+        self._em_uso = {}         # id(conexao) -> _ConexaoNoPool
+        self._abrindo = 0         # conexões sendo abertas fora da trava
+        self._verificando = 0     # conexões ociosas passando pelo health check fora da trava
+        self._fechado = False
+
+        # Métricas
+        self._criadas = 0
+        self._descartadas = 0
+        self._falhas_saude = 0
+        self._retiradas = 0
+        self._esperas = 0
+        self._tempo_espera_total = 0.0
+        self._tempo_espera_max = 0.0
+        self._esgotamentos = 0
+
+    # ----------------------------------------------------------------------
+    # Retirada e devolução
+    # ----------------------------------------------------------------------
+
+    def obter(self):
+        """Retira uma conexão do pool, abrindo uma nova ou esperando se necessário."""
+        inicio = time.monotonic()
+        prazo = inicio + self.timeout_espera
+        esperou = False
+
+        while True:
+            verificar = False
+            with self._livre:
+                if self._fechado:
+                    raise RuntimeError("O pool de conexões já foi fechado.")
+
+                item = None
+                while self._ociosas and item is None:
+                    candidato = self._ociosas.pop()
+                    if self._expirada(candidato, time.monotonic()):
+                        self._descartar(candidato)
+                    else:
+                        item = candidato
+
+                if item is None and self._total() >= self.tamanho_maximo:
+                    restante = prazo - time.monotonic()
+                    if restante <= 0:
+                        self._esgotamentos += 1
+                        raise TempoEsgotadoPool(
+                            f"Nenhuma conexão livre após {self.timeout_espera:.1f}s "
+                            f"(máximo de {self.tamanho_maximo} conexões em uso)."
+                        )
+                    esperou = True
+                    self._livre.wait(restante)
+                    continue
+
+                if item is None:
+                    # Reserva a vaga e abre a conexão fora da trava: o handshake é lento
+                    self._abrindo += 1
+                elif time.monotonic() - item.devolvida_em > self.verificar_apos:
+                    # O health check também roda fora da trava; até lá a conexão continua
+                    # contando no total, senão outra thread abriria uma nova no lugar dela
+                    self._verificando += 1
+                    verificar = True
+
+            if item is None:
+                try:
+                    item = _ConexaoNoPool(self._fabrica())
+                except Exception:
+                    with self._livre:
+                        self._abrindo -= 1
+                        self._livre.notify()
+                    raise
+                with self._livre:
+                    self._abrindo -= 1
+                    self._criadas += 1
+            elif verificar and not self._saudavel(item):
+                with self._livre:
+                    self._verificando -= 1
+                    self._falhas_saude += 1
+                    self._descartar(item)
+                    self._livre.notify()
+                continue
+
+            with self._livre:
+                if verificar:
+                    self._verificando -= 1
+                self._em_uso[id(item.conexao)] = item
+                self._retiradas += 1
+                espera = time.monotonic() - inicio
+                if esperou:
+                    self._esperas += 1
+                self._tempo_espera_total += espera
+                self._tempo_espera_max = max(self._tempo_espera_max, espera)
+            return item.conexao
+
+    def devolver(self, conexao, descartar: bool = False):
+        """Devolve a conexão ao pool depois de desfazer qualquer transação pendente."""
+        with self._livre:
+            item = self._em_uso.pop(id(conexao), None)
+        if item is None:
+            return
+
+        if not descartar:
+            try:
+                conexao.rollback()
+            except Exception:
+                # Conexão quebrada: não volta para o pool
+                descartar = True
+
+        with self._livre:
+            agora = time.monotonic()
+            if descartar or self._fechado or agora - item.criada_em > self.tempo_max_vida:
+                self._descartar(item)
+            else:
+                item.devolvida_em = agora
+                self._ociosas.append(item)
+            self._livre.notify()
+
+    def conexao(self):
+        """Context manager: `with pool.conexao() as conn: ...`."""
+        return _RetiradaPool(self)
+
+    # ----------------------------------------------------------------------
+    # Manutenção
+    # ----------------------------------------------------------------------
+
+    def preencher(self):
+        """Abre conexões até ter `tamanho_minimo` no pool (útil na subida da API)."""
+        while True:
+            with self._livre:
+                if self._fechado or self._total() >= self.tamanho_minimo:
+                    return
+                self._abrindo += 1
+            try:
+                item = _ConexaoNoPool(self._fabrica())
+            finally:
+                with self._livre:
+                    self._abrindo -= 1
+            with self._livre:
+                self._criadas += 1
+                self._ociosas.appendleft(item)
+                self._livre.notify()
+
+    def fechar(self):
+        """Fecha as conexões ociosas; as que estão em uso são fechadas quando voltarem."""
+        with self._livre:
+            self._fechado = True
+            while self._ociosas:
+                self._descartar(self._ociosas.pop())
+            self._livre.notify_all()
+
+    def metricas(self) -> dict:
+        with self._trava:
+            return {
+                "em_uso": len(self._em_uso),
+                "ociosas": len(self._ociosas),
+                "total": self._total(),
+                "tamanho_minimo": self.tamanho_minimo,
+                "tamanho_maximo": self.tamanho_maximo,
+                "criadas": self._criadas,
+                "descartadas": self._descartadas,
+                "falhas_health_check": self._falhas_saude,
+                "retiradas": self._retiradas,
+                "retiradas_com_espera": self._esperas,
+                "esgotamentos": self._esgotamentos,
+                "tempo_espera_medio_ms": (self._tempo_espera_total / self._retiradas * 1000) if self._retiradas else 0.0,
+                "tempo_espera_max_ms": self._tempo_espera_max * 1000,
+            }
+
+    # ----------------------------------------------------------------------
+    # Auxiliares (chamados com a trava adquirida, exceto _saudavel)
+    # ----------------------------------------------------------------------
+
+    def _total(self) -> int:
+        return len(self._ociosas) + len(self._em_uso) + self._abrindo + self._verificando
+
+    def _expirada(self, item: _ConexaoNoPool, agora: float) -> bool:
+        return (agora - item.criada_em > self.tempo_max_vida
+                or agora - item.devolvida_em > self.tempo_max_ocioso)
+
+    def _descartar(self, item: _ConexaoNoPool):
+        self._descartadas += 1
+        try:
+            item.conexao.close()
+        except Exception:
+            pass
+
+    def _saudavel(self, item: _ConexaoNoPool) -> bool:
+        try:
+            cursor = item.conexao.cursor()
+            cursor.execute(self.consulta_saude)
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+
+class _RetiradaPool:
+    def __init__(self, pool: PoolConexoes):
+        self._pool = pool
+        self._conexao = None
+
+    def __enter__(self):
+        self._conexao = self._pool.obter()
+        return self._conexao
+
+    def __exit__(self, tipo_exc, exc, tb):
+        self._pool.devolver(self._conexao)
+        return False
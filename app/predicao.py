@@ -0,0 +1,243 @@
+# Arquivo: solarys_api/app/predicao.py
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from . import metricas
+
+# Limite a partir do qual uma tarefa é considerada "Atrasada"
+LIMIAR_ATRASO = 0.5
+
+# Quantas linhas vão para cada chamada de predict_proba no modo em lote
+TAMANHO_LOTE_PADRAO = 5000
+
+
+def formatar_previsao(probabilidade_de_atraso: float) -> dict:
+    """Converte a probabilidade da classe 'Atrasada' no formato de PredictionOutput."""
+    previsao_texto = "Atrasada" if probabilidade_de_atraso > LIMIAR_ATRASO else "No Prazo"
+    return {
+        "previsao": previsao_texto,
+        "probabilidade_de_atraso": float(probabilidade_de_atraso)
+    }
+
+
+def prever_um(modelo, colunas_modelo: list, dados_dict: dict) -> dict:
+    """Caminho original de uma linha: DataFrame -> get_dummies -> reindex -> predict_proba."""
+    # 1. Converter os dados de entrada em um DataFrame do Pandas
+    df_para_prever = pd.DataFrame([dados_dict])
+
+    # 2. Fazer o One-Hot Encoding das variáveis categóricas
+    #    Isso garante que os dados de entrada tenham o mesmo formato dos dados de treino.
+    df_para_prever_encoded = pd.get_dummies(df_para_prever)
+
+    # 3. Alinhar as colunas com as colunas originais do modelo
+    #    Isso cria colunas de '0' para categorias que não estavam nesta entrada, mas que o modelo espera.
+    df_alinhado = df_para_prever_encoded.reindex(columns=colunas_modelo, fill_value=0)
+
+    # 4. Fazer a previsão de probabilidade
+    #    predict_proba retorna a probabilidade para cada classe: [prob_no_prazo, prob_atrasada]
+    probabilidades = modelo.predict_proba(df_alinhado)[0]
+
+    # 5. Pegamos a probabilidade da classe '1' (Atrasada)
+    return formatar_previsao(probabilidades[1])
+
+
+def _extrator_coluna(coluna: str, campos: list):
+    """
+    Devolve uma função que extrai o valor de `coluna` de um dicionário de entrada,
+    reproduzindo o que get_dummies + reindex fariam para essa coluna.
+    """
+    if coluna in campos:
+        return lambda dados: dados[coluna]
+
+    # Colunas de One-Hot Encoding seguem o padrão '<Campo>_<Categoria>'
+    for campo in campos:
+        prefixo = f"{campo}_"
+        if coluna.startswith(prefixo):
+            categoria = coluna[len(prefixo):]
+            return lambda dados: 1 if dados[campo] == categoria else 0
+
+    # Coluna que o modelo espera mas que a entrada não tem: reindex preenche com 0
+    return lambda dados: 0
+
+
+def extratores_features(colunas_modelo: list, campos: list) -> list:
+    """Um extrator por coluna do modelo, na ordem de colunas_modelo."""
+    return [_extrator_coluna(coluna, campos) for coluna in colunas_modelo]
+
+
+def vetor_features(dados: dict, extratores: list) -> tuple:
+    """Vetor de features de uma entrada como tupla de floats (igual a uma linha de montar_matriz_features)."""
+    return tuple(float(extrair(dados)) for extrair in extratores)
+
+
+def montar_matriz_features(lista_dados: list, colunas_modelo: list, campos: list) -> np.ndarray:
+    """
+    Monta uma única matriz NumPy (n_linhas x n_colunas) já na ordem de colunas_modelo,
+    sem passar por DataFrame/get_dummies linha a linha.
+    """
+    with metricas.modelo_segundos.medir("features"):
+        extratores = extratores_features(colunas_modelo, campos)
+        matriz = np.empty((len(lista_dados), len(colunas_modelo)), dtype=np.float64)
+        for j, extrair in enumerate(extratores):
+            matriz[:, j] = [extrair(dados) for dados in lista_dados]
+    return matriz
+
+
+def prever_probabilidades(modelo, colunas_modelo: list, matriz: np.ndarray, tamanho_lote: int = TAMANHO_LOTE_PADRAO) -> np.ndarray:
+    """Chama predict_proba uma vez por bloco de `tamanho_lote` linhas e devolve a coluna 'Atrasada'."""
+    medicao_inicio = time.perf_counter()
+    probabilidades = np.empty(len(matriz), dtype=np.float64)
+    for inicio in range(0, len(matriz), tamanho_lote):
+        bloco = matriz[inicio:inicio + tamanho_lote]
+        # Modelos do sklearn treinados com DataFrame guardam os nomes das features: o DataFrame
+        # (montado a partir de um único bloco NumPy) evita o aviso. A ArvoreCompilada usa o array direto.
+        X = pd.DataFrame(bloco, columns=colunas_modelo) if hasattr(modelo, "feature_names_in_") else bloco
+        probabilidades[inicio:inicio + len(bloco)] = modelo.predict_proba(X)[:, 1]
+    metricas.modelo_segundos.observar(time.perf_counter() - medicao_inicio, "predict_proba")
+    return probabilidades
+
+
+def prever_vetor(modelo, colunas_modelo: list, vetor: tuple) -> float:
+    """Probabilidade de atraso de um único vetor de features já montado (ex.: a chave do cache)."""
+    return float(prever_probabilidades(modelo, colunas_modelo, np.array([vetor], dtype=np.float64))[0])
+
+
+def prever_lote(modelo, colunas_modelo: list, lista_dados: list, campos: list, tamanho_lote: int = TAMANHO_LOTE_PADRAO) -> list:
+    """Caminho vetorizado: uma matriz de features e um predict_proba por bloco."""
+    if not lista_dados:
+        return []
+    matriz = montar_matriz_features(lista_dados, colunas_modelo, campos)
+    probabilidades = prever_probabilidades(modelo, colunas_modelo, matriz, tamanho_lote)
+    return [formatar_previsao(p) for p in probabilidades]
+
+
+def prever_lote_com_cache(cache, modelo, colunas_modelo: list, lista_dados: list, campos: list,
+                          tamanho_lote: int = TAMANHO_LOTE_PADRAO, versao_modelo: str | None = None) -> list:
+    """
+    Como prever_lote, mas consulta o CachePrevisao antes: só os vetores de features que
+    não estão no cache vão para o modelo, e cada vetor repetido no lote é previsto uma vez.
+    Se `versao_modelo` não for a versão do cache (o modelo foi trocado), o cache é ignorado.
+    """
+    if not lista_dados:
+        return []
+    versao = cache.versao_modelo
+    if versao_modelo is not None and versao_modelo != versao:
+        return prever_lote(modelo, colunas_modelo, lista_dados, campos, tamanho_lote)
+    matriz = montar_matriz_features(lista_dados, colunas_modelo, campos)
+    chaves = list(map(tuple, matriz.tolist()))
+    with metricas.modelo_segundos.medir("cache"):
+        probabilidades = cache.obter_varios(chaves)
+
+    # Vetores ausentes do cache, sem repetição: chave -> primeira linha em que aparece
+    faltando = {}
+    for i, probabilidade in enumerate(probabilidades):
+        if probabilidade is None:
+            faltando.setdefault(chaves[i], i)
+
+    if faltando:
+        calculadas = prever_probabilidades(modelo, colunas_modelo, matriz[list(faltando.values())], tamanho_lote)
+        novas = dict(zip(faltando, calculadas.tolist()))
+        cache.guardar_varios(list(novas.items()), versao)
+        probabilidades = [novas[chave] if p is None else p for chave, p in zip(chaves, probabilidades)]
+    return [formatar_previsao(p) for p in probabilidades]
+
+
+class ArvoreCompilada:
+    """
+    Versão "achatada" de um DecisionTreeClassifier do sklearn: feature, limiar, filhos e
+    probabilidade das folhas viram arrays, e a previsão só percorre esses arrays.
+
+    Segue as mesmas regras do sklearn para dar resultados idênticos a predict_proba:
+    as features são convertidas para float32 e o nó vai para a esquerda quando valor <= limiar.
+    """
+
+    def __init__(self, modelo, colunas_modelo: list, campos: list):
+        arvore = modelo.tree_
+        self.colunas_modelo = list(colunas_modelo)
+
+        # Arrays NumPy, usados no caminho vetorizado (lote)
+        self.feature = arvore.feature.astype(np.intp)
+        self.limiar = arvore.threshold.astype(np.float64)
+        self.filho_esquerdo = arvore.children_left.astype(np.intp)
+        self.filho_direito = arvore.children_right.astype(np.intp)
+        self.eh_folha = self.filho_esquerdo == -1
+        # tree_.value já guarda a fração de cada classe na folha, que é o que predict_proba devolve
+        self.probabilidades_folha = arvore.value[:, 0, :modelo.n_classes_].astype(np.float64)
+        indice_atrasada = list(modelo.classes_).index(1)
+        self.proba_atraso_folha = np.ascontiguousarray(self.probabilidades_folha[:, indice_atrasada])
+
+        # Listas Python, usadas no caminho de uma linha (indexar lista é mais barato que indexar ndarray)
+        self._feature = self.feature.tolist()
+        self._limiar = self.limiar.tolist()
+        self._esquerdo = self.filho_esquerdo.tolist()
+        self._direito = self.filho_direito.tolist()
+        self._proba_atraso = self.proba_atraso_folha.tolist()
+        self._extratores = extratores_features(colunas_modelo, campos)
+
+    def probabilidade_atraso(self, dados: dict) -> float:
+        """Percorre a árvore para uma única entrada, lendo os campos já validados."""
+        valores = [float(np.float32(extrair(dados))) for extrair in self._extratores]
+        esquerdo, direito, feature, limiar = self._esquerdo, self._direito, self._feature, self._limiar
+        no = 0
+        while esquerdo[no] != -1:
+            no = esquerdo[no] if valores[feature[no]] <= limiar[no] else direito[no]
+        return self._proba_atraso[no]
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Mesmo contrato de predict_proba do sklearn, percorrendo a árvore nível a nível para todas as linhas."""
+        X = np.asarray(X, dtype=np.float32)
+        no = np.zeros(len(X), dtype=np.intp)
+        linhas = np.arange(len(X))
+        while True:
+            internos = ~self.eh_folha[no[linhas]]
+            linhas = linhas[internos]
+            if not len(linhas):
+                break
+            nos_atuais = no[linhas]
+            vai_esquerda = X[linhas, self.feature[nos_atuais]] <= self.limiar[nos_atuais]
+            no[linhas] = np.where(vai_esquerda, self.filho_esquerdo[nos_atuais], self.filho_direito[nos_atuais])
+        return self.probabilidades_folha[no]
+
+
+def compilar_arvore(modelo, colunas_modelo: list, campos: list, n_verificacao: int = 2000, seed: int = 42):
+    """
+    Compila o modelo em uma ArvoreCompilada se ele for uma árvore de decisão simples,
+    conferindo contra predict_proba em um corpus aleatório. Devolve None quando não dá
+    para compilar (outro tipo de modelo) ou quando o resultado não bate bit a bit.
+    """
+    arvore = getattr(modelo, "tree_", None)
+    if arvore is None or getattr(modelo, "n_outputs_", 1) != 1 or list(getattr(modelo, "classes_", [])) != [0, 1]:
+        return None
+
+    compilada = ArvoreCompilada(modelo, colunas_modelo, campos)
+    X = gerar_corpus_verificacao(compilada, n_verificacao, seed)
+    if not np.array_equal(compilada.predict_proba(X), modelo.predict_proba(pd.DataFrame(X, columns=colunas_modelo))):
+        return None
+    return compilada
+
+
+def gerar_corpus_verificacao(compilada: ArvoreCompilada, n: int, seed: int = 42) -> np.ndarray:
+    """
+    Gera linhas aleatórias para comparar a árvore compilada com o sklearn: metade com
+    valores inteiros na faixa dos limiares e metade exatamente em cima dos limiares
+    (ou logo ao lado), que é onde um erro de comparação apareceria.
+    """
+    rng = np.random.default_rng(seed)
+    n_colunas = len(compilada.colunas_modelo)
+    internos = ~compilada.eh_folha
+    limiares_por_coluna = [compilada.limiar[internos & (compilada.feature == j)] for j in range(n_colunas)]
+
+    X = np.empty((n, n_colunas), dtype=np.float64)
+    for j, limiares in enumerate(limiares_por_coluna):
+        if not len(limiares):
+            X[:, j] = rng.integers(-10, 10, n)
+            continue
+        minimo, maximo = int(np.floor(limiares.min())) - 2, int(np.ceil(limiares.max())) + 2
+        X[:, j] = rng.integers(minimo, maximo + 1, n)
+        metade = n // 2
+        escolhidos = rng.choice(limiares, n - metade)
+        X[metade:, j] = escolhidos + rng.choice([-1e-7, 0.0, 1e-7], n - metade)
+    return X
@@ -0,0 +1,110 @@
+# Arquivo: solarys_api/app/resumo.py
+# Resumo de projetos para a tela do projeto e para a visão de portfólio: em vez de o
+# frontend chamar cinco endpoints (cada um com sua conexão e sua consulta), um único
+# lote de SELECTs agregados roda em uma conexão e os result sets são lidos com nextset().
+
+import datetime
+
+from . import metricas
+
+# Uma tarefa conta como atrasada se já foi marcada assim, se terminou depois do previsto
+# ou se ainda está aberta com o prazo vencido.
+_TAREFA_ATRASADA = (
+    "t.Status = 'Atrasada' OR t.DataFimReal > t.DataFimPrevista "
+    "OR (t.DataFimReal IS NULL AND t.DataFimPrevista < ?)"
+)
+
+# Um SELECT por result set, todos filtrando ProjetoID IN ({ids}). A ordem é a dos result sets.
+_CONSULTAS = {
+    "projetos": "SELECT ProjetoID, Nome, Descricao, Localizacao, DataInicio, DataPrevistaFim, Status "
+                "FROM Projetos WHERE ProjetoID IN ({ids})",
+    "tarefas": "SELECT t.ProjetoID, t.Status, COUNT(*) AS Quantidade, "
+               f"SUM(CASE WHEN {_TAREFA_ATRASADA} THEN 1 ELSE 0 END) AS Atrasadas "
+               "FROM Tarefas t WHERE t.ProjetoID IN ({ids}) GROUP BY t.ProjetoID, t.Status",
+    "orcamento": "SELECT ProjetoID, Tipo, SUM(Valor) AS Total FROM RecursosFinanceiros "
+                 "WHERE ProjetoID IN ({ids}) GROUP BY ProjetoID, Tipo",
+    "materiais": "SELECT ProjetoID, MaterialID, NomeMaterial, Unidade, "
+                 "QuantidadeNecessaria - QuantidadeEmEstoque AS Falta FROM Materiais "
+                 "WHERE ProjetoID IN ({ids}) AND QuantidadeNecessaria > QuantidadeEmEstoque "
+                 "ORDER BY ProjetoID, Falta DESC",
+    "alocacoes": "SELECT ProjetoID, COUNT(DISTINCT FuncionarioID) AS Ativos FROM AlocacaoFuncionarios "
+                 "WHERE ProjetoID IN ({ids}) AND DataInicioAlocacao <= ? "
+                 "AND (DataFimAlocacao IS NULL OR DataFimAlocacao >= ?) GROUP BY ProjetoID",
+}
+
+
+def montar_lote(ids: list, agora: datetime.datetime) -> tuple:
+    """Um único texto com os SELECTs separados por ';' e os parâmetros de todos, na ordem."""
+    marcadores = ", ".join("?" * len(ids))
+    hoje = agora.date()
+    params = {
+        "projetos": ids,
+        "tarefas": [agora, *ids],
+        "orcamento": ids,
+        "materiais": ids,
+        "alocacoes": [*ids, hoje, hoje],
+    }
+    sql = ";\n".join(consulta.format(ids=marcadores) for consulta in _CONSULTAS.values())
+    return sql, [param for nome in _CONSULTAS for param in params[nome]]
+
+
+def _resumo_vazio(projeto: dict) -> dict:
+    return {
+        **projeto,
+        "tarefas": {"total": 0, "por_status": {}, "atrasadas": 0, "proporcao_atrasadas": 0.0},
+        "orcamento": {"total": 0.0, "por_tipo": {}},
+        "materiais_em_falta": [],
+        "alocacoes_ativas": 0,
+    }
+
+
+def resumir_projetos(db, ids: list, agora: datetime.datetime | None = None) -> list:
+    """
+    Resumo de cada projeto de `ids` que existe, na ordem pedida: contagem de tarefas por
+    status e proporção de atrasadas, gasto por Tipo, materiais em falta e funcionários
+    alocados hoje. Tudo em uma ida ao banco (um lote com vários result sets).
+    """
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return []
+    sql, params = montar_lote(ids, agora or datetime.datetime.now())
+    cursor = db.cursor()
+    cursor.execute(sql, *params)
+
+    conjuntos = {}
+    for indice, nome in enumerate(_CONSULTAS):
+        if indice and not cursor.nextset():
+            raise RuntimeError(f"O lote do resumo terminou antes do result set '{nome}'.")
+        colunas = [coluna[0] for coluna in cursor.description]
+        conjuntos[nome] = (colunas, cursor.fetchall())
+    cursor.close()
+
+    with metricas.serializacao_segundos.medir("linhas"):
+        colunas, linhas = conjuntos["projetos"]
+        resumos = {linha[0]: _resumo_vazio(dict(zip(colunas, linha))) for linha in linhas}
+
+        for projeto_id, status_tarefa, quantidade, atrasadas in conjuntos["tarefas"][1]:
+            tarefas = resumos[projeto_id]["tarefas"]
+            tarefas["por_status"][status_tarefa] = quantidade
+            tarefas["total"] += quantidade
+            tarefas["atrasadas"] += atrasadas or 0
+
+        for projeto_id, tipo, total in conjuntos["orcamento"][1]:
+            orcamento = resumos[projeto_id]["orcamento"]
+            orcamento["por_tipo"][tipo] = float(total)
+            orcamento["total"] += float(total)
+
+        for projeto_id, material_id, nome_material, unidade, falta in conjuntos["materiais"][1]:
+            resumos[projeto_id]["materiais_em_falta"].append(
+                {"MaterialID": material_id, "NomeMaterial": nome_material, "Unidade": unidade, "Falta": float(falta)}
+            )
+
+        for projeto_id, ativos in conjuntos["alocacoes"][1]:
+            resumos[projeto_id]["alocacoes_ativas"] = ativos
+
+        for resumo in resumos.values():
+            tarefas = resumo["tarefas"]
+            if tarefas["total"]:
+                tarefas["proporcao_atrasadas"] = tarefas["atrasadas"] / tarefas["total"]
+
+    return [resumos[projeto_id] for projeto_id in ids if projeto_id in resumos]
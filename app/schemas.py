@@ -92,6 +92,56 @@ class AlocacaoFuncionario(AlocacaoFuncionarioBase):
     AlocacaoID: int
     class Config: from_attributes = True
 
+# Disponibilidade de um funcionário em um período (GET /funcionarios/{id}/disponibilidade)
+class PeriodoLivre(BaseModel):
+    inicio: datetime.date
+    fim: datetime.date
+
+class DisponibilidadeFuncionario(BaseModel):
+    FuncionarioID: int
+    data_de: datetime.date
+    data_ate: datetime.date
+    disponivel: bool
+    alocacoes: list[AlocacaoFuncionario]
+    periodos_livres: list[PeriodoLivre]
+
+# Duas alocações do mesmo funcionário com períodos sobrepostos (GET /alocacoes/conflitos)
+class ConflitoAlocacao(BaseModel):
+    FuncionarioID: int
+    inicio: datetime.date
+    fim: datetime.date | None = None
+    alocacoes: list[AlocacaoFuncionario]
+
+# --- INSERÇÃO EM LOTE ---
+# Resposta dos endpoints /bulk: IDs gerados na mesma ordem dos itens enviados
+class InsercaoLoteOutput(BaseModel):
+    quantidade: int
+    ids: list[int]
+
+# --- RESUMO DE PROJETOS ---
+# Agregados da tela do projeto (GET /projetos/{id}/resumo e /projetos/resumo)
+class ResumoTarefas(BaseModel):
+    total: int
+    por_status: dict[str, int]
+    atrasadas: int
+    proporcao_atrasadas: float
+
+class ResumoOrcamento(BaseModel):
+    total: float
+    por_tipo: dict[str, float]
+
+class MaterialEmFalta(BaseModel):
+    MaterialID: int
+    NomeMaterial: str
+    Unidade: str
+    Falta: float
+
+class ResumoProjeto(Projeto):
+    tarefas: ResumoTarefas
+    orcamento: ResumoOrcamento
+    materiais_em_falta: list[MaterialEmFalta]
+    alocacoes_ativas: int
+
 # --- ALERTAS AI ---
 class AlertaAIBase(BaseModel):
     ProjetoID: int
@@ -99,6 +149,9 @@ class AlertaAIBase(BaseModel):
     DescricaoAlerta: str
     NivelSeveridade: str
     Status: str
+    # Preenchidos pelo motor de alertas (app/alertas.py); alertas manuais podem não ter
+    TarefaID: int | None = None
+    ProbabilidadeAtraso: float | None = None
 
 class AlertaAICreate(AlertaAIBase):
     pass
@@ -136,4 +189,9 @@ class TarefaPredictionInput(BaseModel):
 # Schema para a resposta da previsão
 class PredictionOutput(BaseModel):
     previsao: str
-    probabilidade_de_atraso: float
\ No newline at end of file
+    probabilidade_de_atraso: float
+
+# Previsão feita pelo TarefaID: as features usadas vêm calculadas do banco
+class PrevisaoTarefaOutput(PredictionOutput):
+    TarefaID: int
+    features: TarefaPredictionInput
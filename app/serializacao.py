@@ -0,0 +1,100 @@
+# Arquivo: solarys_api/app/serializacao.py
+# Caminho rápido de resposta das listagens: as linhas do banco viram dicts por uma
+# "fábrica" compilada uma vez por (schema, colunas do SELECT) e vão para o orjson direto,
+# sem a nova validação pelo response_model que o FastAPI faria em cada linha.
+#
+# As linhas vêm do nosso SELECT, com as colunas do próprio schema: a validação só
+# repetiria o que o banco já garante. O que ela ainda mudava na saída é feito pela fábrica:
+# campos float saem como float (10 -> 10.0, Decimal -> float) e campos date recebem date
+# mesmo se o driver devolver datetime. O resultado é o mesmo JSON, byte a byte.
+#
+# O response_model das rotas continua o mesmo, então o schema do OpenAPI não muda.
+# Sem o orjson instalado, a codificação cai no json da biblioteca padrão (mesma saída).
+
+import datetime
+import decimal
+import functools
+import json
+import types
+import typing
+
+from fastapi import Response
+
+from . import metricas
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+
+def _json_default(valor):
+    if isinstance(valor, decimal.Decimal):
+        return float(valor)
+    # Só no json da biblioteca padrão: o orjson já serializa datas no mesmo formato ISO
+    if isinstance(valor, (datetime.date, datetime.datetime, datetime.time)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+if orjson is not None:
+    def dumps(conteudo) -> bytes:
+        return orjson.dumps(conteudo, default=_json_default)
+else:
+    _codificar = json.JSONEncoder(default=_json_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode
+
+    def dumps(conteudo) -> bytes:
+        return _codificar(conteudo).encode()
+
+
+class RespostaRapida(Response):
+    """Resposta JSON codificada por `dumps` (orjson), medindo a codificação como a RespostaJSONMedida."""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        with metricas.serializacao_segundos.medir("orjson"):
+            return dumps(content)
+
+
+def _tipo_base(anotacao):
+    # `float | None` -> float
+    if isinstance(anotacao, types.UnionType) or typing.get_origin(anotacao) is typing.Union:
+        tipos = [tipo for tipo in typing.get_args(anotacao) if tipo is not type(None)]
+        return tipos[0] if len(tipos) == 1 else None
+    return anotacao
+
+
+def _para_float(valor):
+    return valor if valor is None or type(valor) is float else float(valor)
+
+
+def _para_data(valor):
+    return valor.date() if isinstance(valor, datetime.datetime) else valor
+
+
+# O que a validação do response_model mudaria em cada tipo de campo (os demais passam como estão)
+_CONVERSORES = {float: "_para_float", datetime.date: "_para_data"}
+
+
+@functools.lru_cache(maxsize=512)
+def fabrica_linhas(modelo, colunas: tuple):
+    """
+    Função linha -> dict para as `colunas` de um SELECT, com as conversões do `modelo`
+    (um schema Pydantic) já resolvidas: os índices e os nomes entram como constantes no
+    código gerado, sem zip nem consulta ao schema por linha.
+    """
+    anotacoes = {nome: _tipo_base(campo.annotation) for nome, campo in modelo.model_fields.items()} if modelo else {}
+    indices = list(enumerate(colunas))
+    if set(colunas) == set(anotacoes):
+        # Linha completa: as chaves saem na ordem do schema, como o response_model faria
+        # (com `fields` a resposta original já seguia a ordem do SELECT)
+        ordem = list(anotacoes)
+        indices.sort(key=lambda item: ordem.index(item[1]))
+    itens = []
+    for indice, coluna in indices:
+        conversor = _CONVERSORES.get(anotacoes.get(coluna))
+        valor = f"linha[{indice}]"
+        itens.append(f"{coluna!r}: {conversor}({valor})" if conversor else f"{coluna!r}: {valor}")
+    codigo = f"lambda linha: {{{', '.join(itens)}}}"
+    return eval(codigo, {"_para_float": _para_float, "_para_data": _para_data})
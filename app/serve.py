@@ -0,0 +1,248 @@
+# Arquivo: solarys_api/app/serve.py
+# Servidor de produção com vários processos (no lugar do `uvicorn app.main:app --reload`,
+# que atende tudo em um só núcleo):
+#   python -m app.serve --workers 4 --host 0.0.0.0 --porta 8000 --conexoes-total 40
+#
+# - Pré-fork: o processo principal importa a API, carrega e aquece o modelo uma única vez,
+#   abre o socket e só então cria os workers com os.fork. Os workers herdam o modelo pronto
+#   (páginas compartilhadas por copy-on-write; com MODELOS_MMAP os arrays vêm do próprio
+#   arquivo) e o /health/ready responde 200 assim que sobem. O gc.freeze() antes do fork
+#   evita que o coletor de lixo dos workers escreva nos objetos herdados e copie as páginas.
+# - Banco: cada worker recebe DB_CONEXOES_TOTAL // workers conexões no pool (e o mesmo número
+#   de threads no executor_db): o SQL Server vê o mesmo limite com 1 ou com 8 workers. As
+#   threads de previsão também são divididas, pelos núcleos da máquina.
+# - SIGTERM (ou Ctrl+C): o processo principal para de recriar workers, fecha o socket e repassa
+#   o sinal. Cada worker (uvicorn) para de aceitar conexões, termina as requisições em andamento
+#   (até SERVIDOR_DRENAGEM_TIMEOUT segundos), roda o desligamento do lifespan (fecha o pool) e
+#   sai; quem passar do prazo recebe SIGKILL.
+# - Um worker que morre fora do desligamento é recriado a partir do processo principal, já
+#   com o modelo carregado. O motor de alertas (ALERTAS_INTERVALO) roda só no worker 0.
+# - Estado entre os workers: com mais de um worker, sem arquivos definidos no ambiente, o
+#   processo principal cria uma pasta temporária (apagada no desligamento) com as versões do
+#   cache de respostas (RESPOSTAS_CACHE_COMPARTILHADO: uma escrita em um worker invalida as
+#   listagens e os ETags de todos) e o estado dos modelos (MODELOS_ESTADO_COMPARTILHADO:
+#   POST /modelos/{versao}/ativar, /sombra e /verificar chegam a todos os workers).
+# - Sem os.fork (Windows), cai no modo multiprocesso do próprio uvicorn: cada worker carrega
+#   o modelo (com mmap, as páginas do arquivo continuam compartilhadas pelo sistema).
+
+import argparse
+import gc
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+import traceback
+
+import uvicorn
+
+from . import config
+
+# Ajustes que só valem se não foram definidos explicitamente no ambiente
+_AJUSTES_OPCIONAIS = ("DB_EXECUTOR_THREADS", "PREVISAO_EXECUTOR_THREADS")
+
+
+def dimensionar(workers: int, conexoes_total: int, pool_minimo: int, nucleos: int) -> dict:
+    """Pool e executores de cada worker a partir do orçamento global de conexões."""
+    por_worker = max(1, conexoes_total // workers)
+    if workers > conexoes_total:
+        print(f"Aviso: {workers} workers para um orçamento de {conexoes_total} conexões; "
+              f"cada worker fica com 1 (total {workers}).")
+    return {
+        "DB_POOL_MAX": por_worker,
+        "DB_POOL_MIN": min(pool_minimo, por_worker),
+        "DB_EXECUTOR_THREADS": por_worker,
+        "PREVISAO_EXECUTOR_THREADS": max(1, nucleos // workers),
+    }
+
+
+def aplicar(ajustes: dict):
+    """
+    Grava os ajustes em app.config (e no ambiente, para workers criados por spawn). Precisa
+    acontecer antes de importar a API: os executores são criados no import de app.executores.
+    """
+    if f"{__package__}.executores" in sys.modules:
+        raise RuntimeError("app.serve precisa dimensionar os workers antes de a API ser importada.")
+    for nome, valor in ajustes.items():
+        if nome in _AJUSTES_OPCIONAIS and nome in os.environ:
+            continue
+        setattr(config, nome, valor)
+        os.environ[nome] = str(valor)
+
+
+class Supervisor:
+    """Processo principal: cria os workers por fork, recria os que morrem e drena no SIGTERM."""
+
+    def __init__(self, app, sock: socket.socket, workers: int, drenagem: float,
+                 log_level: str = "info", preparar_worker=None):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.drenagem = drenagem
+        self.log_level = log_level
+        # Chamada no worker, depois do fork e antes do uvicorn (ex.: trocar o pool nos benchmarks)
+        self.preparar_worker = preparar_worker
+        self._filhos = {}  # pid -> (índice do worker, quando foi criado)
+        self._parar = threading.Event()
+
+    def _sinal(self, numero, _quadro):
+        self._parar.set()
+
+    def _iniciar_worker(self, indice: int):
+        # Sem isso, o que estiver no buffer do processo principal sairia de novo em cada worker
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid:
+            self._filhos[pid] = (indice, time.monotonic())
+            return
+        codigo = 0
+        try:
+            # O uvicorn instala os próprios tratadores; fora dele, o padrão
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            self._executar_worker(indice)
+        except BaseException:
+            traceback.print_exc()
+            codigo = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(codigo)
+
+    def _executar_worker(self, indice: int):
+        from . import main as api
+
+        if indice != 0:
+            api.motor_alertas.intervalo = 0
+        if self.preparar_worker is not None:
+            self.preparar_worker(indice)
+        servidor = uvicorn.Server(uvicorn.Config(
+            self.app, log_level=self.log_level, timeout_graceful_shutdown=self.drenagem, lifespan="on"
+        ))
+        print(f"Worker {indice} (pid {os.getpid()}) atendendo.")
+        servidor.run(sockets=[self.sock])
+
+    def _colher(self) -> list:
+        """Workers que já terminaram: [(pid, índice, criado_em, código de saída)]."""
+        terminados = []
+        while self._filhos:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            if pid in self._filhos:
+                indice, criado_em = self._filhos.pop(pid)
+                terminados.append((pid, indice, criado_em, os.waitstatus_to_exitcode(status)))
+        return terminados
+
+    def executar(self):
+        signal.signal(signal.SIGTERM, self._sinal)
+        signal.signal(signal.SIGINT, self._sinal)
+        for indice in range(self.workers):
+            self._iniciar_worker(indice)
+
+        while not self._parar.wait(0.2):
+            for pid, indice, criado_em, codigo in self._colher():
+                print(f"Worker {indice} (pid {pid}) terminou com código {codigo}; recriando.")
+                # Um worker que morre logo ao subir não pode virar um laço de forks
+                if time.monotonic() - criado_em < 1.0:
+                    self._parar.wait(1.0)
+                if not self._parar.is_set():
+                    self._iniciar_worker(indice)
+        self._drenar()
+
+    def _drenar(self):
+        print(f"Desligando: drenando {len(self._filhos)} worker(s) (até {self.drenagem:.0f}s)...")
+        self.sock.close()
+        for pid in list(self._filhos):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        # Margem além do timeout do uvicorn para o desligamento do lifespan
+        prazo = time.monotonic() + self.drenagem + 5
+        while self._filhos and time.monotonic() < prazo:
+            self._colher()
+            time.sleep(0.05)
+        for pid in list(self._filhos):
+            print(f"Worker {self._filhos[pid][0]} (pid {pid}) não terminou a tempo; SIGKILL.")
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self._filhos.clear()
+
+
+def servir(workers: int = config.SERVIDOR_WORKERS, host: str = config.SERVIDOR_HOST, porta: int = config.SERVIDOR_PORTA,
+           conexoes_total: int = config.DB_CONEXOES_TOTAL, drenagem: float = config.SERVIDOR_DRENAGEM_TIMEOUT,
+           log_level: str = "info", preparar_worker=None):
+    ajustes = dimensionar(workers, conexoes_total, config.DB_POOL_MIN, os.cpu_count() or 1)
+    aplicar(ajustes)
+    print(f"{workers} worker(s) em http://{host}:{porta}: {ajustes['DB_POOL_MAX']} conexões por worker "
+          f"(orçamento de {conexoes_total}).")
+    pasta_estado = None
+    if workers > 1:
+        pasta_estado = tempfile.mkdtemp(prefix="solarys-serve-")
+        aplicar(arquivos_compartilhados(pasta_estado))
+    try:
+        _servir(workers, host, porta, drenagem, log_level, preparar_worker)
+    finally:
+        if pasta_estado is not None:
+            shutil.rmtree(pasta_estado, ignore_errors=True)
+
+
+def arquivos_compartilhados(pasta: str) -> dict:
+    """Arquivos de estado entre os workers que o ambiente não definiu, dentro de `pasta`."""
+    arquivos = {}
+    if not config.RESPOSTAS_CACHE_COMPARTILHADO:
+        arquivos["RESPOSTAS_CACHE_COMPARTILHADO"] = os.path.join(pasta, "versoes_respostas.db")
+    if not config.MODELOS_ESTADO_COMPARTILHADO:
+        arquivos["MODELOS_ESTADO_COMPARTILHADO"] = os.path.join(pasta, "estado_modelos.json")
+    return arquivos
+
+
+def _servir(workers: int, host: str, porta: int, drenagem: float, log_level: str, preparar_worker):
+    if not hasattr(os, "fork"):
+        uvicorn.run("app.main:app", host=host, port=porta, workers=workers, log_level=log_level,
+                    timeout_graceful_shutdown=drenagem)
+        return
+
+    from . import main as api
+
+    if config.MODELOS_CARREGAR:
+        print("Carregando modelo de IA antes de criar os workers...")
+        api._modelo_inicial_carregado(api.registro.carregar_inicial())
+    if threading.active_count() > 1:
+        print(f"Aviso: {threading.active_count() - 1} thread(s) ativas antes do fork; os workers não as herdam.")
+
+    sock = socket.create_server((host, porta), backlog=2048)
+    gc.collect()
+    gc.freeze()
+    Supervisor(api.app, sock, workers, drenagem, log_level, preparar_worker).executar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor da API com vários workers (modelo carregado antes do fork).")
+    parser.add_argument("--workers", type=int, default=config.SERVIDOR_WORKERS)
+    parser.add_argument("--host", default=config.SERVIDOR_HOST)
+    parser.add_argument("--porta", type=int, default=config.SERVIDOR_PORTA)
+    parser.add_argument("--conexoes-total", type=int, default=config.DB_CONEXOES_TOTAL,
+                        help="Conexões com o banco somando todos os workers.")
+    parser.add_argument("--drenagem", type=float, default=config.SERVIDOR_DRENAGEM_TIMEOUT,
+                        help="Segundos para terminar as requisições em andamento depois do SIGTERM.")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    if args.workers < 1 or args.conexoes_total < 1:
+        parser.error("--workers e --conexoes-total precisam ser pelo menos 1.")
+    servir(args.workers, args.host, args.porta, args.conexoes_total, args.drenagem, args.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Arquivo: solarys_api/app/transmissao.py
+# Codificação em blocos das listagens em streaming: lê o cursor com fetchmany(n) e
+# devolve bytes prontos para o socket, sem nunca materializar o resultado inteiro.
+
+import datetime
+import decimal
+import json
+import time
+
+from . import metricas
+
+FORMATO_JSON = "json"
+FORMATO_NDJSON = "ndjson"
+
+MEDIA_TYPES = {
+    FORMATO_JSON: "application/json",
+    FORMATO_NDJSON: "application/x-ndjson",
+}
+
+
+def _json_default(valor):
+    # Mesmo formato que o FastAPI usaria ao validar com o response_model
+    if isinstance(valor, (datetime.date, datetime.datetime, datetime.time)):
+        return valor.isoformat()
+    if isinstance(valor, decimal.Decimal):
+        return float(valor)
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def iterar_blocos(cursor, formato: str, tamanho_lote: int, limite: int | None = None):
+    """
+    Gerador de bytes: um bloco por fetchmany(tamanho_lote). Em FORMATO_JSON os blocos
+    formam um único array JSON; em FORMATO_NDJSON, uma linha JSON por registro.
+    A memória usada depende só de `tamanho_lote`, não do número de linhas.
+    """
+    dumps = json.JSONEncoder(default=_json_default, ensure_ascii=False, separators=(",", ":")).encode
+    columns = [column[0] for column in cursor.description]
+    enviadas = 0
+    try:
+        if formato == FORMATO_JSON:
+            yield b"["
+        while True:
+            quantidade = tamanho_lote if limite is None else min(tamanho_lote, limite - enviadas)
+            if quantidade <= 0:
+                break
+            rows = cursor.fetchmany(quantidade)
+            if not rows:
+                break
+            inicio = time.perf_counter()
+            registros = (dumps(dict(zip(columns, row))) for row in rows)
+            if formato == FORMATO_NDJSON:
+                bloco = "\n".join(registros) + "\n"
+            else:
+                bloco = ("," if enviadas else "") + ",".join(registros)
+            enviadas += len(rows)
+            bloco = bloco.encode()
+            metricas.serializacao_segundos.observar(time.perf_counter() - inicio, "stream")
+            yield bloco
+        if formato == FORMATO_JSON:
+            yield b"]"
+    finally:
+        cursor.close()
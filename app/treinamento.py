@@ -0,0 +1,267 @@
+# Arquivo: solarys_api/app/treinamento.py
+# Pipeline de treinamento do modelo de atraso, no lugar das células de carga, features e
+# gravação do notebook (01_analise_exploratoria.ipynb):
+#
+# - Extração incremental: a mesma consulta de features da API (app/features.py), com a
+#   VersaoLinha (rowversion, sql/003_alertas.sql) como marca d'água, como no motor de
+#   alertas. Só as tarefas inseridas ou alteradas desde a última extração são lidas, em
+#   blocos de fetchmany, e abaixo de MIN_ACTIVE_ROWVERSION().
+# - Cache em Parquet: as linhas extraídas ficam em <cache>/tarefas.parquet; as novas versões
+#   de uma tarefa substituem a anterior pelo TarefaID. A marca fica em <cache>/estado.json,
+#   junto dos dados (apagar a pasta recomeça do zero), com a impressão do SQL: se a consulta
+#   de features mudar, o cache é refeito inteiro. Tarefas excluídas do banco só saem do cache
+#   com --completo. Mudar o Status de um projeto não muda a VersaoLinha das tarefas: o
+#   StatusProjeto do cache é relido de Projetos (tabela pequena) a cada execução.
+# - Codificação: features.colunas_modelo (uma coluna por categoria, sem drop_first) e a matriz
+#   montada por predicao.montar_matriz_features, o mesmo código que monta as entradas na API.
+#   Um campo sem coluna no modelo interrompe o treino (features.campos_sem_coluna).
+# - Treino só com as tarefas concluídas (DataFimReal preenchida): nelas o Status final é
+#   conhecido e a DiferencaDuracao não depende da data da extração.
+# - Artefatos versionados no diretório de modelos: modelo_atraso_v<N>.joblib,
+#   colunas_modelo_v<N>.json e metricas_modelo_v<N>.json, com N = maior versão existente + 1.
+#   O .joblib é gravado por último (renomeado de um arquivo temporário): o registro de
+#   modelos só enxerga a versão quando ela está completa.
+#
+# Uso (a partir da raiz do projeto):
+#   python -m app.treinamento
+#   python -m app.treinamento --completo --profundidade-maxima 8
+#   python -m app.treinamento --sem-publicar
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from . import config, features, predicao
+from .modelos import descobrir_artefatos
+
+SQL_EXTRACAO = features.montar_sql_features(
+    "t.VersaoLinha > CAST(? AS BINARY(8)) AND t.VersaoLinha < MIN_ACTIVE_ROWVERSION()",
+    ordem="f.VersaoLinha",
+    extras=(("t.ProjetoID", "ProjetoID"), ("t.Status", "StatusTarefa"), ("t.VersaoLinha", "VersaoLinha"), ("", "Concluida")),
+)
+# Muda sempre que a consulta de features muda: invalida o cache
+IMPRESSAO_SQL = hashlib.sha256(SQL_EXTRACAO.encode()).hexdigest()[:16]
+
+STATUS_ATRASADA = "Atrasada"
+NOMES_CLASSES = ["No Prazo", "Atrasada"]
+
+
+class ErroTreinamento(Exception):
+    pass
+
+
+class CacheTreino:
+    """Features extraídas (Parquet) e a marca da última extração."""
+
+    def __init__(self, pasta: str):
+        self.pasta = pasta
+        self.caminho_dados = os.path.join(pasta, "tarefas.parquet")
+        self.caminho_estado = os.path.join(pasta, "estado.json")
+
+    def estado(self) -> dict | None:
+        """O estado gravado, ou None se não houver cache válido para a consulta atual."""
+        if not (os.path.exists(self.caminho_estado) and os.path.exists(self.caminho_dados)):
+            return None
+        with open(self.caminho_estado, "r") as f:
+            estado = json.load(f)
+        return estado if estado.get("impressao_sql") == IMPRESSAO_SQL else None
+
+    def ler(self) -> pd.DataFrame:
+        return pd.read_parquet(self.caminho_dados)
+
+    def gravar(self, dados: pd.DataFrame, marca: int):
+        # Dados antes do estado: se o processo cair no meio, a marca antiga só faz reler linhas
+        os.makedirs(self.pasta, exist_ok=True)
+        temporario = self.caminho_dados + ".tmp"
+        dados.to_parquet(temporario, index=False)
+        os.replace(temporario, self.caminho_dados)
+        with open(self.caminho_estado, "w") as f:
+            json.dump({
+                "marca": marca,
+                "linhas": len(dados),
+                "impressao_sql": IMPRESSAO_SQL,
+                "atualizado_em": datetime.datetime.now().isoformat(timespec="seconds"),
+            }, f, indent=2)
+
+
+def extrair(db, marca: int, tamanho_bloco: int) -> tuple:
+    """Tarefas com VersaoLinha > marca, lidas em blocos. Devolve (DataFrame, nova marca, blocos lidos)."""
+    cursor = db.cursor()
+    cursor.execute(SQL_EXTRACAO, marca)
+    colunas = [coluna[0] for coluna in cursor.description]
+    indice_versao = colunas.index("VersaoLinha")
+    blocos = []
+    while True:
+        linhas = cursor.fetchmany(tamanho_bloco)
+        if not linhas:
+            break
+        bloco = pd.DataFrame.from_records([tuple(linha) for linha in linhas], columns=colunas)
+        bloco["VersaoLinha"] = [features.versao_linha(linha[indice_versao]) for linha in linhas]
+        blocos.append(bloco)
+    cursor.close()
+
+    if not blocos:
+        return pd.DataFrame(columns=colunas), marca, 0
+    dados = pd.concat(blocos, ignore_index=True)
+    return dados, int(dados["VersaoLinha"].iloc[-1]), len(blocos)
+
+
+def _atualizar_status_projetos(db, dados: pd.DataFrame) -> int:
+    """Aplica o Status atual de cada projeto às tarefas do cache. Devolve quantas linhas mudaram."""
+    cursor = db.cursor()
+    cursor.execute("SELECT ProjetoID, Status FROM Projetos")
+    status = dict((linha[0], linha[1]) for linha in cursor.fetchall())
+    cursor.close()
+    # Projeto excluído: a tarefa fica com o último Status conhecido
+    atual = dados["ProjetoID"].map(status).fillna(dados["StatusProjeto"])
+    alterados = int((atual != dados["StatusProjeto"]).sum())
+    if alterados:
+        dados["StatusProjeto"] = atual
+    return alterados
+
+
+def atualizar_cache(db, cache: CacheTreino, tamanho_bloco: int, completo: bool = False) -> tuple:
+    """Traz do banco só o que mudou desde a última extração e atualiza o cache. Devolve (dados, resumo)."""
+    inicio = time.perf_counter()
+    estado = None if completo else cache.estado()
+    marca = estado["marca"] if estado else 0
+    novos, nova_marca, blocos = extrair(db, marca, tamanho_bloco)
+
+    if estado is None:
+        dados = novos
+    elif novos.empty:
+        dados = cache.ler()
+    else:
+        # A versão mais recente de cada tarefa vence (as novas vêm depois no concat)
+        dados = pd.concat([cache.ler(), novos], ignore_index=True).drop_duplicates("TarefaID", keep="last")
+    dados = dados.sort_values("TarefaID", ignore_index=True)
+    alterados = _atualizar_status_projetos(db, dados) if estado is not None else 0
+    if estado is None or not novos.empty or alterados:
+        cache.gravar(dados, nova_marca)
+
+    return dados, {
+        "incremental": estado is not None,
+        "marca_anterior": marca,
+        "marca": nova_marca,
+        "linhas_extraidas": len(novos),
+        "blocos": blocos,
+        "status_projeto_atualizados": alterados,
+        "linhas_no_cache": len(dados),
+        "segundos": time.perf_counter() - inicio,
+    }
+
+
+def treinar(dados: pd.DataFrame, seed: int = 42, fracao_teste: float = 0.2, profundidade_maxima: int | None = None) -> tuple:
+    """Treina a árvore de decisão nas tarefas concluídas. Devolve (modelo, colunas do modelo, métricas)."""
+    from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+    from sklearn.model_selection import train_test_split
+    from sklearn.tree import DecisionTreeClassifier
+
+    inicio = time.perf_counter()
+    concluidas = dados[dados["Concluida"] == 1]
+    y = (concluidas["StatusTarefa"] == STATUS_ATRASADA).astype(int).to_numpy()
+    if len(concluidas) < 10 or len(np.unique(y)) < 2:
+        raise ErroTreinamento(f"dados insuficientes: {len(concluidas)} tarefas concluídas, classes {sorted(set(y.tolist()))}")
+
+    categorias = {campo: sorted(concluidas[campo].dropna().unique().tolist()) for campo in features.CAMPOS_CATEGORICOS}
+    colunas = features.colunas_modelo(categorias)
+    ignorados = features.campos_sem_coluna(colunas)
+    if ignorados:
+        raise ErroTreinamento(f"campos sem coluna no modelo: {ignorados}")
+
+    registros = concluidas[list(features.CAMPOS_FEATURES)].to_dict("records")
+    # O DataFrame guarda os nomes das colunas no modelo (feature_names_in_), como no notebook
+    X = pd.DataFrame(predicao.montar_matriz_features(registros, colunas, list(features.CAMPOS_FEATURES)), columns=colunas)
+    X_treino, X_teste, y_treino, y_teste = train_test_split(X, y, test_size=fracao_teste, random_state=seed, stratify=y)
+
+    modelo = DecisionTreeClassifier(random_state=seed, max_depth=profundidade_maxima)
+    modelo.fit(X_treino, y_treino)
+    previsoes = modelo.predict(X_teste)
+
+    metricas = {
+        "linhas_treino": len(X_treino),
+        "linhas_teste": len(X_teste),
+        "taxa_atraso": float(y.mean()),
+        "acuracia": float(accuracy_score(y_teste, previsoes)),
+        "relatorio": classification_report(y_teste, previsoes, target_names=NOMES_CLASSES, output_dict=True, zero_division=0),
+        "matriz_confusao": confusion_matrix(y_teste, previsoes).tolist(),
+        "importancia_colunas": dict(zip(colunas, modelo.feature_importances_.round(6).tolist())),
+        "categorias": categorias,
+        "profundidade": int(modelo.get_depth()),
+        "folhas": int(modelo.get_n_leaves()),
+        "segundos": time.perf_counter() - inicio,
+    }
+    return modelo, colunas, metricas
+
+
+def publicar(modelo, colunas: list, metricas: dict, diretorio: str) -> str:
+    """Grava a próxima versão dos artefatos em `diretorio` e devolve o nome da versão (ex.: 'v2')."""
+    import joblib
+
+    artefatos = descobrir_artefatos(diretorio)
+    numero = artefatos[-1].numero + 1 if artefatos else 1
+    caminho_modelo = os.path.join(diretorio, f"modelo_atraso_v{numero}.joblib")
+
+    with open(os.path.join(diretorio, f"colunas_modelo_v{numero}.json"), "w") as f:
+        json.dump(colunas, f)
+    with open(os.path.join(diretorio, f"metricas_modelo_v{numero}.json"), "w") as f:
+        json.dump({"versao": f"v{numero}", **metricas}, f, indent=2, ensure_ascii=False)
+    # Sem compressão: o registro carrega os arrays com mmap
+    temporario = caminho_modelo + ".tmp"
+    joblib.dump(modelo, temporario)
+    os.replace(temporario, caminho_modelo)
+    return f"v{numero}"
+
+
+def executar(db, args) -> dict:
+    cache = CacheTreino(args.cache_dir)
+    dados, extracao = atualizar_cache(db, cache, args.tamanho_bloco, args.completo)
+    modo = "incremental" if extracao["incremental"] else "completa"
+    print(f"Extração {modo}: {extracao['linhas_extraidas']} linhas em {extracao['blocos']} blocos "
+          f"({extracao['segundos']:.2f} s); {extracao['linhas_no_cache']} tarefas no cache.")
+
+    modelo, colunas, metricas = treinar(dados, args.seed, args.fracao_teste, args.profundidade_maxima)
+    metricas = {
+        "treinado_em": datetime.datetime.now().isoformat(timespec="seconds"),
+        **metricas,
+        "extracao": extracao,
+        "parametros": {"seed": args.seed, "fracao_teste": args.fracao_teste, "profundidade_maxima": args.profundidade_maxima},
+    }
+    print(f"Treino: {metricas['linhas_treino']} linhas, acurácia {metricas['acuracia']:.2%} em {metricas['linhas_teste']} "
+          f"de teste ({metricas['segundos']:.2f} s). Colunas: {colunas}")
+
+    if not args.sem_publicar:
+        metricas["versao"] = publicar(modelo, colunas, metricas, args.modelos_dir)
+        print(f"Artefatos da versão {metricas['versao']} gravados em {args.modelos_dir}")
+    return metricas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extrai as features (incremental), treina e publica uma nova versão do modelo de atraso.")
+    parser.add_argument("--completo", action="store_true", help="Ignora o cache e extrai todas as tarefas.")
+    parser.add_argument("--cache-dir", default=config.TREINAMENTO_CACHE_DIR)
+    parser.add_argument("--modelos-dir", default=config.MODELOS_DIR)
+    parser.add_argument("--tamanho-bloco", type=int, default=config.TREINAMENTO_TAMANHO_BLOCO)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--fracao-teste", type=float, default=0.2)
+    parser.add_argument("--profundidade-maxima", type=int, default=None)
+    parser.add_argument("--sem-publicar", action="store_true", help="Só treina e mostra as métricas, sem gravar artefatos.")
+    args = parser.parse_args()
+
+    import pyodbc
+
+    db = pyodbc.connect(config.DATABASE_URL)
+    try:
+        executar(db, args)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+# Arquivo: solarys_api/benchmarks/banco_local.py
+# Banco local para testes e benchmarks offline: SQLite por trás de um adaptador fino com
+# a mesma interface que a API usa do pyodbc (cursor.execute(sql, *params), description,
+# rowcount, fetchone/fetchmany/fetchall, commit/rollback) e o mesmo esquema do SQL Server.
+#
+# O adaptador traduz as poucas construções T-SQL que a API usa:
+#   - "OUTPUT INSERTED.<Coluna>"              ->  "RETURNING <Coluna>"
+#   - "OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY"    ->  "LIMIT ?"
+#   - "SELECT TOP 0 ... INTO #T FROM X"          ->  "CREATE TEMP TABLE T AS SELECT ... LIMIT 0"
+#   - "#T" / "TRUNCATE TABLE"                    ->  "temp.T" / "DELETE FROM"
+#   - "DATEDIFF(day, a, b)"                      ->  "DATEDIFF('day', a, b)"
+#   - "CAST(? AS BINARY(8))"                     ->  "?"
+# e registra DATEDIFF, MONTH, GETDATE e MIN_ACTIVE_ROWVERSION como funções SQL. O
+# rowversion de Tarefas.VersaoLinha é emulado por triggers (um contador por tabela). Lotes com vários comandos
+# separados por ';' viram vários result sets, percorridos com nextset() como no pyodbc.
+
+import datetime
+import re
+import sqlite3
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS Projetos (
+    ProjetoID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Nome TEXT NOT NULL,
+    Descricao TEXT,
+    Localizacao TEXT,
+    DataInicio DATE NOT NULL,
+    DataPrevistaFim DATE NOT NULL,
+    Status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS IX_Projetos_Status ON Projetos(Status);
+CREATE INDEX IF NOT EXISTS IX_Projetos_DataInicio ON Projetos(DataInicio);
+CREATE TABLE IF NOT EXISTS Tarefas (
+    TarefaID INTEGER PRIMARY KEY AUTOINCREMENT,
+    ProjetoID INTEGER NOT NULL REFERENCES Projetos(ProjetoID),
+    Descricao TEXT NOT NULL,
+    DataInicioPrevista TIMESTAMP NOT NULL,
+    DataFimPrevista TIMESTAMP NOT NULL,
+    DataInicioReal TIMESTAMP,
+    DataFimReal TIMESTAMP,
+    Status TEXT NOT NULL,
+    VersaoLinha INTEGER
+);
+CREATE INDEX IF NOT EXISTS IX_Tarefas_ProjetoID ON Tarefas(ProjetoID);
+CREATE INDEX IF NOT EXISTS IX_Tarefas_VersaoLinha ON Tarefas(VersaoLinha);
+-- Emulam o rowversion do SQL Server: um contador que cresce a cada INSERT/UPDATE da linha
+CREATE TRIGGER IF NOT EXISTS TR_Tarefas_VersaoLinha_Insert AFTER INSERT ON Tarefas BEGIN
+    UPDATE Tarefas SET VersaoLinha = (SELECT COALESCE(MAX(VersaoLinha), 0) + 1 FROM Tarefas) WHERE TarefaID = NEW.TarefaID;
+END;
+CREATE TRIGGER IF NOT EXISTS TR_Tarefas_VersaoLinha_Update AFTER UPDATE ON Tarefas BEGIN
+    UPDATE Tarefas SET VersaoLinha = (SELECT COALESCE(MAX(VersaoLinha), 0) + 1 FROM Tarefas) WHERE TarefaID = NEW.TarefaID;
+END;
+CREATE INDEX IF NOT EXISTS IX_Tarefas_Status ON Tarefas(Status);
+CREATE INDEX IF NOT EXISTS IX_Tarefas_DataInicioPrevista ON Tarefas(DataInicioPrevista);
+CREATE TABLE IF NOT EXISTS RecursosFinanceiros (
+    RecursoFinanceiroID INTEGER PRIMARY KEY AUTOINCREMENT,
+    ProjetoID INTEGER NOT NULL REFERENCES Projetos(ProjetoID),
+    Tipo TEXT NOT NULL,
+    Descricao TEXT NOT NULL,
+    Valor REAL NOT NULL,
+    Data DATE NOT NULL
+);
+CREATE INDEX IF NOT EXISTS IX_RecursosFinanceiros_ProjetoID ON RecursosFinanceiros(ProjetoID);
+CREATE TABLE IF NOT EXISTS Materiais (
+    MaterialID INTEGER PRIMARY KEY AUTOINCREMENT,
+    ProjetoID INTEGER NOT NULL REFERENCES Projetos(ProjetoID),
+    NomeMaterial TEXT NOT NULL,
+    QuantidadeNecessaria REAL NOT NULL,
+    QuantidadeEmEstoque REAL NOT NULL DEFAULT 0,
+    Unidade TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS IX_Materiais_ProjetoID ON Materiais(ProjetoID);
+CREATE TABLE IF NOT EXISTS Funcionarios (
+    FuncionarioID INTEGER PRIMARY KEY AUTOINCREMENT,
+    NomeCompleto TEXT NOT NULL,
+    Funcao TEXT NOT NULL,
+    Status TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS AlocacaoFuncionarios (
+    AlocacaoID INTEGER PRIMARY KEY AUTOINCREMENT,
+    FuncionarioID INTEGER NOT NULL REFERENCES Funcionarios(FuncionarioID),
+    ProjetoID INTEGER NOT NULL REFERENCES Projetos(ProjetoID),
+    DataInicioAlocacao DATE NOT NULL,
+    DataFimAlocacao DATE
+);
+CREATE INDEX IF NOT EXISTS IX_AlocacaoFuncionarios_ProjetoID ON AlocacaoFuncionarios(ProjetoID);
+CREATE INDEX IF NOT EXISTS IX_AlocacaoFuncionarios_FuncionarioID ON AlocacaoFuncionarios(FuncionarioID, DataInicioAlocacao);
+CREATE TABLE IF NOT EXISTS AlertasAI (
+    AlertaID INTEGER PRIMARY KEY AUTOINCREMENT,
+    ProjetoID INTEGER NOT NULL REFERENCES Projetos(ProjetoID),
+    TarefaID INTEGER REFERENCES Tarefas(TarefaID),
+    TipoAlerta TEXT NOT NULL,
+    DescricaoAlerta TEXT NOT NULL,
+    NivelSeveridade TEXT NOT NULL,
+    Status TEXT NOT NULL,
+    ProbabilidadeAtraso REAL,
+    DataGeracao TIMESTAMP NOT NULL
+);
+CREATE INDEX IF NOT EXISTS IX_AlertasAI_ProjetoID ON AlertasAI(ProjetoID);
+CREATE INDEX IF NOT EXISTS IX_AlertasAI_TarefaID ON AlertasAI(TarefaID);
+CREATE TABLE IF NOT EXISTS SugestoesAI (
+    SugestaoID INTEGER PRIMARY KEY AUTOINCREMENT,
+    AlertaID INTEGER NOT NULL REFERENCES AlertasAI(AlertaID),
+    DescricaoSugestao TEXT NOT NULL,
+    ImpactoEstimado TEXT,
+    StatusAprovacao TEXT NOT NULL DEFAULT 'Pendente'
+);
+CREATE INDEX IF NOT EXISTS IX_SugestoesAI_AlertaID ON SugestoesAI(AlertaID);
+CREATE TABLE IF NOT EXISTS MarcasProcessamento (
+    Processo TEXT PRIMARY KEY,
+    Marca INTEGER NOT NULL,
+    AtualizadoEm TIMESTAMP NOT NULL
+);
+"""
+
+_OUTPUT_INSERTED = re.compile(r"\s+OUTPUT\s+INSERTED\.(\w+)", re.IGNORECASE)
+_OFFSET_FETCH = re.compile(r"OFFSET\s+0\s+ROWS\s+FETCH\s+NEXT\s+(\?|\d+)\s+ROWS\s+ONLY", re.IGNORECASE)
+_SELECT_INTO_TEMPORARIA = re.compile(r"SELECT\s+TOP\s+0\s+(.+?)\s+INTO\s+#(\w+)\s+FROM\s+(\w+)", re.IGNORECASE | re.DOTALL)
+_TEMPORARIA = re.compile(r"#(\w+)")
+_TRUNCATE = re.compile(r"TRUNCATE\s+TABLE", re.IGNORECASE)
+_DATEDIFF = re.compile(r"DATEDIFF\(\s*(\w+)\s*,", re.IGNORECASE)
+_DICAS_TRAVA = re.compile(r"\s+WITH\s*\(\s*\w+(\s*,\s*\w+)*\s*\)", re.IGNORECASE)
+_CAST_BINARIO = re.compile(r"CAST\(\s*\?\s+AS\s+BINARY\(\d+\)\s*\)", re.IGNORECASE)
+
+# Sem transações concorrentes a esperar, toda versão gravada já é visível
+_MAIOR_VERSAO = 2 ** 63 - 1
+
+# Conversores explícitos (os padrões do sqlite3 estão depreciados desde o Python 3.12)
+sqlite3.register_adapter(datetime.date, lambda d: d.isoformat())
+sqlite3.register_adapter(datetime.datetime, lambda d: d.isoformat(" "))
+sqlite3.register_converter("DATE", lambda b: datetime.date.fromisoformat(b.decode()))
+sqlite3.register_converter("TIMESTAMP", lambda b: datetime.datetime.fromisoformat(b.decode()))
+
+
+def traduzir_sql(sql: str) -> str:
+    """Converte as construções T-SQL usadas pela API para o dialeto do SQLite."""
+    retorno = _OUTPUT_INSERTED.search(sql)
+    if retorno:
+        sql = _OUTPUT_INSERTED.sub("", sql, count=1).rstrip().rstrip(";") + f" RETURNING {retorno.group(1)}"
+    # O SQLite não desfaz DDL fora de uma transação aberta: IF NOT EXISTS tolera a sobra de um rollback
+    sql = _SELECT_INTO_TEMPORARIA.sub(r"CREATE TEMP TABLE IF NOT EXISTS \2 AS SELECT \1 FROM \3 LIMIT 0", sql)
+    sql = _TRUNCATE.sub("DELETE FROM", _TEMPORARIA.sub(r"temp.\1", sql))
+    sql = _DATEDIFF.sub(r"DATEDIFF('\1',", sql)
+    sql = _CAST_BINARIO.sub("?", sql)
+    # Dicas de trava (UPDLOCK, HOLDLOCK): o SQLite já serializa as escritas
+    sql = _DICAS_TRAVA.sub("", sql)
+    return _OFFSET_FETCH.sub(r"LIMIT \1", sql)
+
+
+def _data(valor) -> datetime.date | None:
+    # Nas funções SQL as datas chegam como texto ISO ("2024-01-02" ou "2024-01-02 08:00:00")
+    return None if valor is None else datetime.datetime.fromisoformat(str(valor)).date()
+
+
+def _datediff(unidade: str, inicio, fim):
+    # Só a unidade "day" é usada pela API: conta as viradas de dia, como no SQL Server
+    if unidade.lower() != "day":
+        raise ValueError(f"DATEDIFF com unidade não suportada: {unidade}")
+    if inicio is None or fim is None:
+        return None
+    return (_data(fim) - _data(inicio)).days
+
+
+def _month(valor):
+    return None if valor is None else _data(valor).month
+
+
+def _getdate():
+    return datetime.datetime.now().isoformat(" ")
+
+
+def _parametros(params: tuple) -> tuple:
+    # pyodbc aceita tanto execute(sql, a, b) quanto execute(sql, (a, b))
+    if len(params) == 1 and isinstance(params[0], (list, tuple)):
+        return tuple(params[0])
+    return params
+
+
+class CursorSQLite:
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+        # Comandos restantes de um lote (sql, params), executados a cada nextset()
+        self._pendentes = []
+        # Aceito (e ignorado) para o código que liga o modo rápido do pyodbc
+        self.fast_executemany = False
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def execute(self, sql: str, *params):
+        params = _parametros(params)
+        comandos = [comando for comando in sql.split(";") if comando.strip()]
+        if len(comandos) > 1:
+            # Lote: cada comando leva os seus parâmetros, na ordem em que os '?' aparecem
+            self._pendentes = []
+            for comando in comandos:
+                quantidade = comando.count("?")
+                self._pendentes.append((comando, params[:quantidade]))
+                params = params[quantidade:]
+            self.nextset()
+            return self
+        self._pendentes = []
+        self._cursor.execute(traduzir_sql(sql), params)
+        return self
+
+    def executemany(self, sql: str, seq_params):
+        self._cursor.executemany(traduzir_sql(sql), seq_params)
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size: int = 1):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def nextset(self):
+        if not self._pendentes:
+            return False
+        comando, params = self._pendentes.pop(0)
+        self._cursor.execute(traduzir_sql(comando), params)
+        return True
+
+    def close(self):
+        self._cursor.close()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+
+class ConexaoSQLite:
+    def __init__(self, conexao: sqlite3.Connection):
+        self._conexao = conexao
+
+    def cursor(self) -> CursorSQLite:
+        return CursorSQLite(self._conexao.cursor())
+
+    def execute(self, sql: str, *params) -> CursorSQLite:
+        return self.cursor().execute(sql, *params)
+
+    def commit(self):
+        self._conexao.commit()
+
+    def rollback(self):
+        self._conexao.rollback()
+
+    def close(self):
+        self._conexao.close()
+
+
+def conectar(caminho: str = ":memory:") -> ConexaoSQLite:
+    """Abre uma conexão com o banco local, criando o esquema se ainda não existir."""
+    conexao = sqlite3.connect(
+        caminho, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False, uri=caminho.startswith("file:")
+    )
+    conexao.create_function("DATEDIFF", 3, _datediff, deterministic=True)
+    conexao.create_function("MONTH", 1, _month, deterministic=True)
+    conexao.create_function("GETDATE", 0, _getdate)
+    conexao.create_function("MIN_ACTIVE_ROWVERSION", 0, lambda: _MAIOR_VERSAO)
+    conexao.executescript(ESQUEMA)
+    conexao.commit()
+    return ConexaoSQLite(conexao)
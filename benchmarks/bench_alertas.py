@@ -0,0 +1,175 @@
+# Arquivo: solarys_api/benchmarks/bench_alertas.py
+# Roda o motor de alertas (app/alertas.py) contra o banco local SQLite: um primeiro ciclo
+# pontua todas as tarefas, depois uma fração delas é alterada e o ciclo incremental (só as
+# alteradas, pela VersaoLinha) é comparado com uma nova pontuação completa. Tudo passa
+# pelos endpoints (POST /alertas/processar, GET /projetos/{id}/alertas/ e
+# GET /alertas/{id}/sugestoes/), então serve também de teste ponta a ponta do motor.
+#
+# Uso (a partir da raiz do projeto):
+#   python -m benchmarks.bench_alertas
+#   python -m benchmarks.bench_alertas --tarefas 100000 --alteradas 0.01 --tamanho-bloco 5000
+
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+from app import alertas, database
+from app.main import app, motor_alertas
+from app.pool import PoolConexoes
+from benchmarks import banco_local
+
+
+def popular(conexao, projetos: int, tarefas: int, seed: int):
+    """Tarefas a começar, em andamento (algumas já estourando o prazo) e concluídas."""
+    rng = random.Random(seed)
+    cursor = conexao.cursor()
+    cursor.executemany(
+        "INSERT INTO Projetos (Nome, DataInicio, DataPrevistaFim, Status) VALUES (?, ?, ?, ?)",
+        [(f"Projeto {p}", "2025-01-01", "2025-12-31", rng.choice(["Em Andamento", "Planejado"])) for p in range(projetos)]
+    )
+    hoje = datetime.datetime.now().replace(microsecond=0)
+    linhas = []
+    for i in range(tarefas):
+        inicio = hoje + datetime.timedelta(days=rng.randint(-120, 60))
+        fim = inicio + datetime.timedelta(days=rng.randint(3, 40))
+        inicio_real = fim_real = None
+        if inicio < hoje:
+            inicio_real = inicio + datetime.timedelta(days=rng.randint(0, 5))
+            if rng.random() < 0.4:
+                fim_real = min(fim + datetime.timedelta(days=rng.randint(-2, 15)), hoje)
+        linhas.append((rng.randint(1, projetos), f"Tarefa {i}", inicio, fim, inicio_real, fim_real,
+                       "Concluída" if fim_real else ("Em Andamento" if inicio_real else "Pendente")))
+    cursor.executemany(
+        "INSERT INTO Tarefas (ProjetoID, Descricao, DataInicioPrevista, DataFimPrevista, DataInicioReal, DataFimReal, Status) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)", linhas
+    )
+    conexao.commit()
+
+
+def alterar(conexao, fracao: float, total: int, seed: int) -> int:
+    """Adia o fim previsto de uma fração das tarefas (cada UPDATE muda a VersaoLinha)."""
+    ids = random.Random(seed).sample(range(1, total + 1), max(1, int(total * fracao)))
+    cursor = conexao.cursor()
+    cursor.executemany("UPDATE Tarefas SET DataFimPrevista = DATETIME(DataFimPrevista, '+3 days') WHERE TarefaID = ?", [(i,) for i in ids])
+    conexao.commit()
+    return len(ids)
+
+
+def abertos_por_tarefa(conexao) -> dict:
+    cursor = conexao.cursor()
+    cursor.execute("SELECT TarefaID, AlertaID FROM AlertasAI WHERE Status = ?", alertas.STATUS_ABERTO)
+    return dict(cursor.fetchall())
+
+
+def contar_sugestoes(conexao) -> int:
+    cursor = conexao.cursor()
+    cursor.execute("SELECT COUNT(*) FROM SugestoesAI")
+    return cursor.fetchone()[0]
+
+
+def processar(cliente: TestClient, **params) -> tuple:
+    inicio = time.perf_counter()
+    resposta = cliente.post("/alertas/processar", params=params)
+    assert resposta.status_code == 200, resposta.text
+    return resposta.json(), (time.perf_counter() - inicio) * 1000
+
+
+def esperar_modelo(cliente: TestClient, timeout: float = 60.0):
+    """O modelo carrega em segundo plano no lifespan: espera o /health/ready."""
+    prazo = time.monotonic() + timeout
+    while (resposta := cliente.get("/health/ready")).status_code != 200:
+        if resposta.json()["status"] != "carregando" or time.monotonic() > prazo:
+            raise SystemExit(f"Modelo não carregado: {resposta.json()}")
+        time.sleep(0.05)
+
+
+def executar(cliente: TestClient, conexao, args):
+    esperar_modelo(cliente)
+
+    print(f"{args.tarefas} tarefas em {args.projetos} projetos, blocos de {args.tamanho_bloco}, "
+          f"limiares {dict(motor_alertas.limiares)}")
+    linhas = []
+
+    primeiro, ms = processar(cliente)
+    assert primeiro["tarefas_lidas"] == args.tarefas
+    linhas.append(("primeiro ciclo (todas)", primeiro, ms))
+
+    vazio, ms = processar(cliente)
+    assert vazio["tarefas_lidas"] == 0, "sem alterações o ciclo não deveria ler nenhuma tarefa"
+    linhas.append(("ciclo sem alterações", vazio, ms))
+
+    alteradas = alterar(conexao, args.alteradas, args.tarefas, args.seed)
+    incremental, ms = processar(cliente)
+    assert incremental["tarefas_lidas"] == alteradas, (incremental["tarefas_lidas"], alteradas)
+    linhas.append((f"incremental ({alteradas} alteradas)", incremental, ms))
+
+    # Editar só a descrição não muda o risco: os alertas abertos continuam os mesmos (mesmo
+    # AlertaID), nada é resolvido nem recriado, e a sugestão aprovada segue no alerta aberto
+    antes, sugestoes_antes = abertos_por_tarefa(conexao), contar_sugestoes(conexao)
+    editadas = sorted(antes)[:max(1, len(antes) // 100)]
+    cursor = conexao.cursor()
+    cursor.executemany("UPDATE Tarefas SET Descricao = Descricao || ' (revisada)' WHERE TarefaID = ?", [(t,) for t in editadas])
+    cursor.execute("UPDATE SugestoesAI SET StatusAprovacao = 'Aprovada' WHERE AlertaID = ?", antes[editadas[0]])
+    conexao.commit()
+    descricao, ms = processar(cliente)
+    assert descricao["tarefas_lidas"] == descricao["alertas_atualizados"] == len(editadas), descricao
+    assert descricao["alertas_gerados"] == descricao["alertas_resolvidos"] == 0, descricao
+    linhas.append((f"só descrição ({len(editadas)} editadas)", descricao, ms))
+
+    completo, ms = processar(cliente, desde_o_inicio=True)
+    assert completo["tarefas_lidas"] == args.tarefas
+    assert completo["alertas_gerados"] == completo["alertas_resolvidos"] == 0, completo
+    linhas.append(("pontuação completa", completo, ms))
+    assert abertos_por_tarefa(conexao) == antes and contar_sugestoes(conexao) == sugestoes_antes
+    cursor.execute("SELECT a.Status FROM SugestoesAI s JOIN AlertasAI a ON a.AlertaID = s.AlertaID WHERE s.StatusAprovacao = 'Aprovada'")
+    assert [linha[0] for linha in cursor.fetchall()] == [alertas.STATUS_ABERTO]
+
+    print(f"  {'ciclo':<30} | {'lidas':>7} | {'pontuadas':>9} | {'gerados':>7} | {'atualizados':>11} | {'resolvidos':>10} | {'tempo (ms)':>10}")
+    for nome, resultado, ms in linhas:
+        print(f"  {nome:<30} | {resultado['tarefas_lidas']:>7} | {resultado['tarefas_pontuadas']:>9} | "
+              f"{resultado['alertas_gerados']:>7} | {resultado['alertas_atualizados']:>11} | "
+              f"{resultado['alertas_resolvidos']:>10} | {ms:>10.1f}")
+
+    # Cada tarefa aberta tem no máximo um alerta em aberto, com a sua sugestão
+    cursor.execute("SELECT COUNT(*), COUNT(DISTINCT TarefaID) FROM AlertasAI WHERE Status = ?", alertas.STATUS_ABERTO)
+    abertos, tarefas_com_alerta = cursor.fetchone()
+    assert abertos == tarefas_com_alerta == completo["alertas_atualizados"]
+
+    cursor.execute("SELECT ProjetoID FROM AlertasAI WHERE Status = ? ORDER BY AlertaID LIMIT 1", alertas.STATUS_ABERTO)
+    linha = cursor.fetchone()
+    if linha:
+        pagina = cliente.get(f"/projetos/{linha[0]}/alertas/", params={"status": alertas.STATUS_ABERTO, "limit": 5}).json()
+        sugestoes = cliente.get(f"/alertas/{pagina[0]['AlertaID']}/sugestoes/").json()
+        assert len(sugestoes) == 1
+        print(f"  exemplo: {pagina[0]['NivelSeveridade']} - {pagina[0]['DescricaoAlerta']}")
+        print(f"           {sugestoes[0]['DescricaoSugestao']}")
+    print(f"  alertas abertos: {abertos}, por severidade no último ciclo: {completo['por_severidade']}")
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Motor de alertas: ciclo incremental vs pontuação completa.")
+    parser.add_argument("--projetos", type=int, default=200)
+    parser.add_argument("--tarefas", type=int, default=50000)
+    parser.add_argument("--alteradas", type=float, default=0.02, help="Fração das tarefas alteradas entre os ciclos.")
+    parser.add_argument("--tamanho-bloco", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    motor_alertas.tamanho_bloco = args.tamanho_bloco
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "bench.db")
+        conexao = banco_local.conectar(caminho)
+        popular(conexao, args.projetos, args.tarefas, args.seed)
+        database.usar_pool(PoolConexoes(lambda: banco_local.conectar(caminho), 0, 4))
+        with TestClient(app) as cliente:
+            executar(cliente, conexao, args)
+
+if __name__ == "__main__":
+    main()
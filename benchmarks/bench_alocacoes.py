@@ -0,0 +1,173 @@
+# Arquivo: solarys_api/benchmarks/bench_alocacoes.py
+# Índice de alocações (app/alocacoes.py) contra o banco local SQLite:
+#   - confere GET /alocacoes/conflitos com uma comparação par a par feita aqui (força bruta)
+#   - mede a consulta de sobreposição pelo índice contra a varredura da tabela que o
+#     cliente fazia (ler todas as alocações e filtrar), e o GET /funcionarios/{id}/disponibilidade
+#   - confere as escritas: POST/PUT em conflito recebem 409, sem conflito 201/200, e o
+#     índice acompanha (a alocação nova aparece na disponibilidade)
+#
+# Uso (a partir da raiz do projeto):
+#   python -m benchmarks.bench_alocacoes
+#   python -m benchmarks.bench_alocacoes --funcionarios 5000 --alocacoes 200000 --sobrepostas 0.01
+
+import argparse
+import datetime
+import os
+import random
+import statistics
+import tempfile
+import time
+
+# Só CRUD: o modelo não participa da medição
+os.environ.setdefault("MODELOS_CARREGAR", "0")
+
+from fastapi.testclient import TestClient
+
+from app import database
+from app.main import app, indice_alocacoes
+from app.pool import PoolConexoes
+from benchmarks import banco_local
+
+BASE = datetime.date(2024, 1, 1)
+
+
+def popular(conexao, funcionarios: int, alocacoes: int, sobrepostas: float, seed: int):
+    """Períodos em sequência para cada funcionário; uma fração deles começa antes do fim do anterior."""
+    rng = random.Random(seed)
+    cursor = conexao.cursor()
+    cursor.executemany("INSERT INTO Projetos (Nome, DataInicio, DataPrevistaFim, Status) VALUES (?, ?, ?, ?)",
+                       [(f"Projeto {p}", BASE, BASE + datetime.timedelta(days=900), "Em Andamento") for p in range(100)])
+    cursor.executemany("INSERT INTO Funcionarios (NomeCompleto, Funcao, Status) VALUES (?, ?, ?)",
+                       [(f"Funcionário {i}", "Pedreiro", "Ativo") for i in range(funcionarios)])
+    proximo = {f: BASE + datetime.timedelta(days=rng.randint(0, 30)) for f in range(1, funcionarios + 1)}
+    linhas = []
+    for _ in range(alocacoes):
+        funcionario = rng.randint(1, funcionarios)
+        inicio = proximo[funcionario]
+        if rng.random() < sobrepostas:
+            inicio -= datetime.timedelta(days=rng.randint(1, 5))
+        fim = inicio + datetime.timedelta(days=rng.randint(5, 60))
+        proximo[funcionario] = fim + datetime.timedelta(days=rng.randint(1, 10))
+        linhas.append((funcionario, rng.randint(1, 100), inicio, fim))
+    cursor.executemany("INSERT INTO AlocacaoFuncionarios (FuncionarioID, ProjetoID, DataInicioAlocacao, DataFimAlocacao) VALUES (?, ?, ?, ?)", linhas)
+    conexao.commit()
+
+
+def todas_alocacoes(conexao) -> list:
+    cursor = conexao.cursor()
+    cursor.execute("SELECT AlocacaoID, FuncionarioID, ProjetoID, DataInicioAlocacao, DataFimAlocacao FROM AlocacaoFuncionarios")
+    return cursor.fetchall()
+
+
+def conflitos_forca_bruta(linhas: list) -> set:
+    por_funcionario = {}
+    for linha in linhas:
+        por_funcionario.setdefault(linha[1], []).append(linha)
+    pares = set()
+    for itens in por_funcionario.values():
+        for i, a in enumerate(itens):
+            for b in itens[i + 1:]:
+                if a[3] <= (b[4] or datetime.date.max) and b[3] <= (a[4] or datetime.date.max):
+                    pares.add(frozenset((a[0], b[0])))
+    return pares
+
+
+def varredura(conexao, funcionario: int, inicio: datetime.date, fim: datetime.date) -> list:
+    """O que o cliente fazia: ler a tabela inteira e filtrar o funcionário e o período."""
+    return [linha[0] for linha in todas_alocacoes(conexao)
+            if linha[1] == funcionario and linha[3] <= fim and (linha[4] or datetime.date.max) >= inicio]
+
+
+def verificar_escritas(cliente: TestClient):
+    alocacao = cliente.get("/alocacoes/conflitos", params={"funcionario_id": 1}).json()
+    # Período largo o bastante para pegar todas as alocações do funcionário 1 (as sequências passam de 2030 com poucos funcionários)
+    disponibilidade = cliente.get("/funcionarios/1/disponibilidade", params={"data_de": "2024-01-01", "data_ate": "2199-12-31"}).json()
+    existente = disponibilidade["alocacoes"][0]
+    em_conflito = {"FuncionarioID": 1, "ProjetoID": 1, "DataInicioAlocacao": existente["DataInicioAlocacao"], "DataFimAlocacao": existente["DataInicioAlocacao"]}
+    resposta = cliente.post("/alocacoes/", json=em_conflito)
+    assert resposta.status_code == 409, resposta.text
+    assert existente["AlocacaoID"] in [c["AlocacaoID"] for c in resposta.json()["detail"]["conflitos"]]
+
+    # Janela livre logo depois da última alocação do funcionário 1
+    ultimo_fim = max(datetime.date.fromisoformat(a["DataFimAlocacao"]) for a in disponibilidade["alocacoes"])
+    inicio = ultimo_fim + datetime.timedelta(days=1)
+    fim = inicio + datetime.timedelta(days=30)
+    livre = {"FuncionarioID": 1, "ProjetoID": 1, "DataInicioAlocacao": inicio.isoformat(), "DataFimAlocacao": fim.isoformat()}
+    resposta = cliente.post("/alocacoes/", json=livre)
+    assert resposta.status_code == 201, resposta.text
+    nova = resposta.json()["AlocacaoID"]
+    janela_fim = inicio + datetime.timedelta(days=89)
+    disponibilidade = cliente.get("/funcionarios/1/disponibilidade", params={"data_de": inicio.isoformat(), "data_ate": janela_fim.isoformat()}).json()
+    assert [a["AlocacaoID"] for a in disponibilidade["alocacoes"]] == [nova]
+    assert disponibilidade["periodos_livres"] == [{"inicio": (fim + datetime.timedelta(days=1)).isoformat(), "fim": janela_fim.isoformat()}]
+
+    # Estender a própria alocação não conflita com ela mesma; mover para cima de outra conflita
+    estendida = fim + datetime.timedelta(days=15)
+    assert cliente.put(f"/alocacoes/{nova}", json={**livre, "DataFimAlocacao": estendida.isoformat()}).status_code == 200
+    assert cliente.put(f"/alocacoes/{nova}", json=em_conflito).status_code == 409
+    sobreposta = fim + datetime.timedelta(days=10)
+    assert cliente.post("/alocacoes/", json={**livre, "DataInicioAlocacao": sobreposta.isoformat(), "DataFimAlocacao": None}).status_code == 409
+    assert cliente.get("/alocacoes/conflitos", params={"funcionario_id": 1}).json() == alocacao
+    assert cliente.get("/funcionarios/999999/disponibilidade").status_code == 404
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conflitos de alocação: índice em memória vs varredura da tabela.")
+    parser.add_argument("--funcionarios", type=int, default=2000)
+    parser.add_argument("--alocacoes", type=int, default=100000)
+    parser.add_argument("--sobrepostas", type=float, default=0.01, help="Fração das alocações que começa antes do fim da anterior.")
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "bench.db")
+        conexao = banco_local.conectar(caminho)
+        popular(conexao, args.funcionarios, args.alocacoes, args.sobrepostas, args.seed)
+        database.usar_pool(PoolConexoes(lambda: banco_local.conectar(caminho), 0, 4))
+
+        with TestClient(app) as cliente:
+            inicio = time.perf_counter()
+            conflitos = cliente.get("/alocacoes/conflitos").json()
+            primeira_ms = (time.perf_counter() - inicio) * 1000
+            inicio = time.perf_counter()
+            cliente.get("/alocacoes/conflitos")
+            conflitos_ms = (time.perf_counter() - inicio) * 1000
+            esperados = conflitos_forca_bruta(todas_alocacoes(conexao))
+            encontrados = {frozenset(a["AlocacaoID"] for a in c["alocacoes"]) for c in conflitos}
+            assert encontrados == esperados, (len(encontrados), len(esperados))
+
+            rng = random.Random(args.seed)
+            consultas = []
+            for _ in range(args.consultas):
+                data = BASE + datetime.timedelta(days=rng.randint(0, 800))
+                consultas.append((rng.randint(1, args.funcionarios), data, data + datetime.timedelta(days=rng.randint(0, 60))))
+
+            tempos_indice, tempos_varredura, tempos_api = [], [], []
+            for funcionario, de, ate in consultas:
+                inicio = time.perf_counter()
+                pelo_indice = [a["AlocacaoID"] for a in indice_alocacoes.sobrepostas(conexao, funcionario, de, ate)]
+                tempos_indice.append(time.perf_counter() - inicio)
+                if len(tempos_varredura) < 20:
+                    inicio = time.perf_counter()
+                    pela_varredura = varredura(conexao, funcionario, de, ate)
+                    tempos_varredura.append(time.perf_counter() - inicio)
+                    assert sorted(pelo_indice) == sorted(pela_varredura)
+                inicio = time.perf_counter()
+                resposta = cliente.get(f"/funcionarios/{funcionario}/disponibilidade", params={"data_de": de.isoformat(), "data_ate": ate.isoformat()})
+                tempos_api.append(time.perf_counter() - inicio)
+                assert sorted(a["AlocacaoID"] for a in resposta.json()["alocacoes"]) == sorted(pelo_indice)
+
+            verificar_escritas(cliente)
+
+    print(f"{args.alocacoes} alocações de {args.funcionarios} funcionários ({args.sobrepostas:.0%} sobrepostas)")
+    print(f"  carga do índice: {indice_alocacoes.tempo_carga_s * 1000:.0f} ms (na primeira consulta, {primeira_ms:.0f} ms no total)")
+    print(f"  GET /alocacoes/conflitos: {len(conflitos)} conflitos em {conflitos_ms:.1f} ms (igual à força bruta)")
+    print(f"  sobreposição por funcionário: índice {statistics.median(tempos_indice) * 1e6:.1f} µs, "
+          f"varredura da tabela {statistics.median(tempos_varredura) * 1000:.1f} ms (medianas)")
+    print(f"  GET /funcionarios/{{id}}/disponibilidade: mediana {statistics.median(tempos_api) * 1000:.2f} ms")
+    print("  escritas: conflito -> 409, sem conflito -> 201/200, índice atualizado")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# Arquivo: solarys_api/benchmarks/bench_arvore_compilada.py
+# Confere a ArvoreCompilada contra predict_proba (bit a bit) em um corpus aleatório e
+# mede a latência por requisição: validação Pydantic + previsão, com e sem pandas.
+#
+# Uso (a partir da raiz do projeto):
+#   python -m benchmarks.bench_arvore_compilada
+#   python -m benchmarks.bench_arvore_compilada --corpus 500000 --repeticoes 20000
+
+import argparse
+import json
+import statistics
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from app import predicao, schemas
+from benchmarks.bench_previsao_lote import gerar_entradas
+
+
+def verificar(modelo, compilada: predicao.ArvoreCompilada, colunas_modelo: list, n: int, seed: int):
+    """Falha (AssertionError) se qualquer linha divergir do sklearn."""
+    X = predicao.gerar_corpus_verificacao(compilada, n, seed)
+    esperado = modelo.predict_proba(pd.DataFrame(X, columns=colunas_modelo))
+    assert np.array_equal(compilada.predict_proba(X), esperado), "predict_proba vetorizado divergiu do sklearn"
+
+    # O caminho de uma linha só recebe inteiros (campos validados pelo Pydantic)
+    inteiros = np.round(X[: min(n, 20_000)]).astype(int)
+    esperado = modelo.predict_proba(pd.DataFrame(inteiros, columns=colunas_modelo))[:, 1]
+    for linha, proba in zip(inteiros, esperado):
+        dados = dict(zip(colunas_modelo, linha.tolist()), StatusProjeto="Em Andamento")
+        assert compilada.probabilidade_atraso(dados) == proba, f"linha divergente: {dados}"
+
+
+def latencias(funcao, entradas: list, repeticoes: int) -> list:
+    tempos = []
+    for i in range(repeticoes):
+        entrada = entradas[i % len(entradas)]
+        inicio = time.perf_counter()
+        funcao(entrada)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def resumir(nome: str, tempos: list):
+    tempos = sorted(tempos)
+    p50 = tempos[len(tempos) // 2] * 1e6
+    p99 = tempos[int(len(tempos) * 0.99)] * 1e6
+    print(f"{nome:<28} | média {statistics.fmean(tempos) * 1e6:>9.1f} µs | p50 {p50:>9.1f} µs | p99 {p99:>9.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verificação e microbenchmark da árvore compilada.")
+    parser.add_argument("--corpus", type=int, default=200_000, help="Linhas do corpus aleatório de verificação.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeticoes", type=int, default=5000, help="Requisições simuladas por caminho.")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    modelo = joblib.load("modelo_atraso_v1.joblib")
+    with open("colunas_modelo_v1.json", "r") as f:
+        colunas_modelo = json.load(f)
+    campos = list(schemas.TarefaPredictionInput.model_fields)
+
+    compilada = predicao.compilar_arvore(modelo, colunas_modelo, campos)
+    assert compilada is not None, "o modelo não pôde ser compilado"
+    verificar(modelo, compilada, colunas_modelo, args.corpus, args.seed)
+    print(f"Verificação OK: {args.corpus} linhas idênticas a predict_proba.\n")
+
+    entradas = gerar_entradas(1000, args.seed)
+
+    def caminho_pandas(entrada):
+        dados = schemas.TarefaPredictionInput.model_validate(entrada)
+        return predicao.prever_um(modelo, colunas_modelo, dados.dict())
+
+    def caminho_compilado(entrada):
+        dados = schemas.TarefaPredictionInput.model_validate(entrada)
+        return predicao.formatar_previsao(compilada.probabilidade_atraso(vars(dados)))
+
+    tempos_pandas = latencias(caminho_pandas, entradas, args.repeticoes)
+    tempos_compilado = latencias(caminho_compilado, entradas, args.repeticoes)
+    resumir("pandas + predict_proba", tempos_pandas)
+    resumir("árvore compilada", tempos_compilado)
+    print(f"\nGanho na mediana: {statistics.median(tempos_pandas) / statistics.median(tempos_compilado):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
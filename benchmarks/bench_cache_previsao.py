@@ -0,0 +1,86 @@
+# Arquivo: solarys_api/benchmarks/bench_cache_previsao.py
+# Mede o cache de previsões (app/cache_previsao.py) com entradas repetidas, como as que
+# os clientes reenviam (sorteadas de um conjunto pequeno de vetores distintos):
+#   1. lote de 1 a 10k linhas, sem cache e com o cache quente, na frente do modelo do
+#      sklearn e da árvore compilada -- é o que define PREVISAO_CACHE_LOTE_MAX e por que
+#      a API só liga o cache quando a árvore não pôde ser compilada;
+#   2. o backend SQLite compartilhado entre dois "workers".
+#
+# Uso (a partir da raiz do projeto):
+#   python -m benchmarks.bench_cache_previsao
+#   python -m benchmarks.bench_cache_previsao --distintos 300 --tamanhos 1 10 100 1000 10000
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import warnings
+
+import joblib
+
+from app import cache_previsao, predicao, schemas
+from benchmarks.bench_previsao_lote import gerar_entradas
+
+
+def melhor_tempo(repeticoes: int, funcao, *args) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache de previsões: lote com e sem cache.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--distintos", type=int, default=300, help="Vetores de features distintos entre as entradas.")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    modelo = joblib.load("modelo_atraso_v1.joblib")
+    with open("colunas_modelo_v1.json") as f:
+        colunas_modelo = json.load(f)
+    campos = list(schemas.TarefaPredictionInput.model_fields)
+    modelos = {"sklearn": modelo, "árvore compilada": predicao.compilar_arvore(modelo, colunas_modelo, campos)}
+    rng = random.Random(args.seed)
+    conjunto = gerar_entradas(args.distintos, args.seed)
+
+    print(f"{'modelo':<17} | {'linhas':>6} | {'sem cache (µs)':>15} | {'cache quente (µs)':>18}")
+    print("-" * 66)
+    for nome, modelo_usado in modelos.items():
+        if modelo_usado is None:
+            continue
+        for n in args.tamanhos:
+            entradas = [rng.choice(conjunto) for _ in range(n)]
+            cache = cache_previsao.CachePrevisao(capacidade=50_000)
+            cache.definir_versao("bench")
+            referencia = predicao.prever_lote(modelo_usado, colunas_modelo, entradas, campos)
+            assert predicao.prever_lote_com_cache(cache, modelo_usado, colunas_modelo, entradas, campos) == referencia
+
+            sem_cache = melhor_tempo(args.repeticoes, predicao.prever_lote, modelo_usado, colunas_modelo, entradas, campos)
+            quente = melhor_tempo(args.repeticoes, predicao.prever_lote_com_cache, cache, modelo_usado, colunas_modelo, entradas, campos)
+            print(f"{nome:<17} | {n:>6} | {sem_cache * 1e6:>15,.0f} | {quente * 1e6:>18,.0f}")
+
+    # Backend compartilhado: o "worker" B aproveita o que o A já calculou
+    entradas = [rng.choice(conjunto) for _ in range(min(1000, max(args.tamanhos)))]
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "cache.db")
+        worker_a = cache_previsao.CachePrevisao(50_000, backend=cache_previsao.BackendSQLite(caminho))
+        worker_b = cache_previsao.CachePrevisao(50_000, backend=cache_previsao.BackendSQLite(caminho))
+        for cache in (worker_a, worker_b):
+            cache.definir_versao("bench")
+        tempo_a = melhor_tempo(1, predicao.prever_lote_com_cache, worker_a, modelo, colunas_modelo, entradas, campos)
+        tempo_b = melhor_tempo(1, predicao.prever_lote_com_cache, worker_b, modelo, colunas_modelo, entradas, campos)
+        metricas_b = worker_b.metricas()
+        print(f"\ncompartilhado ({len(entradas)} linhas, sklearn) | worker A frio {tempo_a * 1000:.2f} ms | "
+              f"worker B {tempo_b * 1000:.2f} ms ({metricas_b['acertos_compartilhado']} acertos no backend, "
+              f"{metricas_b['falhas']} falhas)")
+
+
+if __name__ == "__main__":
+    main()
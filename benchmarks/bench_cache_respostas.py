@@ -0,0 +1,94 @@
+# Arquivo: solarys_api/benchmarks/bench_cache_respostas.py
+# Mede o cache de respostas (app/cache_respostas.py) em GET /projetos/ e GET /funcionarios/:
+# falha (consulta + serialização), acerto (bytes prontos) e revalidação com If-None-Match
+# (304, sem corpo e sem tocar no banco), contra o banco local SQLite.
+#
+# O SQLite local não tem rede: --latencia-banco simula o round trip de cada chamada ao
+# SQL Server, como em bench_insercao_lote.
+#
+# Uso (a partir da raiz do projeto):
+#   python -m benchmarks.bench_cache_respostas
+#   python -m benchmarks.bench_cache_respostas --projetos 5000 --latencia-banco 1
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+from app import database
+from app.main import app, cache_leituras
+from app.pool import PoolConexoes
+from benchmarks import banco_local
+from benchmarks.bench_insercao_lote import ConexaoComLatencia
+
+
+def medir(repeticoes: int, funcao) -> float:
+    """Mediana, em ms, de `repeticoes` execuções."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache de respostas: falha, acerto e 304.")
+    parser.add_argument("--projetos", type=int, default=1000)
+    parser.add_argument("--funcionarios", type=int, default=200)
+    parser.add_argument("--latencia-banco", type=float, default=1.0, help="Round trip simulado por chamada ao banco, em ms.")
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "bench.db")
+        conexao = banco_local.conectar(caminho)
+        cursor = conexao.cursor()
+        cursor.executemany(
+            "INSERT INTO Projetos (Nome, DataInicio, DataPrevistaFim, Status) VALUES (?, ?, ?, ?)",
+            [(f"Projeto {i}", "2025-01-01", "2025-12-31", "Em Andamento") for i in range(args.projetos)]
+        )
+        cursor.executemany(
+            "INSERT INTO Funcionarios (NomeCompleto, Funcao, Status) VALUES (?, ?, ?)",
+            [(f"Funcionário {i}", "Pedreiro", "Ativo") for i in range(args.funcionarios)]
+        )
+        conexao.commit()
+
+        latencia = args.latencia_banco / 1000
+        pool = PoolConexoes(lambda: ConexaoComLatencia(banco_local.conectar(caminho), latencia), 0, 4)
+        database.usar_pool(pool)
+        cliente = TestClient(app)
+
+        print(f"{args.projetos} projetos, {args.funcionarios} funcionários, round trip simulado de {args.latencia_banco:g} ms")
+        print(f"  {'rota':<16} | {'falha (ms)':>10} | {'acerto (ms)':>11} | {'304 (ms)':>8} | {'bytes':>9}")
+        for rota in ("/projetos/", "/funcionarios/"):
+            def falha():
+                cache_leituras.limpar()
+                assert cliente.get(rota).headers["X-Cache"] == "MISS"
+
+            def acerto():
+                assert cliente.get(rota).headers["X-Cache"] == "HIT"
+
+            resposta = cliente.get(rota)
+            etag = resposta.headers["ETag"]
+
+            def nao_modificado():
+                assert cliente.get(rota, headers={"If-None-Match": etag}).status_code == 304
+
+            ms_falha = medir(args.repeticoes, falha)
+            cliente.get(rota)
+            retiradas = pool.metricas()["retiradas"]
+            ms_acerto = medir(args.repeticoes, acerto)
+            ms_304 = medir(args.repeticoes, nao_modificado)
+            assert pool.metricas()["retiradas"] == retiradas, "acerto/304 não deveriam retirar conexão"
+            print(f"  {rota:<16} | {ms_falha:>10.2f} | {ms_acerto:>11.2f} | {ms_304:>8.2f} | {len(resposta.content):>9,}")
+
+        metricas = cache_leituras.metricas()
+        print(f"  taxa de acerto: {metricas['taxa_acerto']:.1%}, {metricas['nao_modificados']} respostas 304")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# Arquivo: solarys_api/benchmarks/bench_inicializacao.py
+# Mede a subida da API, para acompanhar regressões no cold start (autoscaling, --reload):
+#   - import: `python -X importtime -c "import app.main"` (tempo total e os pacotes mais
+#     pesados, e se numpy/pandas/sklearn entraram no import)
+#   - primeira resposta: do início do processo uvicorn até o primeiro 200 em GET /
+#   - pronto: até o primeiro 200 em GET /health/ready (modelo carregado e aquecido)
+# com o modelo (padrão) e num worker só de CRUD (MODELOS_CARREGAR=0).
+#
+# Não precisa de banco: nenhuma das rotas usadas abre conexão.
+#
+# Uso (a partir da raiz do projeto):
+#   python -m benchmarks.bench_inicializacao
+#   python -m benchmarks.bench_inicializacao --repeticoes 5 --saida inicializacao.json
+
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACOTES_PESADOS = ("numpy", "pandas", "sklearn", "joblib", "scipy")
+_LINHA_IMPORTTIME = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)$")
+
+
+def medir_import(env: dict) -> dict:
+    """Roda o import de app.main com -X importtime e resume a saída."""
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=RAIZ, env=env, capture_output=True, text=True, check=True
+    )
+    total_us = 0
+    por_pacote = {}
+    for linha in resultado.stderr.splitlines():
+        encontrado = _LINHA_IMPORTTIME.match(linha)
+        if not encontrado:
+            continue
+        _, cumulativo, recuo, modulo = encontrado.groups()
+        cumulativo = int(cumulativo)
+        if len(recuo) == 1:
+            # Imports de primeiro nível: a soma deles é o tempo total do import
+            total_us += cumulativo
+        if "." not in modulo:
+            por_pacote[modulo] = max(por_pacote.get(modulo, 0), cumulativo)
+    mais_pesados = sorted(por_pacote.items(), key=lambda item: item[1], reverse=True)[:10]
+    return {
+        "total_ms": total_us / 1000,
+        "mais_pesados_ms": {pacote: us / 1000 for pacote, us in mais_pesados},
+        "pesados_importados": [pacote for pacote in PACOTES_PESADOS if pacote in por_pacote],
+    }
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _status(url: str) -> int | None:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as resposta:
+            return resposta.status
+    except urllib.error.HTTPError as ex:
+        return ex.code
+    except OSError:
+        return None
+
+
+def medir_subida(env: dict, timeout: float) -> dict:
+    """Sobe um uvicorn e mede (em ms) até a primeira resposta e até o /health/ready."""
+    porta = _porta_livre()
+    base = f"http://127.0.0.1:{porta}"
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(porta), "--log-level", "warning"],
+        cwd=RAIZ, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        primeira = pronto = None
+        while time.perf_counter() - inicio < timeout:
+            if primeira is None and _status(base + "/") == 200:
+                primeira = time.perf_counter() - inicio
+            if primeira is not None:
+                codigo = _status(base + "/health/ready")
+                # 404: versão sem readiness, o modelo já foi carregado antes de abrir a porta
+                if codigo in (200, 404):
+                    pronto = time.perf_counter() - inicio
+                    break
+            if processo.poll() is not None:
+                raise RuntimeError(f"uvicorn terminou com código {processo.returncode}")
+            time.sleep(0.01)
+        if pronto is None:
+            raise RuntimeError(f"a API não ficou pronta em {timeout:.0f}s")
+        return {"primeira_resposta_ms": primeira * 1000, "pronto_ms": pronto * 1000}
+    finally:
+        processo.terminate()
+        processo.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de subida da API: import, primeira resposta e readiness.")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Segundos máximos de espera por subida.")
+    parser.add_argument("--saida", help="Grava os resultados em JSON neste arquivo.")
+    args = parser.parse_args()
+
+    cenarios = {
+        "com modelo": {**os.environ},
+        "só CRUD (MODELOS_CARREGAR=0)": {**os.environ, "MODELOS_CARREGAR": "0"},
+    }
+    resultados = {}
+    for nome, env in cenarios.items():
+        imports = [medir_import(env) for _ in range(args.repeticoes)]
+        subidas = [medir_subida(env, args.timeout) for _ in range(args.repeticoes)]
+        resultados[nome] = {
+            "import_ms": statistics.median(i["total_ms"] for i in imports),
+            "primeira_resposta_ms": statistics.median(s["primeira_resposta_ms"] for s in subidas),
+            "pronto_ms": statistics.median(s["pronto_ms"] for s in subidas),
+            "pesados_importados": imports[0]["pesados_importados"],
+            "mais_pesados_ms": imports[0]["mais_pesados_ms"],
+        }
+
+    print(f"Subida da API (mediana de {args.repeticoes})")
+    print(f"  {'cenário':<30} | {'import (ms)':>11} | {'1ª resposta (ms)':>16} | {'pronto (ms)':>11} | pesados no import")
+    for nome, r in resultados.items():
+        print(f"  {nome:<30} | {r['import_ms']:>11.0f} | {r['primeira_resposta_ms']:>16.0f} | {r['pronto_ms']:>11.0f} | "
+              f"{', '.join(r['pesados_importados']) or '-'}")
+    print("  pacotes mais pesados no import de app.main (ms, cumulativo):")
+    for pacote, ms in next(iter(resultados.values()))["mais_pesados_ms"].items():
+        print(f"    {pacote:<20} {ms:8.1f}")
+
+    if args.saida:
+        with open(args.saida, "w") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# Arquivo: solarys_api/benchmarks/bench_insercao_lote.py
+# Compara a importação de tarefas linha a linha (POST /tarefas/, um INSERT e um commit
+# por requisição) com o endpoint em lote (POST /tarefas/bulk), rodando a API em processo
+# contra o banco local SQLite.
+#
+# O SQLite local não tem rede: --latencia-banco simula o round trip de cada chamada ao
+# SQL Server (execute, executemany e commit), que é exatamente o custo que o lote elimina.
+#
+# Uso (a partir da raiz do projeto):
+#   python -m benchmarks.bench_insercao_lote
+#   python -m benchmarks.bench_insercao_lote --tarefas 5000 --tamanho-lote 1000 --latencia-banco 1
+
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+from app import database
+from app.main import app
+from app.pool import PoolConexoes
+from benchmarks import banco_local
+
+
+class CursorComLatencia:
+    def __init__(self, cursor, latencia: float):
+        self._cursor = cursor
+        self._latencia = latencia
+
+    def execute(self, sql: str, *params):
+        time.sleep(self._latencia)
+        self._cursor.execute(sql, *params)
+        return self
+
+    def executemany(self, sql: str, seq_params):
+        time.sleep(self._latencia)
+        self._cursor.executemany(sql, seq_params)
+        return self
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+    def __setattr__(self, nome, valor):
+        if nome.startswith("_"):
+            object.__setattr__(self, nome, valor)
+        else:
+            setattr(self._cursor, nome, valor)
+
+
+class ConexaoComLatencia:
+    def __init__(self, conexao, latencia: float):
+        self._conexao = conexao
+        self._latencia = latencia
+
+    def cursor(self):
+        return CursorComLatencia(self._conexao.cursor(), self._latencia)
+
+    def commit(self):
+        time.sleep(self._latencia)
+        self._conexao.commit()
+
+    def __getattr__(self, nome):
+        return getattr(self._conexao, nome)
+
+
+def gerar_tarefas(n: int, projeto_id: int, seed: int) -> list:
+    rng = random.Random(seed)
+    base = datetime.datetime(2025, 1, 1, 8, 0)
+    tarefas = []
+    for i in range(n):
+        inicio = base + datetime.timedelta(days=rng.randint(0, 180))
+        tarefas.append({
+            "ProjetoID": projeto_id,
+            "Descricao": f"Tarefa {i}",
+            "DataInicioPrevista": inicio.isoformat(),
+            "DataFimPrevista": (inicio + datetime.timedelta(days=rng.randint(3, 30))).isoformat(),
+            "Status": "Pendente",
+        })
+    return tarefas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inserção de tarefas: linha a linha vs /tarefas/bulk.")
+    parser.add_argument("--tarefas", type=int, default=2000)
+    parser.add_argument("--tamanho-lote", type=int, default=1000)
+    parser.add_argument("--latencia-banco", type=float, default=1.0, help="Round trip simulado por chamada ao banco, em ms.")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "bench.db")
+        latencia = args.latencia_banco / 1000
+        database.usar_pool(PoolConexoes(lambda: ConexaoComLatencia(banco_local.conectar(caminho), latencia), 0, 4))
+        cliente = TestClient(app)
+
+        projeto = cliente.post("/projetos/", json={
+            "Nome": "Benchmark", "DataInicio": "2025-01-01", "DataPrevistaFim": "2025-12-31", "Status": "Em Andamento"
+        }).json()
+        tarefas = gerar_tarefas(args.tarefas, projeto["ProjetoID"], args.seed)
+
+        inicio = time.perf_counter()
+        ids_individual = []
+        for tarefa in tarefas:
+            resposta = cliente.post("/tarefas/", json=tarefa)
+            assert resposta.status_code == 201, resposta.text
+            ids_individual.append(resposta.json()["TarefaID"])
+        duracao_individual = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        resposta = cliente.post(f"/tarefas/bulk?tamanho_lote={args.tamanho_lote}", json=tarefas)
+        duracao_lote = time.perf_counter() - inicio
+        assert resposta.status_code == 201, resposta.text
+        ids_lote = resposta.json()["ids"]
+
+        # Os IDs do lote vêm na ordem da entrada: a descrição de cada ID tem que bater
+        descricoes = {
+            linha["TarefaID"]: linha["Descricao"]
+            for linha in cliente.get(f"/projetos/{projeto['ProjetoID']}/tarefas/?fields=Descricao").json()
+        }
+        assert len(ids_lote) == len(tarefas)
+        assert all(descricoes[i] == tarefa["Descricao"] for i, tarefa in zip(ids_lote, tarefas)), "IDs fora de ordem"
+
+    print(f"{args.tarefas} tarefas, round trip simulado de {args.latencia_banco:g} ms, blocos de {args.tamanho_lote}")
+    print(f"  POST /tarefas/ (uma por vez) | {duracao_individual:7.2f} s | {args.tarefas / duracao_individual:>10,.0f} linhas/s")
+    print(f"  POST /tarefas/bulk           | {duracao_lote:7.2f} s | {args.tarefas / duracao_lote:>10,.0f} linhas/s")
+    print(f"  ganho: {duracao_individual / duracao_lote:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# Arquivo: solarys_api/benchmarks/bench_pool.py
+# Harness offline do pool de conexões (app/pool.py) contra o banco local SQLite:
+#   1. verificações de comportamento (rollback na devolução, limite de tamanho, timeout,
+#      reciclagem por vida máxima/ociosidade e descarte no health check);
+#   2. benchmark de N threads fazendo "requisições" com conexão nova vs conexão do pool.
+#
+# O SQLite abre conexões muito mais rápido que o SQL Server (TCP + TLS + login), então
+# --latencia-conexao simula esse handshake em milissegundos.
+#
+# Uso (a partir da raiz do projeto):
+#   python -m benchmarks.bench_pool
+#   python -m benchmarks.bench_pool --threads 32 --requisicoes 200 --latencia-conexao 30
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.pool import PoolConexoes, TempoEsgotadoPool
+from benchmarks import banco_local
+
+
+def fabrica_local(caminho: str, latencia_conexao: float = 0.0):
+    def abrir():
+        if latencia_conexao:
+            time.sleep(latencia_conexao)
+        return banco_local.conectar(caminho)
+    return abrir
+
+
+class ConexaoContada:
+    """Conexão do banco local que conta as abertas (e o pico) e demora `latencia_saude` no health check."""
+
+    def __init__(self, conexao, contagem: dict, trava: threading.Lock, latencia_saude: float):
+        self._conexao = conexao
+        self._contagem = contagem
+        self._trava = trava
+        self._latencia_saude = latencia_saude
+        with trava:
+            contagem["abertas"] += 1
+            contagem["pico"] = max(contagem["pico"], contagem["abertas"])
+
+    def cursor(self):
+        cursor = self._conexao.cursor()
+        latencia, executar = self._latencia_saude, cursor.execute
+
+        def execute(sql, *params):
+            if sql == "SELECT 1":
+                time.sleep(latencia)
+            return executar(sql, *params)
+        cursor.execute = execute
+        return cursor
+
+    def rollback(self):
+        self._conexao.rollback()
+
+    def close(self):
+        with self._trava:
+            self._contagem["abertas"] -= 1
+        self._conexao.close()
+
+
+def verificar_comportamento(caminho: str):
+    # 1. Rollback na devolução: um INSERT sem commit não pode vazar para a próxima retirada
+    pool = PoolConexoes(fabrica_local(caminho), tamanho_minimo=1, tamanho_maximo=1)
+    with pool.conexao() as conn:
+        conn.cursor().execute("INSERT INTO Funcionarios (NomeCompleto, Funcao, Status) VALUES (?,?,?)", "X", "Y", "Ativo")
+    with pool.conexao() as conn:
+        total = conn.cursor().execute("SELECT COUNT(*) FROM Funcionarios").fetchone()[0]
+    assert total == 0, "transação não confirmada vazou pelo pool"
+    print("  ok  rollback na devolução")
+
+    # 2. Timeout quando o pool está cheio
+    pool.timeout_espera = 0.05
+    conn = pool.obter()
+    try:
+        pool.obter()
+        raise AssertionError("o pool deveria ter esgotado")
+    except TempoEsgotadoPool:
+        pass
+    pool.devolver(conn)
+    assert pool.metricas()["esgotamentos"] == 1
+    print("  ok  timeout com pool cheio")
+
+    # 3. Vida máxima: a conexão é fechada na devolução e uma nova é criada depois
+    pool = PoolConexoes(fabrica_local(caminho), tamanho_minimo=0, tamanho_maximo=2, tempo_max_vida=0.01)
+    primeira = pool.obter()
+    time.sleep(0.02)
+    pool.devolver(primeira)
+    segunda = pool.obter()
+    assert segunda is not primeira and pool.metricas()["descartadas"] == 1
+    pool.devolver(segunda)
+    print("  ok  reciclagem por vida máxima")
+
+    # 4. Ociosidade máxima: a conexão ociosa é descartada na retirada
+    pool = PoolConexoes(fabrica_local(caminho), tamanho_minimo=0, tamanho_maximo=2, tempo_max_ocioso=0.01)
+    primeira = pool.obter()
+    pool.devolver(primeira)
+    time.sleep(0.02)
+    segunda = pool.obter()
+    assert segunda is not primeira and pool.metricas()["descartadas"] == 1
+    pool.devolver(segunda)
+    print("  ok  reciclagem por ociosidade")
+
+    # 5. Health check: conexão morta é trocada por uma nova sem o handler perceber
+    pool = PoolConexoes(fabrica_local(caminho), tamanho_minimo=0, tamanho_maximo=2, verificar_apos=0.0)
+    primeira = pool.obter()
+    pool.devolver(primeira)
+    primeira.close()
+    segunda = pool.obter()
+    assert segunda is not primeira and pool.metricas()["falhas_health_check"] == 1
+    segunda.cursor().execute("SELECT 1").fetchone()
+    pool.devolver(segunda)
+    print("  ok  health check na retirada")
+
+    # 6. Limite de tamanho sob concorrência
+    pool = PoolConexoes(fabrica_local(caminho), tamanho_minimo=0, tamanho_maximo=4)
+    pico = [0]
+    trava = threading.Lock()
+
+    def usar(_):
+        with pool.conexao() as conn:
+            with trava:
+                pico[0] = max(pico[0], pool.metricas()["em_uso"])
+            conn.cursor().execute("SELECT COUNT(*) FROM Projetos").fetchone()
+            time.sleep(0.001)
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(usar, range(400)))
+    metricas = pool.metricas()
+    assert pico[0] <= 4 and metricas["total"] <= 4 and metricas["em_uso"] == 0
+    print(f"  ok  limite de tamanho (pico em uso = {pico[0]}, criadas = {metricas['criadas']})")
+
+    # 7. Limite de tamanho com health check lento: a conexão em verificação (fora da trava)
+    #    continua contando, então ninguém abre outra no lugar dela
+    contagem = {"abertas": 0, "pico": 0}
+    trava = threading.Lock()
+    pool = PoolConexoes(lambda: ConexaoContada(banco_local.conectar(caminho), contagem, trava, 0.2),
+                        tamanho_minimo=4, tamanho_maximo=4, verificar_apos=0.0)
+    pool.preencher()
+
+    def usar_lento(_):
+        with pool.conexao():
+            time.sleep(0.01)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(usar_lento, range(8)))
+    metricas = pool.metricas()
+    assert contagem["pico"] <= 4 and metricas["criadas"] == 4, (contagem, metricas["criadas"])
+    pool.fechar()
+    print(f"  ok  limite de tamanho com health check lento (pico de conexões abertas = {contagem['pico']})")
+
+
+def requisicao(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM Projetos WHERE ProjetoID = ?", 1)
+    cursor.fetchall()
+
+
+def medir(nome: str, threads: int, requisicoes: int, executar):
+    latencias = []
+    trava = threading.Lock()
+
+    def trabalho(_):
+        for _ in range(requisicoes):
+            inicio = time.perf_counter()
+            executar()
+            with trava:
+                latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(trabalho, range(threads)))
+    duracao = time.perf_counter() - inicio
+
+    latencias.sort()
+    p50 = latencias[len(latencias) // 2] * 1000
+    p99 = latencias[int(len(latencias) * 0.99)] * 1000
+    print(f"{nome:<22} | {len(latencias) / duracao:>9.0f} req/s | p50 {p50:>7.2f} ms | p99 {p99:>7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Harness e benchmark do pool de conexões.")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requisicoes", type=int, default=100, help="Requisições por thread.")
+    parser.add_argument("--latencia-conexao", type=float, default=20.0, help="Handshake simulado, em ms.")
+    parser.add_argument("--tamanho-maximo", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "solarys.db")
+        conn = banco_local.conectar(caminho)
+        conn.cursor().execute(
+            "INSERT INTO Projetos (Nome, DataInicio, DataPrevistaFim, Status) VALUES (?,?,?,?)",
+            "Obra Teste", "2024-01-01", "2024-12-31", "Em Andamento"
+        )
+        conn.commit()
+        conn.close()
+
+        print("Verificações do pool:")
+        verificar_comportamento(caminho)
+
+        print(f"\nBenchmark: {args.threads} threads x {args.requisicoes} requisições, "
+              f"handshake simulado de {args.latencia_conexao:.0f} ms")
+        abrir = fabrica_local(caminho, args.latencia_conexao / 1000)
+
+        def sem_pool():
+            conn = abrir()
+            try:
+                requisicao(conn)
+            finally:
+                conn.close()
+
+        pool = PoolConexoes(abrir, tamanho_minimo=2, tamanho_maximo=args.tamanho_maximo)
+        pool.preencher()
+
+        def com_pool():
+            with pool.conexao() as conn:
+                requisicao(conn)
+
+        medir("conexão por requisição", args.threads, args.requisicoes, sem_pool)
+        medir("pool de conexões", args.threads, args.requisicoes, com_pool)
+        metricas = pool.metricas()
+        print(f"\nMétricas do pool: criadas={metricas['criadas']}, "
+              f"espera média={metricas['tempo_espera_medio_ms']:.2f} ms, "
+              f"espera máxima={metricas['tempo_espera_max_ms']:.2f} ms")
+        pool.fechar()
+
+
+if __name__ == "__main__":
+    main()
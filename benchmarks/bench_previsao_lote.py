@@ -0,0 +1,76 @@
+# Arquivo: solarys_api/benchmarks/bench_previsao_lote.py
+# Compara o caminho de uma linha (DataFrame + get_dummies + reindex por tarefa)
+# com o caminho em lote (uma matriz NumPy e um predict_proba por bloco).
+#
+# Uso (a partir da raiz do projeto):
+#   python -m benchmarks.bench_previsao_lote
+#   python -m benchmarks.bench_previsao_lote --tamanhos 1 100 10000 100000 --amostra-um 2000
+
+import argparse
+import json
+import random
+import time
+import warnings
+
+import joblib
+
+from app import predicao, schemas
+
+
+def gerar_entradas(n: int, seed: int = 42) -> list:
+    """Gera n entradas de previsão com valores na faixa dos dados de treino."""
+    rng = random.Random(seed)
+    return [
+        {
+            "DuracaoPrevista": rng.randint(3, 30),
+            "StatusProjeto": "Em Andamento",
+            "MesInicioPrevisto": rng.randint(1, 12),
+            "DiaDaSemanaInicioPrevisto": rng.randint(0, 6),
+            "DiferencaDuracao": rng.randint(-3, 12),
+        }
+        for _ in range(n)
+    ]
+
+
+def medir(funcao, *args) -> float:
+    inicio = time.perf_counter()
+    funcao(*args)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da previsão de atraso: uma linha vs lote.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1, 100, 10_000, 100_000])
+    parser.add_argument("--amostra-um", type=int, default=2000,
+                        help="Máximo de linhas medidas no caminho de uma linha; acima disso o tempo é extrapolado.")
+    parser.add_argument("--tamanho-lote", type=int, default=predicao.TAMANHO_LOTE_PADRAO)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    modelo = joblib.load("modelo_atraso_v1.joblib")
+    with open("colunas_modelo_v1.json", "r") as f:
+        colunas_modelo = json.load(f)
+    campos = list(schemas.TarefaPredictionInput.model_fields)
+
+    print(f"{'linhas':>8} | {'uma linha (s)':>14} | {'lote (s)':>10} | {'ganho':>8}")
+    print("-" * 50)
+    for n in args.tamanhos:
+        entradas = gerar_entradas(n)
+
+        # Caminho de uma linha: medimos até --amostra-um linhas e extrapolamos o resto
+        amostra = entradas[:args.amostra_um]
+        tempo_um = medir(lambda: [predicao.prever_um(modelo, colunas_modelo, e) for e in amostra])
+        extrapolado = len(amostra) < n
+        if extrapolado:
+            tempo_um = tempo_um / len(amostra) * n
+
+        tempo_lote = medir(predicao.prever_lote, modelo, colunas_modelo, entradas, campos, args.tamanho_lote)
+
+        marca = "*" if extrapolado else " "
+        print(f"{n:>8} | {tempo_um:>13.4f}{marca} | {tempo_lote:>10.4f} | {tempo_um / tempo_lote:>7.1f}x")
+
+    print("\n* tempo extrapolado a partir de --amostra-um linhas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# Arquivo: solarys_api/benchmarks/bench_resumo.py
+# Compara a tela de um projeto montada como o frontend fazia (cinco GETs: projeto,
+# tarefas, materiais, recursos financeiros e alocações, cada um com sua conexão e sua
+# consulta) com o GET /projetos/{id}/resumo (um lote de SELECTs agregados), e mede a
+# variante de portfólio (/projetos/resumo?ids=...) contra um resumo por projeto.
+#
+# O SQLite local não tem rede: --latencia-banco simula o round trip de cada chamada ao
+# SQL Server, como em bench_insercao_lote.
+#
+# Uso (a partir da raiz do projeto):
+#   python -m benchmarks.bench_resumo
+#   python -m benchmarks.bench_resumo --projetos 50 --tarefas 200 --latencia-banco 1
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+from app import database
+from app.main import app
+from app.pool import PoolConexoes
+from benchmarks import banco_local
+from benchmarks.bench_insercao_lote import ConexaoComLatencia, gerar_tarefas
+
+ROTAS_TELA = ("/projetos/{id}", "/projetos/{id}/tarefas/", "/projetos/{id}/materiais/",
+              "/projetos/{id}/recursos_financeiros/", "/projetos/{id}/alocacoes/")
+
+
+def popular(cliente: TestClient, projetos: int, tarefas: int, seed: int) -> list:
+    rng = random.Random(seed)
+    funcionarios = [
+        cliente.post("/funcionarios/", json={"NomeCompleto": f"Funcionário {i}", "Funcao": "Pedreiro", "Status": "Ativo"}).json()["FuncionarioID"]
+        for i in range(20)
+    ]
+    ids = []
+    for p in range(projetos):
+        projeto_id = cliente.post("/projetos/", json={
+            "Nome": f"Projeto {p}", "DataInicio": "2025-01-01", "DataPrevistaFim": "2025-12-31", "Status": "Em Andamento"
+        }).json()["ProjetoID"]
+        ids.append(projeto_id)
+        cliente.post("/tarefas/bulk", json=gerar_tarefas(tarefas, projeto_id, seed + p))
+        cliente.post("/materiais/bulk", json=[
+            {"ProjetoID": projeto_id, "NomeMaterial": f"Material {m}", "QuantidadeNecessaria": rng.randint(10, 500),
+             "QuantidadeEmEstoque": rng.randint(0, 500), "Unidade": "un"} for m in range(6)
+        ])
+        cliente.post("/recursos_financeiros/bulk", json=[
+            {"ProjetoID": projeto_id, "Tipo": rng.choice(["Material", "Mão de Obra", "Equipamento"]), "Descricao": "Gasto",
+             "Valor": rng.uniform(100, 10000), "Data": "2025-03-01"} for _ in range(20)
+        ])
+        for funcionario_id in rng.sample(funcionarios, 5):
+            cliente.post("/alocacoes/", json={"FuncionarioID": funcionario_id, "ProjetoID": projeto_id, "DataInicioAlocacao": "2025-01-01"})
+    return ids
+
+
+def medir(repeticoes: int, funcao) -> float:
+    """Mediana, em ms, de `repeticoes` execuções."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tela do projeto: cinco GETs vs /projetos/{id}/resumo.")
+    parser.add_argument("--projetos", type=int, default=20)
+    parser.add_argument("--tarefas", type=int, default=100, help="Tarefas por projeto.")
+    parser.add_argument("--latencia-banco", type=float, default=1.0, help="Round trip simulado por chamada ao banco, em ms.")
+    parser.add_argument("--repeticoes", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "bench.db")
+        database.usar_pool(PoolConexoes(lambda: banco_local.conectar(caminho), 0, 4))
+        cliente = TestClient(app)
+        ids = popular(cliente, args.projetos, args.tarefas, args.seed)
+
+        latencia = args.latencia_banco / 1000
+        database.usar_pool(PoolConexoes(lambda: ConexaoComLatencia(banco_local.conectar(caminho), latencia), 0, 4))
+        projeto_id = ids[0]
+
+        def tela_antiga():
+            for rota in ROTAS_TELA:
+                assert cliente.get(rota.format(id=projeto_id)).status_code == 200
+
+        def tela_resumo():
+            assert cliente.get(f"/projetos/{projeto_id}/resumo").status_code == 200
+
+        def portfolio_um_a_um():
+            for id_ in ids:
+                assert cliente.get(f"/projetos/{id_}/resumo").status_code == 200
+
+        lista_ids = ",".join(map(str, ids))
+
+        def portfolio_lote():
+            assert len(cliente.get(f"/projetos/resumo?ids={lista_ids}").json()) == len(ids)
+
+        resultados = [
+            ("tela: 5 GETs (linhas completas)", medir(args.repeticoes, tela_antiga)),
+            ("tela: GET /resumo", medir(args.repeticoes, tela_resumo)),
+            (f"portfólio: {len(ids)} x GET /resumo", medir(max(1, args.repeticoes // 5), portfolio_um_a_um)),
+            (f"portfólio: GET /projetos/resumo ({len(ids)} IDs)", medir(args.repeticoes, portfolio_lote)),
+        ]
+
+    print(f"{args.projetos} projetos, {args.tarefas} tarefas cada, round trip simulado de {args.latencia_banco:g} ms")
+    for nome, ms in resultados:
+        print(f"  {nome:<45} | {ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
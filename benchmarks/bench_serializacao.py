@@ -0,0 +1,121 @@
+# Arquivo: solarys_api/benchmarks/bench_serializacao.py
+# Compara as duas formas de responder as listagens, no GET /projetos/{id}/tarefas/ com
+# 10k linhas (banco local SQLite):
+#   - original (RESPOSTAS_RAPIDAS=0): dicts por zip, validação de cada linha pelo
+#     response_model e o JSONResponse da biblioteca padrão
+#   - rápida (RESPOSTAS_RAPIDAS=1): fábrica de linhas compilada + orjson (app/serializacao.py)
+# e confere que o corpo das respostas é o mesmo byte a byte (também em /materiais/, que tem
+# campos float, e com `fields`) e que o schema do OpenAPI não mudou.
+#
+# Uso (a partir da raiz do projeto):
+#   python -m benchmarks.bench_serializacao
+#   python -m benchmarks.bench_serializacao --linhas 10000 --repeticoes 30
+
+import argparse
+import datetime
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+# Só CRUD: o modelo não participa da medição
+os.environ.setdefault("MODELOS_CARREGAR", "0")
+
+from fastapi.testclient import TestClient
+
+from app import config, database
+from app.main import app
+from app.pool import PoolConexoes
+from benchmarks import banco_local
+
+
+def popular(conexao, linhas: int, seed: int):
+    """Um projeto com `linhas` tarefas (metade já concluída) e alguns materiais."""
+    rng = random.Random(seed)
+    cursor = conexao.cursor()
+    cursor.execute("INSERT INTO Projetos (Nome, DataInicio, DataPrevistaFim, Status) VALUES (?, ?, ?, ?)",
+                   "Projeto 1", datetime.date(2025, 1, 1), datetime.date(2025, 12, 31), "Em Andamento")
+    base = datetime.datetime(2025, 1, 1, 8, 0)
+    tarefas = []
+    for i in range(linhas):
+        inicio = base + datetime.timedelta(days=rng.randint(0, 300), minutes=rng.randint(0, 600))
+        fim = inicio + datetime.timedelta(days=rng.randint(3, 30))
+        concluida = rng.random() < 0.5
+        tarefas.append((1, f"Tarefa {i} da obra", inicio, fim, inicio if concluida else None,
+                        fim + datetime.timedelta(days=rng.randint(0, 5)) if concluida else None,
+                        "Concluída no Prazo" if concluida else "Pendente"))
+    cursor.executemany(
+        "INSERT INTO Tarefas (ProjetoID, Descricao, DataInicioPrevista, DataFimPrevista, DataInicioReal, DataFimReal, Status) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)", tarefas
+    )
+    cursor.executemany(
+        "INSERT INTO Materiais (ProjetoID, NomeMaterial, QuantidadeNecessaria, QuantidadeEmEstoque, Unidade) VALUES (?, ?, ?, ?, ?)",
+        [(1, f"Material {m}", rng.randint(10, 500), rng.choice([0, rng.uniform(0, 500)]), "un") for m in range(50)]
+    )
+    conexao.commit()
+
+
+def com_modo(rapido: bool, funcao, *args):
+    anterior = config.RESPOSTAS_RAPIDAS
+    config.RESPOSTAS_RAPIDAS = rapido
+    try:
+        return funcao(*args)
+    finally:
+        config.RESPOSTAS_RAPIDAS = anterior
+
+
+def medir(cliente: TestClient, rota: str, repeticoes: int) -> dict:
+    cliente.get(rota)  # aquecimento
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resposta = cliente.get(rota)
+        tempos.append(time.perf_counter() - inicio)
+        assert resposta.status_code == 200, resposta.text
+    tempos.sort()
+    return {"mediana_ms": statistics.median(tempos) * 1000, "p95_ms": tempos[int(len(tempos) * 0.95) - 1] * 1000,
+            "bytes": len(resposta.content)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Listagens: validação pelo response_model vs fábrica de linhas + orjson.")
+    parser.add_argument("--linhas", type=int, default=10000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "bench.db")
+        conexao = banco_local.conectar(caminho)
+        popular(conexao, args.linhas, args.seed)
+        conexao.close()
+        database.usar_pool(PoolConexoes(lambda: banco_local.conectar(caminho), 0, 2))
+
+        with TestClient(app) as cliente:
+            # Mesmo JSON nos dois modos
+            for rota in (f"/projetos/1/tarefas/?limit={args.linhas}", "/projetos/1/materiais/",
+                         "/projetos/1/tarefas/?limit=100&fields=Descricao,DataFimReal"):
+                original = com_modo(False, cliente.get, rota)
+                rapida = com_modo(True, cliente.get, rota)
+                assert original.content == rapida.content, f"respostas diferentes em {rota}"
+                assert original.headers.get("x-proximo-cursor") == rapida.headers.get("x-proximo-cursor")
+            openapi = [json.dumps(com_modo(modo, app.openapi), sort_keys=True) for modo in (False, True)]
+            assert openapi[0] == openapi[1], "o schema do OpenAPI mudou"
+
+            rota = f"/projetos/1/tarefas/?limit={args.linhas}"
+            resultados = {nome: com_modo(rapido, medir, cliente, rota, args.repeticoes)
+                          for nome, rapido in (("original", False), ("rápida", True))}
+
+    print(f"GET /projetos/1/tarefas/ com {args.linhas} linhas ({resultados['original']['bytes'] / 1024:.0f} KB), "
+          f"mediana de {args.repeticoes} requisições")
+    print(f"  {'caminho':<10} | {'mediana (ms)':>12} | {'p95 (ms)':>9}")
+    for nome, r in resultados.items():
+        print(f"  {nome:<10} | {r['mediana_ms']:>12.1f} | {r['p95_ms']:>9.1f}")
+    print(f"  ganho: {resultados['original']['mediana_ms'] / resultados['rápida']['mediana_ms']:.1f}x; "
+          "corpo idêntico (tarefas, materiais e fields) e OpenAPI inalterado")
+
+
+if __name__ == "__main__":
+    main()
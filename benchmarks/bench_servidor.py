@@ -0,0 +1,402 @@
+# Arquivo: solarys_api/benchmarks/bench_servidor.py
+# Escala do python -m app.serve com 1, 2, 4 e 8 workers sobre o banco local SQLite:
+#   - sobe o servidor de verdade (processo principal + workers por fork) em um subprocesso,
+#     com o pool de cada worker trocado pelo banco local (preparar_worker)
+#   - gera carga de vários processos, com conexões keep-alive e um cliente HTTP mínimo
+#     (o httpx sozinho satura antes de 8 workers): previsão unitária, previsão em lote e
+#     GET /projetos/{id}/tarefas/
+#   - mede requisições/s e p50/p99, a memória dos processos (RSS somado contra PSS, que
+#     divide as páginas compartilhadas: mostra o modelo carregado uma vez antes do fork)
+#   - com mais de um worker, confere o estado compartilhado: depois de um POST /projetos/ em
+#     um worker, todos devolvem a listagem nova (e não 304 com o ETag antigo), e um
+#     POST /modelos/v2/ativar chega a todos os workers
+#   - confere a drenagem: requisições lentas em andamento no SIGTERM terminam com 200,
+#     conexões novas são recusadas e o servidor sai com código 0
+# Só as leituras vão ao banco: escritas concorrentes no SQLite disputam a trava do arquivo,
+# o que não diz nada sobre o SQL Server.
+#
+# Uso (a partir da raiz do projeto; a escala depende dos núcleos livres da máquina):
+#   python -m benchmarks.bench_servidor
+#   python -m benchmarks.bench_servidor --workers 1,2,4,8 --duracao 15 --conexoes 128 --clientes 4
+
+import argparse
+import asyncio
+import datetime
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks import banco_local
+from benchmarks.carga_mista import entrada_previsao
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def popular(conexao, projetos: int, tarefas_por_projeto: int, seed: int):
+    rng = random.Random(seed)
+    cursor = conexao.cursor()
+    cursor.executemany("INSERT INTO Projetos (Nome, DataInicio, DataPrevistaFim, Status) VALUES (?, ?, ?, ?)",
+                       [(f"Projeto {p}", datetime.date(2025, 1, 1), datetime.date(2025, 12, 31), "Em Andamento") for p in range(projetos)])
+    base = datetime.datetime(2025, 1, 1, 8, 0)
+    linhas = []
+    for projeto in range(1, projetos + 1):
+        for i in range(tarefas_por_projeto):
+            inicio = base + datetime.timedelta(days=rng.randint(0, 300))
+            linhas.append((projeto, f"Tarefa {i}", inicio, inicio + datetime.timedelta(days=rng.randint(3, 30)), "Pendente"))
+    cursor.executemany("INSERT INTO Tarefas (ProjetoID, Descricao, DataInicioPrevista, DataFimPrevista, Status) VALUES (?, ?, ?, ?, ?)", linhas)
+    conexao.commit()
+
+
+# --- servidor (subprocesso) ---
+
+def servidor_interno(args):
+    """Roda app.serve com o banco local no lugar do pyodbc e uma rota lenta para a drenagem."""
+    from app import serve
+
+    def preparar_worker(_indice):
+        from fastapi import Query
+
+        from app import config, database
+        from app.main import app
+        from app.pool import PoolConexoes
+
+        database.usar_pool(PoolConexoes(lambda: banco_local.conectar(args.interno_servidor), 0, config.DB_POOL_MAX))
+
+        async def lenta(segundos: float = Query(1.0)):
+            await asyncio.sleep(segundos)
+            return {"segundos": segundos}
+        app.add_api_route("/_bench/lenta", lenta, methods=["GET"])
+
+    serve.servir(args.workers_servidor, "127.0.0.1", args.porta, args.conexoes_total, drenagem=10,
+                 log_level="warning", preparar_worker=preparar_worker)
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _status(url: str) -> int | None:
+    try:
+        with urllib.request.urlopen(url, timeout=30) as resposta:
+            return resposta.status
+    except urllib.error.HTTPError as ex:
+        return ex.code
+    except OSError:
+        return None
+
+
+def _filhos(pid: int) -> list:
+    """PIDs dos processos filhos (workers), pelo /proc."""
+    filhos = []
+    for nome in os.listdir("/proc"):
+        if nome.isdigit():
+            try:
+                with open(f"/proc/{nome}/stat") as f:
+                    # O nome do processo fica entre parênteses e pode ter espaços
+                    campos = f.read().rsplit(")", 1)[1].split()
+            except OSError:
+                continue
+            if int(campos[1]) == pid:
+                filhos.append(int(nome))
+    return filhos
+
+
+def _memoria_kb(pid: int) -> tuple:
+    """(RSS, PSS) em kB, do /proc/<pid>/smaps_rollup."""
+    valores = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for linha in f:
+            nome, _, resto = linha.partition(":")
+            if nome in ("Rss", "Pss"):
+                valores[nome] = int(resto.split()[0])
+    return valores["Rss"], valores["Pss"]
+
+
+def preparar_modelos(pasta: str) -> str:
+    """Diretório de modelos com o v1 do projeto e uma cópia dele como v2 (para a troca de versão)."""
+    destino = os.path.join(pasta, "modelos")
+    os.makedirs(destino)
+    for versao in ("v1", "v2"):
+        shutil.copy(os.path.join(RAIZ, "modelo_atraso_v1.joblib"), os.path.join(destino, f"modelo_atraso_{versao}.joblib"))
+        shutil.copy(os.path.join(RAIZ, "colunas_modelo_v1.json"), os.path.join(destino, f"colunas_modelo_{versao}.json"))
+    return destino
+
+
+def subir(caminho: str, workers: int, conexoes_total: int, modelos_dir: str) -> tuple:
+    porta = _porta_livre()
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.bench_servidor", "--interno-servidor", caminho,
+         "--workers-servidor", str(workers), "--porta", str(porta), "--conexoes-total", str(conexoes_total)],
+        cwd=RAIZ, stdout=subprocess.DEVNULL, env={**os.environ, "MODELOS_DIR": modelos_dir}
+    )
+    prazo = time.monotonic() + 120
+    while _status(f"http://127.0.0.1:{porta}/health/ready") != 200 or (os.path.isdir("/proc") and len(_filhos(processo.pid)) < workers):
+        if processo.poll() is not None:
+            raise RuntimeError(f"o servidor terminou com código {processo.returncode}")
+        if time.monotonic() > prazo:
+            processo.kill()
+            raise RuntimeError("o servidor não ficou pronto em 120s")
+        time.sleep(0.1)
+    return processo, porta
+
+
+# --- carga (processos clientes) ---
+
+class ConexaoHTTP:
+    """HTTP/1.1 keep-alive mínimo: só o necessário para respostas com Content-Length."""
+
+    def __init__(self, leitor, escritor):
+        self.leitor, self.escritor = leitor, escritor
+
+    @classmethod
+    async def abrir(cls, porta: int):
+        return cls(*await asyncio.open_connection("127.0.0.1", porta))
+
+    async def requisitar(self, metodo: str, rota: str, corpo: bytes | None = None) -> int:
+        cabecalho = f"{metodo} {rota} HTTP/1.1\r\nHost: bench\r\n"
+        if corpo is not None:
+            cabecalho += f"Content-Type: application/json\r\nContent-Length: {len(corpo)}\r\n"
+        self.escritor.write(cabecalho.encode() + b"\r\n" + (corpo or b""))
+        cabecalhos = await self.leitor.readuntil(b"\r\n\r\n")
+        tamanho = None
+        for linha in cabecalhos.split(b"\r\n")[1:]:
+            nome, _, valor = linha.partition(b":")
+            if nome.lower() == b"content-length":
+                tamanho = int(valor)
+        if tamanho is None:
+            raise RuntimeError(f"resposta sem Content-Length em {rota}")
+        await self.leitor.readexactly(tamanho)
+        return int(cabecalhos[9:12])
+
+
+def _requisicoes(seed: int, projetos: int, tamanho_lote: int):
+    rng = random.Random(seed)
+    while True:
+        sorteio = rng.random()
+        if sorteio < 0.4:
+            yield "previsao", "POST", "/prever/tarefa-atraso/", json.dumps(entrada_previsao(rng)).encode()
+        elif sorteio < 0.6:
+            lote = [entrada_previsao(rng) for _ in range(tamanho_lote)]
+            yield "previsao_lote", "POST", "/prever/tarefa-atraso/lote/", json.dumps(lote).encode()
+        else:
+            yield "crud_leitura", "GET", f"/projetos/{rng.randint(1, projetos)}/tarefas/?limit=50", None
+
+
+async def _carga(porta: int, conexoes: int, inicio_medicao: float, fim: float, seed: int, projetos: int, tamanho_lote: int) -> dict:
+    resultados = {}
+
+    async def usuario(indice: int):
+        conexao = await ConexaoHTTP.abrir(porta)
+        for categoria, metodo, rota, corpo in _requisicoes(seed * 1000 + indice, projetos, tamanho_lote):
+            agora = time.time()
+            if agora >= fim:
+                break
+            status = await conexao.requisitar(metodo, rota, corpo)
+            if agora >= inicio_medicao:
+                tempos, erros = resultados.setdefault(categoria, ([], [0]))
+                tempos.append(time.time() - agora)
+                erros[0] += status != 200
+        conexao.escritor.close()
+
+    await asyncio.gather(*(usuario(i) for i in range(conexoes)))
+    return {categoria: (tempos, erros[0]) for categoria, (tempos, erros) in resultados.items()}
+
+
+def processo_cliente(parametros: tuple) -> dict:
+    return asyncio.run(_carga(*parametros))
+
+
+def medir(porta: int, args) -> dict:
+    """Carga com `args.clientes` processos; as latências do aquecimento ficam de fora."""
+    inicio = time.time() + 0.5
+    inicio_medicao, fim = inicio + args.aquecimento, inicio + args.aquecimento + args.duracao
+    por_cliente = max(1, args.conexoes // args.clientes)
+    parametros = [(porta, por_cliente, inicio_medicao, fim, args.seed + c, args.projetos, args.tamanho_lote)
+                  for c in range(args.clientes)]
+    with multiprocessing.get_context("spawn").Pool(args.clientes) as pool:
+        parciais = pool.map(processo_cliente, parametros)
+
+    categorias = {}
+    for parcial in parciais:
+        for categoria, (tempos, erros) in parcial.items():
+            todos, total_erros = categorias.get(categoria, ([], 0))
+            categorias[categoria] = (todos + tempos, total_erros + erros)
+    resultado = {"requisicoes_s": sum(len(tempos) for tempos, _ in categorias.values()) / args.duracao, "categorias": {}}
+    for categoria, (tempos, erros) in sorted(categorias.items()):
+        tempos.sort()
+        resultado["categorias"][categoria] = {
+            "requisicoes_s": len(tempos) / args.duracao,
+            "p50_ms": statistics.median(tempos) * 1000,
+            "p99_ms": tempos[min(len(tempos) - 1, int(len(tempos) * 0.99))] * 1000,
+            "erros": erros,
+        }
+    return resultado
+
+
+def memoria(processo) -> dict | None:
+    if not os.path.isdir("/proc"):
+        return None
+    pids = [processo.pid, *_filhos(processo.pid)]
+    medidas = [_memoria_kb(pid) for pid in pids]
+    return {"rss_total_mb": sum(rss for rss, _ in medidas) / 1024, "pss_total_mb": sum(pss for _, pss in medidas) / 1024}
+
+
+def _requisitar(conexao: http.client.HTTPConnection, metodo: str, rota: str, corpo=None, cabecalhos=None) -> tuple:
+    conexao.request(metodo, rota, body=json.dumps(corpo) if corpo is not None else None,
+                    headers={"Content-Type": "application/json", **(cabecalhos or {})})
+    resposta = conexao.getresponse()
+    conteudo = resposta.read()
+    return resposta.status, resposta.getheader("ETag"), json.loads(conteudo) if conteudo else None
+
+
+def conexoes_por_worker(porta: int, workers: int) -> dict:
+    """Uma conexão keep-alive presa a cada worker, pelo pid que o GET /modelos devolve."""
+    por_pid = {}
+    for _ in range(500):
+        conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=30)
+        pid = _requisitar(conexao, "GET", "/modelos")[2]["pid"]
+        if pid in por_pid:
+            conexao.close()
+        else:
+            por_pid[pid] = conexao
+        if len(por_pid) == workers:
+            break
+    return por_pid
+
+
+def verificar_estado_compartilhado(porta: int, workers: int) -> int:
+    """Escrita e troca de modelo feitas em um worker aparecem em todos. Devolve quantos workers foram vistos."""
+    conexoes = list(conexoes_por_worker(porta, workers).values())
+    assert len(conexoes) >= 2, "todas as conexões caíram no mesmo worker"
+    try:
+        antes = [_requisitar(conexao, "GET", "/projetos/") for conexao in conexoes]
+        projeto = {"Nome": "Projeto novo", "DataInicio": "2025-01-01", "DataPrevistaFim": "2025-12-31", "Status": "Planejado"}
+        assert _requisitar(conexoes[0], "POST", "/projetos/", projeto)[0] == 201
+        for conexao, (_, etag, lista) in zip(conexoes, antes):
+            status, _, nova = _requisitar(conexao, "GET", "/projetos/", cabecalhos={"If-None-Match": etag})
+            assert status == 200 and len(nova) == len(lista) + 1, f"worker com a listagem antiga (status {status})"
+
+        assert _requisitar(conexoes[0], "POST", "/modelos/v2/ativar")[0] == 202
+        prazo = time.monotonic() + 30
+        pendentes = list(conexoes)
+        while pendentes and time.monotonic() < prazo:
+            pendentes = [c for c in pendentes if (_requisitar(c, "GET", "/modelos")[2]["ativo"] or {}).get("versao") != "v2"]
+            time.sleep(0.1)
+        assert not pendentes, f"{len(pendentes)} worker(s) sem a versão ativada"
+        return len(conexoes)
+    finally:
+        for conexao in conexoes:
+            conexao.close()
+
+
+def drenar(processo, porta: int) -> dict:
+    """SIGTERM com requisições lentas em andamento: todas terminam e conexões novas são recusadas."""
+    codigos = []
+    threads = [threading.Thread(target=lambda: codigos.append(_status(f"http://127.0.0.1:{porta}/_bench/lenta?segundos=1.5")))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+    inicio = time.perf_counter()
+    processo.send_signal(signal.SIGTERM)
+    time.sleep(0.3)
+    try:
+        socket.create_connection(("127.0.0.1", porta), timeout=1).close()
+        recusada = False
+    except OSError:
+        recusada = True
+    for thread in threads:
+        thread.join()
+    saida = processo.wait(timeout=30)
+    assert codigos == [200] * len(threads), f"requisições perdidas na drenagem: {codigos}"
+    assert recusada, "o servidor aceitou conexão nova depois do SIGTERM"
+    assert saida == 0, f"o servidor saiu com código {saida}"
+    return {"desligamento_s": time.perf_counter() - inicio, "em_andamento": len(threads)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Requisições/s do python -m app.serve com 1, 2, 4 e 8 workers.")
+    parser.add_argument("--workers", default="1,2,4,8", help="Quantidades de workers, separadas por vírgula.")
+    parser.add_argument("--duracao", type=float, default=10.0, help="Segundos medidos por rodada.")
+    parser.add_argument("--aquecimento", type=float, default=2.0)
+    parser.add_argument("--conexoes", type=int, default=64, help="Conexões keep-alive simultâneas, somando os clientes.")
+    parser.add_argument("--clientes", type=int, default=min(4, os.cpu_count() or 1), help="Processos geradores de carga.")
+    parser.add_argument("--conexoes-total", type=int, default=32, help="Orçamento de conexões com o banco (DB_CONEXOES_TOTAL).")
+    parser.add_argument("--projetos", type=int, default=200)
+    parser.add_argument("--tarefas-por-projeto", type=int, default=100)
+    parser.add_argument("--tamanho-lote", type=int, default=50, help="Entradas por POST de previsão em lote.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--saida", help="Grava os resultados em JSON neste arquivo.")
+    # Modo interno: o subprocesso do servidor
+    parser.add_argument("--interno-servidor", help=argparse.SUPPRESS)
+    parser.add_argument("--workers-servidor", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--porta", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno_servidor:
+        servidor_interno(args)
+        return
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "bench.db")
+        conexao = banco_local.conectar(caminho)
+        popular(conexao, args.projetos, args.tarefas_por_projeto, args.seed)
+        conexao.close()
+        modelos_dir = preparar_modelos(pasta)
+
+        for workers in [int(n) for n in args.workers.split(",")]:
+            processo, porta = subir(caminho, workers, args.conexoes_total, modelos_dir)
+            try:
+                resultado = medir(porta, args)
+                resultado["memoria"] = memoria(processo)
+                if workers > 1:
+                    resultado["workers_verificados"] = verificar_estado_compartilhado(porta, workers)
+                resultado["drenagem"] = drenar(processo, porta)
+            finally:
+                if processo.poll() is None:
+                    processo.kill()
+                    processo.wait()
+            resultados[workers] = resultado
+            print(f"  {workers} worker(s): {resultado['requisicoes_s']:.0f} req/s", flush=True)
+
+    base = resultados[min(resultados)]["requisicoes_s"]
+    print(f"\n{args.conexoes} conexões de {args.clientes} processo(s) cliente, {args.duracao:.0f}s por rodada, "
+          f"{os.cpu_count()} núcleo(s) na máquina")
+    print(f"  {'workers':>7} | {'req/s':>7} | {'escala':>6} | {'previsão p99':>12} | {'lote p99':>9} | {'CRUD p99':>9} | {'RSS (MB)':>8} | {'PSS (MB)':>8}")
+    for workers, r in resultados.items():
+        c = r["categorias"]
+        memoria_texto = (f"{r['memoria']['rss_total_mb']:>8.0f} | {r['memoria']['pss_total_mb']:>8.0f}"
+                         if r["memoria"] else f"{'-':>8} | {'-':>8}")
+        print(f"  {workers:>7} | {r['requisicoes_s']:>7.0f} | {r['requisicoes_s'] / base:>5.2f}x | "
+              f"{c['previsao']['p99_ms']:>10.1f}ms | {c['previsao_lote']['p99_ms']:>7.1f}ms | "
+              f"{c['crud_leitura']['p99_ms']:>7.1f}ms | {memoria_texto}")
+    erros = sum(c["erros"] for r in resultados.values() for c in r["categorias"].values())
+    print(f"  erros: {erros}; drenagem no SIGTERM: {len(resultados)} rodada(s) sem requisição perdida")
+    verificados = {w: r["workers_verificados"] for w, r in resultados.items() if "workers_verificados" in r}
+    if verificados:
+        print("  estado compartilhado (listagem após escrita e POST /modelos/v2/ativar em todos): "
+              + ", ".join(f"{v} de {w} workers" for w, v in verificados.items()))
+
+    if args.saida:
+        with open(args.saida, "w") as f:
+            json.dump({"parametros": vars(args), "resultados": resultados}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
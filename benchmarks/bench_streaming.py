@@ -0,0 +1,107 @@
+# Arquivo: solarys_api/benchmarks/bench_streaming.py
+# Transmite 1M de linhas sintéticas (no formato de Tarefas) de um cursor de mentira pelo
+# mesmo codificador dos endpoints em streaming (app/transmissao.py) e confere que o pico
+# de memória fica limitado, comparando com o caminho antigo (fetchall + lista de dicts).
+#
+# A memória é medida pelo crescimento do pico de RSS do processo (ru_maxrss): com
+# tracemalloc a codificação de 1M de linhas ficaria dezenas de vezes mais lenta.
+#
+# Uso (a partir da raiz do projeto):
+#   python -m benchmarks.bench_streaming
+#   python -m benchmarks.bench_streaming --linhas 1000000 --lote 1000 --limite-mb 16
+
+import argparse
+import datetime
+import json
+import resource
+import sys
+import time
+
+from app import transmissao
+
+COLUNAS = ["TarefaID", "ProjetoID", "Descricao", "DataInicioPrevista", "DataFimPrevista",
+           "DataInicioReal", "DataFimReal", "Status"]
+
+
+class CursorSintetico:
+    """Imita um cursor pyodbc com `total` linhas geradas sob demanda (nada fica em memória)."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.lidas = 0
+        self.description = [(coluna, None, None, None, None, None, None) for coluna in COLUNAS]
+        self._base = datetime.datetime(2024, 1, 1, 8, 0)
+
+    def _linha(self, i: int) -> tuple:
+        inicio = self._base + datetime.timedelta(hours=i % 5000)
+        fim = inicio + datetime.timedelta(days=3 + i % 27)
+        return (i + 1, 1 + i % 700, f"Tarefa sintética número {i}", inicio, fim, inicio, fim,
+                "Atrasada" if i % 3 == 0 else "Concluída no Prazo")
+
+    def fetchmany(self, size: int = 1) -> list:
+        fim = min(self.total, self.lidas + size)
+        linhas = [self._linha(i) for i in range(self.lidas, fim)]
+        self.lidas = fim
+        return linhas
+
+    def fetchall(self) -> list:
+        return self.fetchmany(self.total - self.lidas)
+
+    def close(self):
+        pass
+
+
+def pico_rss() -> int:
+    """Pico de memória residente do processo, em bytes."""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+def medir_streaming(total: int, lote: int, formato: str):
+    antes = pico_rss()
+    inicio = time.perf_counter()
+    bytes_enviados = 0
+    for bloco in transmissao.iterar_blocos(CursorSintetico(total), formato, lote):
+        bytes_enviados += len(bloco)  # o bloco seria escrito no socket e descartado
+    duracao = time.perf_counter() - inicio
+    return pico_rss() - antes, bytes_enviados, duracao
+
+
+def medir_lista(total: int):
+    """Caminho antigo: fetchall, lista de dicts e um único json.dumps no final."""
+    antes = pico_rss()
+    cursor = CursorSintetico(total)
+    columns = [column[0] for column in cursor.description]
+    linhas = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    corpo = json.dumps(linhas, default=str).encode()
+    return pico_rss() - antes, len(corpo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming de listagens: memória limitada com 1M de linhas.")
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--lote", type=int, default=1000, help="Linhas por fetchmany.")
+    parser.add_argument("--limite-mb", type=float, default=16.0, help="Crescimento máximo aceito do pico de RSS no streaming.")
+    parser.add_argument("--linhas-lista", type=int, default=100_000,
+                        help="Linhas usadas na comparação com o caminho antigo (que cresce linearmente).")
+    args = parser.parse_args()
+
+    mb = 1024 * 1024
+    # Aquecimento: os primeiros blocos alocam as estruturas do codificador
+    medir_streaming(args.lote * 10, args.lote, transmissao.FORMATO_NDJSON)
+
+    for formato in (transmissao.FORMATO_NDJSON, transmissao.FORMATO_JSON):
+        crescimento, enviados, duracao = medir_streaming(args.linhas, args.lote, formato)
+        print(f"streaming {formato:<6} | {args.linhas} linhas | {enviados / mb:8.1f} MB enviados | "
+              f"pico de RSS +{crescimento / mb:6.2f} MB | {args.linhas / duracao:,.0f} linhas/s")
+        assert crescimento < args.limite_mb * mb, f"pico de memória cresceu mais de {args.limite_mb} MB no streaming {formato}"
+
+    # Por último: o caminho antigo eleva o pico de RSS do processo para todo o resto da execução
+    crescimento_lista, tamanho = medir_lista(args.linhas_lista)
+    print(f"\ncaminho antigo (fetchall + lista) com {args.linhas_lista} linhas: pico de RSS "
+          f"+{crescimento_lista / mb:.1f} MB para {tamanho / mb:.1f} MB de resposta")
+    print("\nOK: memória do streaming limitada e independente do número de linhas.")
+
+
+if __name__ == "__main__":
+    main()
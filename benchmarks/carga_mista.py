@@ -0,0 +1,130 @@
+# Arquivo: solarys_api/benchmarks/carga_mista.py
+# Teste de carga com tráfego misto (CRUD + previsão) contra uma API rodando.
+# Mostra p50/p99 por tipo de rota; rodando antes e depois de uma mudança (ex.: em dois
+# checkouts) dá para comparar como consultas lentas afetam a latência da previsão.
+#
+# Uso (com a API rodando, ex.: uvicorn app.main:app):
+#   python -m benchmarks.carga_mista --url http://127.0.0.1:8000 --concorrencia 100 --duracao 20
+#   python -m benchmarks.carga_mista --proporcao-previsao 0.5 --saida resultado.json
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+
+ROTAS_LEITURA = ["/projetos/", "/funcionarios/"]
+ROTAS_POR_PROJETO = ["/projetos/{id}", "/projetos/{id}/tarefas/", "/projetos/{id}/materiais/",
+                     "/projetos/{id}/recursos_financeiros/", "/projetos/{id}/alocacoes/"]
+
+
+def entrada_previsao(rng: random.Random) -> dict:
+    return {
+        "DuracaoPrevista": rng.randint(3, 30),
+        "StatusProjeto": "Em Andamento",
+        "MesInicioPrevisto": rng.randint(1, 12),
+        "DiaDaSemanaInicioPrevisto": rng.randint(0, 6),
+        "DiferencaDuracao": rng.randint(-3, 12),
+    }
+
+
+async def trabalhador(args, fim: float, rng: random.Random, resultados: dict):
+    # Um cliente (e uma conexão keep-alive) por usuário virtual: um pool único do httpx
+    # disputado por centenas de corrotinas vira o gargalo do próprio gerador de carga.
+    limites = httpx.Limits(max_connections=1, max_keepalive_connections=1)
+    async with httpx.AsyncClient(base_url=args.url, limits=limites, timeout=args.timeout) as cliente:
+        while time.perf_counter() < fim:
+            await uma_requisicao(cliente, args, rng, resultados)
+
+
+async def uma_requisicao(cliente: httpx.AsyncClient, args, rng: random.Random, resultados: dict):
+    sorteio = rng.random()
+    if sorteio < args.proporcao_previsao:
+        categoria = "previsao"
+        requisicao = cliente.post("/prever/tarefa-atraso/", json=entrada_previsao(rng))
+    elif sorteio < args.proporcao_previsao + args.proporcao_escrita:
+        categoria = "crud_escrita"
+        requisicao = cliente.post("/funcionarios/", json={
+            "NomeCompleto": f"Funcionário {rng.randint(1, 10**6)}", "Funcao": "Pedreiro", "Status": "Ativo"
+        })
+    else:
+        categoria = "crud_leitura"
+        if rng.random() < 0.2:
+            rota = rng.choice(ROTAS_LEITURA)
+        else:
+            rota = rng.choice(ROTAS_POR_PROJETO).format(id=rng.randint(1, args.max_projeto_id))
+        requisicao = cliente.get(rota)
+
+    inicio = time.perf_counter()
+    try:
+        resposta = await requisicao
+        ok = resposta.status_code < 500
+    except httpx.HTTPError:
+        ok = False
+    duracao = time.perf_counter() - inicio
+
+    dados = resultados.setdefault(categoria, {"latencias": [], "erros": 0})
+    dados["latencias"].append(duracao)
+    if not ok:
+        dados["erros"] += 1
+
+
+def percentil(valores: list, p: float) -> float:
+    return valores[min(len(valores) - 1, int(len(valores) * p))] if valores else 0.0
+
+
+def resumir(resultados: dict, duracao: float) -> dict:
+    resumo = {}
+    for categoria, dados in sorted(resultados.items()):
+        latencias = sorted(dados["latencias"])
+        resumo[categoria] = {
+            "requisicoes": len(latencias),
+            "erros": dados["erros"],
+            "req_por_s": len(latencias) / duracao,
+            "p50_ms": percentil(latencias, 0.50) * 1000,
+            "p99_ms": percentil(latencias, 0.99) * 1000,
+        }
+    return resumo
+
+
+async def executar(args) -> dict:
+    resultados = {}
+    inicio = time.perf_counter()
+    fim = inicio + args.duracao
+    await asyncio.gather(*(
+        trabalhador(args, fim, random.Random(args.seed + i), resultados)
+        for i in range(args.concorrencia)
+    ))
+    return resumir(resultados, time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga mista de CRUD e previsão contra a API.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concorrencia", type=int, default=100, help="Clientes simultâneos.")
+    parser.add_argument("--duracao", type=float, default=20.0, help="Segundos de carga.")
+    parser.add_argument("--proporcao-previsao", type=float, default=0.3)
+    parser.add_argument("--proporcao-escrita", type=float, default=0.1)
+    parser.add_argument("--max-projeto-id", type=int, default=700)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--saida", help="Arquivo JSON para salvar o resumo.")
+    args = parser.parse_args()
+
+    resumo = asyncio.run(executar(args))
+
+    print(f"{'categoria':<14} | {'req':>7} | {'erros':>5} | {'req/s':>8} | {'p50 (ms)':>9} | {'p99 (ms)':>9}")
+    print("-" * 68)
+    for categoria, dados in resumo.items():
+        print(f"{categoria:<14} | {dados['requisicoes']:>7} | {dados['erros']:>5} | {dados['req_por_s']:>8.1f} | "
+              f"{dados['p50_ms']:>9.2f} | {dados['p99_ms']:>9.2f}")
+
+    if args.saida:
+        with open(args.saida, "w") as f:
+            json.dump({"parametros": vars(args), "resultado": resumo}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
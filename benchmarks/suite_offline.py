@@ -0,0 +1,263 @@
+# Arquivo: solarys_api/benchmarks/suite_offline.py
+# Suíte de benchmarks reprodutível, sem rede e sem SQL Server: a API roda no próprio
+# processo (httpx.AsyncClient + ASGITransport, com o lifespan de verdade) sobre o banco
+# local SQLite (banco_local) e cada cenário é disparado com N clientes simultâneos:
+#   - crud_leitura:   GETs por projeto (tarefas paginadas, materiais, alocações, resumo)
+#   - crud_escrita:   POST /tarefas/ e POST /funcionarios/
+#   - previsao:       POST /prever/tarefa-atraso/
+#   - previsao_lote:  POST /prever/tarefa-atraso/lote/ (--tamanho-lote-previsao entradas)
+# O resultado (vazão e p50/p95/p99 por cenário, mais o commit e os parâmetros) vai para um
+# JSON; com --comparar, cada cenário é comparado com um JSON anterior e o código de saída
+# é 1 se o p95 piorar ou a vazão cair mais que --tolerancia (para pegar regressões entre commits).
+# No fim, confere o ?profile=1 (app.perfil) em um endpoint do banco e na previsão em lote: os dois
+# mandam trabalho aos executores, que é onde o cProfile do Python 3.12+ conflitava.
+#
+# O banco local entra pelo pool global (database.usar_pool), o mesmo caminho da dependência
+# get_db_connection, das leituras em cache (abrir_conexao) e do motor de alertas.
+#
+# Uso (a partir da raiz do projeto):
+#   python -m benchmarks.suite_offline --saida base.json
+#   python -m benchmarks.suite_offline --concorrencia 64 --requisicoes 5000 --comparar base.json
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from app import database, perfil
+from app.main import app
+from app.pool import PoolConexoes
+from benchmarks import banco_local
+from benchmarks.bench_alertas import popular as popular_tarefas
+from benchmarks.bench_insercao_lote import ConexaoComLatencia
+from benchmarks.carga_mista import entrada_previsao
+
+ROTAS_LEITURA = ("/projetos/{id}/tarefas/?limit=50", "/projetos/{id}/materiais/",
+                 "/projetos/{id}/alocacoes/", "/projetos/{id}/resumo")
+
+
+def popular(conexao, args):
+    """Projetos e tarefas (como em bench_alertas), mais materiais, funcionários e alocações."""
+    popular_tarefas(conexao, args.projetos, args.projetos * args.tarefas_por_projeto, args.seed)
+    rng = random.Random(args.seed)
+    cursor = conexao.cursor()
+    cursor.executemany(
+        "INSERT INTO Materiais (ProjetoID, NomeMaterial, QuantidadeNecessaria, QuantidadeEmEstoque, Unidade) VALUES (?, ?, ?, ?, ?)",
+        [(p, f"Material {m}", rng.randint(10, 500), rng.randint(0, 500), "un") for p in range(1, args.projetos + 1) for m in range(8)]
+    )
+    cursor.executemany(
+        "INSERT INTO Funcionarios (NomeCompleto, Funcao, Status) VALUES (?, ?, ?)",
+        [(f"Funcionário {i}", "Pedreiro", "Ativo") for i in range(200)]
+    )
+    cursor.executemany(
+        "INSERT INTO AlocacaoFuncionarios (FuncionarioID, ProjetoID, DataInicioAlocacao) VALUES (?, ?, ?)",
+        [(rng.randint(1, 200), p, datetime.date(2025, 1, 1)) for p in range(1, args.projetos + 1) for _ in range(5)]
+    )
+    conexao.commit()
+
+
+def requisicao_leitura(rng: random.Random, args) -> tuple:
+    return "GET", rng.choice(ROTAS_LEITURA).format(id=rng.randint(1, args.projetos)), None
+
+
+def requisicao_escrita(rng: random.Random, args) -> tuple:
+    if rng.random() < 0.5:
+        return "POST", "/funcionarios/", {"NomeCompleto": f"Funcionário {rng.randint(1, 10**6)}", "Funcao": "Pedreiro", "Status": "Ativo"}
+    inicio = datetime.datetime(2025, 1, 1, 8) + datetime.timedelta(days=rng.randint(0, 180))
+    return "POST", "/tarefas/", {
+        "ProjetoID": rng.randint(1, args.projetos), "Descricao": "Tarefa da suíte",
+        "DataInicioPrevista": inicio.isoformat(), "DataFimPrevista": (inicio + datetime.timedelta(days=rng.randint(3, 30))).isoformat(),
+        "Status": "Pendente",
+    }
+
+
+def requisicao_previsao(rng: random.Random, args) -> tuple:
+    return "POST", "/prever/tarefa-atraso/", entrada_previsao(rng)
+
+
+def requisicao_previsao_lote(rng: random.Random, args) -> tuple:
+    return "POST", "/prever/tarefa-atraso/lote/", [entrada_previsao(rng) for _ in range(args.tamanho_lote_previsao)]
+
+
+CENARIOS = {
+    "crud_leitura": requisicao_leitura,
+    "crud_escrita": requisicao_escrita,
+    "previsao": requisicao_previsao,
+    "previsao_lote": requisicao_previsao_lote,
+}
+
+
+def percentil(ordenadas: list, p: float) -> float:
+    # Método do vizinho mais próximo (sem interpolação), como nos outros benchmarks
+    return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p))] if ordenadas else 0.0
+
+
+async def executar_cenario(cliente: httpx.AsyncClient, gerar, args, seed: int) -> dict:
+    """`args.requisicoes` requisições divididas entre `args.concorrencia` clientes simultâneos."""
+    restantes = args.requisicoes
+    latencias, erros = [], 0
+
+    async def trabalhador(rng: random.Random):
+        nonlocal restantes, erros
+        while restantes > 0:
+            restantes -= 1
+            metodo, rota, corpo = gerar(rng, args)
+            inicio = time.perf_counter()
+            resposta = await cliente.request(metodo, rota, json=corpo)
+            latencias.append(time.perf_counter() - inicio)
+            if resposta.status_code >= 400:
+                erros += 1
+
+    # Aquecimento fora da medição (caches de rota, JIT do pydantic, conexões do pool)
+    rng = random.Random(seed)
+    for _ in range(min(args.concorrencia, 20)):
+        metodo, rota, corpo = gerar(rng, args)
+        await cliente.request(metodo, rota, json=corpo)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador(random.Random(seed + 1 + i)) for i in range(args.concorrencia)))
+    duracao = time.perf_counter() - inicio
+    latencias.sort()
+    return {
+        "requisicoes": len(latencias),
+        "erros": erros,
+        "duracao_s": duracao,
+        "req_por_s": len(latencias) / duracao,
+        "p50_ms": percentil(latencias, 0.50) * 1000,
+        "p95_ms": percentil(latencias, 0.95) * 1000,
+        "p99_ms": percentil(latencias, 0.99) * 1000,
+        "max_ms": latencias[-1] * 1000 if latencias else 0.0,
+    }
+
+
+async def esperar_modelo(cliente: httpx.AsyncClient, timeout: float = 60.0):
+    prazo = time.monotonic() + timeout
+    while (resposta := await cliente.get("/health/ready")).status_code != 200:
+        if resposta.json()["status"] != "carregando" or time.monotonic() > prazo:
+            raise SystemExit(f"Modelo não carregado: {resposta.json()}")
+        await asyncio.sleep(0.05)
+
+
+async def verificar_perfil(args):
+    """?profile=1 devolve o relatório com o status original 200 em rotas que usam os executores."""
+    # O middleware entra direto no transporte: não depende de PERFIL_HABILITADO no ambiente
+    transporte = httpx.ASGITransport(app=perfil.MiddlewarePerfil(app))
+    async with httpx.AsyncClient(transport=transporte, base_url="http://suite", timeout=args.timeout) as cliente:
+        rng = random.Random(args.seed)
+        for metodo, rota, corpo in (("GET", "/projetos/1/tarefas/?limit=50", None),
+                                    requisicao_previsao_lote(rng, args)):
+            resposta = await cliente.request(metodo, rota, params={"profile": "1"}, json=corpo)
+            primeira = resposta.text.partition("\n")[0]
+            if resposta.status_code != 200 or "status original 200" not in primeira or " 0 chamada(s)" in primeira:
+                raise SystemExit(f"?profile=1 falhou em {metodo} {rota}: {resposta.status_code} {primeira!r}")
+            print(f"  ?profile=1 {metodo} {rota}: {primeira}")
+
+
+async def executar(args) -> dict:
+    resultados = {}
+    transporte = httpx.ASGITransport(app=app)
+    # O ASGITransport não dispara o lifespan: é aberto aqui, como o uvicorn faria
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transporte, base_url="http://suite", timeout=args.timeout) as cliente:
+            await esperar_modelo(cliente)
+            for indice, nome in enumerate(args.cenarios):
+                resultados[nome] = await executar_cenario(cliente, CENARIOS[nome], args, args.seed + 1000 * indice)
+        await verificar_perfil(args)
+    return resultados
+
+
+def commit_atual() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(resultados: dict, anterior: dict, tolerancia: float) -> list:
+    """Imprime a variação por cenário e devolve as regressões acima da tolerância."""
+    regressoes = []
+    print(f"\nComparação com {anterior.get('commit') or 'o arquivo anterior'} (tolerância de {tolerancia:.0%})")
+    for nome, atual in resultados.items():
+        base = anterior["resultados"].get(nome)
+        if base is None:
+            continue
+        variacao_p95 = atual["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        variacao_vazao = atual["req_por_s"] / base["req_por_s"] - 1 if base["req_por_s"] else 0.0
+        marca = ""
+        if variacao_p95 > tolerancia or variacao_vazao < -tolerancia:
+            regressoes.append(nome)
+            marca = "  <- REGRESSÃO"
+        print(f"  {nome:<14} | p95 {base['p95_ms']:8.2f} -> {atual['p95_ms']:8.2f} ms ({variacao_p95:+.0%}) | "
+              f"req/s {base['req_por_s']:8.1f} -> {atual['req_por_s']:8.1f} ({variacao_vazao:+.0%}){marca}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suíte offline: CRUD e previsão no próprio processo, sobre o banco local.")
+    parser.add_argument("--concorrencia", type=int, default=32, help="Clientes simultâneos por cenário.")
+    parser.add_argument("--requisicoes", type=int, default=2000, help="Requisições medidas por cenário.")
+    parser.add_argument("--cenarios", nargs="+", choices=list(CENARIOS), default=list(CENARIOS))
+    parser.add_argument("--projetos", type=int, default=100)
+    parser.add_argument("--tarefas-por-projeto", type=int, default=50)
+    parser.add_argument("--tamanho-lote-previsao", type=int, default=100)
+    parser.add_argument("--pool", type=int, default=8, help="Conexões no pool do banco local.")
+    parser.add_argument("--latencia-banco", type=float, default=0.0, help="Round trip simulado por chamada ao banco, em ms.")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--saida", help="Grava os resultados em JSON neste arquivo.")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar.")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Piora aceita no p95 e na vazão antes de acusar regressão.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "suite.db")
+        conexao = banco_local.conectar(caminho)
+        # WAL: leitores não esperam pelo escritor (o SQL Server também não bloqueia leituras assim)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        popular(conexao, args)
+        conexao.close()
+
+        latencia = args.latencia_banco / 1000
+        if latencia:
+            fabrica = lambda: ConexaoComLatencia(banco_local.conectar(caminho), latencia)
+        else:
+            fabrica = lambda: banco_local.conectar(caminho)
+        database.usar_pool(PoolConexoes(fabrica, 0, args.pool))
+
+        resultados = asyncio.run(executar(args))
+
+    print(f"Suíte offline: {args.concorrencia} clientes, {args.requisicoes} requisições por cenário, "
+          f"round trip simulado de {args.latencia_banco:g} ms")
+    print(f"  {'cenário':<14} | {'erros':>5} | {'req/s':>8} | {'p50 (ms)':>9} | {'p95 (ms)':>9} | {'p99 (ms)':>9}")
+    for nome, r in resultados.items():
+        print(f"  {nome:<14} | {r['erros']:>5} | {r['req_por_s']:>8.1f} | {r['p50_ms']:>9.2f} | {r['p95_ms']:>9.2f} | {r['p99_ms']:>9.2f}")
+
+    relatorio = {
+        "commit": commit_atual(),
+        "data": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "parametros": vars(args),
+        "resultados": resultados,
+    }
+    if args.saida:
+        with open(args.saida, "w") as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+
+    if args.comparar:
+        with open(args.comparar) as f:
+            anterior = json.load(f)
+        if comparar(resultados, anterior, args.tolerancia):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
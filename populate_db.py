@@ -1,20 +1,53 @@
 # Arquivo: solarys_api/populate_db.py
-# VERSÃO 2 - Agora criando projetos e suas respectivas tarefas
+# VERSÃO 4 - Gerador de dados assíncrono e determinístico
+#
+# - Os dados são gerados em sequência com random/Faker semeados (--seed) e datas relativas a
+#   --data-referencia: a mesma semente gera sempre o mesmo conjunto, qualquer que seja a
+#   concorrência do envio.
+# - Projetos e funcionários vão por /projetos/bulk e /funcionarios/bulk (os IDs voltam na
+#   ordem enviada); tarefas, materiais e recursos financeiros pelos outros endpoints /bulk,
+#   ITENS_POR_REQUISICAO por vez; alocações uma a uma (passam pelas regras do endpoint).
+# - O envio usa httpx assíncrono com conexões keep-alive e no máximo --concorrencia
+#   requisições em andamento, com progresso e vazão por tipo de dado.
+# - Com --direto os lotes vão direto para o banco (app/insercao.py), sem API: pelo
+#   DATABASE_URL do .env ou, com --sqlite, para o banco local dos benchmarks.
+#
+# Uso:
+#   python populate_db.py --projetos 700
+#   python populate_db.py --projetos 8000 --tarefas-min 10 --tarefas-max 20 --concorrencia 8
+#   python populate_db.py --projetos 2000 --direto --sqlite dados.db
 
-import requests
+import argparse
+import asyncio
 import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import httpx
 from faker import Faker
-from datetime import datetime, timedelta
 
 # URL base da nossa API que está rodando localmente
 API_URL = "http://127.0.0.1:8000"
 
+# Itens por requisição nos endpoints /bulk (a API ainda divide em blocos de INSERCAO_TAMANHO_LOTE)
+ITENS_POR_REQUISICAO = 5000
+
 # Inicializa o Faker para gerar dados em português brasileiro
 fake = Faker('pt_BR')
 
-def criar_projeto():
+MATERIAIS = [("Cimento", "saco"), ("Areia", "m³"), ("Brita", "m³"), ("Tijolo", "milheiro"),
+             ("Vergalhão", "barra"), ("Cabo solar 6mm", "m"), ("Painel fotovoltaico", "un"), ("Inversor", "un")]
+TIPOS_RECURSO = ["Mão de obra", "Materiais", "Equipamentos", "Serviços", "Impostos"]
+FUNCOES = ["Pedreiro", "Eletricista", "Engenheiro", "Mestre de obras", "Servente", "Instalador solar"]
+
+# --------------------------------------------------------------------------
+# --- GERAÇÃO DOS DADOS ---
+# --------------------------------------------------------------------------
+
+def criar_projeto(referencia: date):
     """Cria um dicionário com dados de um projeto fictício."""
-    data_inicio = fake.date_between(start_date='-2y', end_date='-1y')
+    data_inicio = fake.date_between_dates(referencia - timedelta(days=730), referencia - timedelta(days=365))
     duracao_dias = random.randint(180, 730)
     data_fim = data_inicio + timedelta(days=duracao_dias)
 
@@ -28,16 +61,17 @@ def criar_projeto():
     }
     return projeto_data
 
-def criar_tarefas_para_projeto(projeto_id: int):
-    """Cria um número aleatório de tarefas para um dado projeto_id."""
-    num_tarefas = random.randint(5, 20) # Cada projeto terá de 5 a 20 tarefas
-    print(f"    - Criando {num_tarefas} tarefas...")
+def criar_tarefas_para_projeto(projeto_id: int, referencia: date, minimo: int = 5, maximo: int = 20):
+    """Gera de `minimo` a `maximo` tarefas para um dado projeto_id (enviadas depois, em lote)."""
+    num_tarefas = random.randint(minimo, maximo)
+    tarefas = []
+    base = datetime.combine(referencia, datetime.min.time())
 
     for _ in range(num_tarefas):
         dias_inicio = random.randint(1, 180)
         duracao_prevista_dias = random.randint(3, 30)
 
-        data_inicio_prevista = datetime.now() + timedelta(days=dias_inicio)
+        data_inicio_prevista = base + timedelta(days=dias_inicio)
         data_fim_prevista = data_inicio_prevista + timedelta(days=duracao_prevista_dias)
 
         # LÓGICA PARA SIMULAR ATRASOS (Ouro para a IA)
@@ -63,41 +97,281 @@ def criar_tarefas_para_projeto(projeto_id: int):
             "DataFimReal": data_fim_real.isoformat(),
             "Status": status_final
         }
-        
-        # Faz a requisição POST para o endpoint de tarefas da nossa API
-        response = requests.post(f"{API_URL}/tarefas/", json=tarefa_data)
-        if response.status_code != 201:
-            print(f"      ! Erro ao criar tarefa. Status: {response.status_code}, Resposta: {response.text}")
-
-
-def popular_banco(num_projetos=10):
-    """Função principal que cria projetos e suas tarefas via API."""
-    print(f"Iniciando a criação de {num_projetos} projetos e suas tarefas...")
-
-    for i in range(num_projetos):
-        novo_projeto = criar_projeto()
-        
-        try:
-            response = requests.post(f"{API_URL}/projetos/", json=novo_projeto)
-            
-            if response.status_code == 201:
-                projeto_criado = response.json()
-                print(f"  > Projeto '{projeto_criado['Nome']}' (ID: {projeto_criado['ProjetoID']}) criado.")
-                
-                # CHAMA A FUNÇÃO PARA CRIAR TAREFAS PARA O PROJETO RECÉM-CRIADO
-                criar_tarefas_para_projeto(projeto_criado['ProjetoID'])
-            else:
-                print(f"  ! Erro ao criar projeto. Status: {response.status_code}, Resposta: {response.text}")
-
-        except requests.exceptions.ConnectionError as e:
-            print("\nERRO DE CONEXÃO: A API não parece estar rodando.")
-            print("Por favor, inicie o servidor com: uvicorn app.main:app --reload")
-            break
-
-    print("\nCriação de dados concluída.")
+        tarefas.append(tarefa_data)
+    return tarefas
+
+
+def criar_materiais_para_projeto(projeto_id: int, maximo: int = 6):
+    """Gera de 2 a `maximo` materiais para o projeto, alguns com estoque abaixo do necessário."""
+    materiais = []
+    for nome, unidade in random.sample(MATERIAIS, random.randint(min(2, maximo), min(maximo, len(MATERIAIS)))):
+        necessaria = random.randint(10, 500)
+        materiais.append({
+            "ProjetoID": projeto_id,
+            "NomeMaterial": nome,
+            "QuantidadeNecessaria": necessaria,
+            "QuantidadeEmEstoque": random.randint(0, int(necessaria * 1.2)),
+            "Unidade": unidade
+        })
+    return materiais
+
+
+def criar_recursos_para_projeto(projeto_id: int, data_inicio: str, maximo: int = 8):
+    """Gera de 3 a `maximo` lançamentos financeiros a partir do início do projeto."""
+    inicio = datetime.strptime(data_inicio, "%Y-%m-%d")
+    return [{
+        "ProjetoID": projeto_id,
+        "Tipo": random.choice(TIPOS_RECURSO),
+        "Descricao": fake.sentence(nb_words=4),
+        "Valor": round(random.uniform(1_000, 250_000), 2),
+        "Data": (inicio + timedelta(days=random.randint(0, 365))).strftime("%Y-%m-%d")
+    } for _ in range(random.randint(min(3, maximo), maximo))]
+
+
+def criar_funcionario():
+    return {"NomeCompleto": fake.name(), "Funcao": random.choice(FUNCOES), "Status": "Ativo"}
+
+
+def criar_alocacoes(projetos: list, projeto_ids: list, funcionario_ids: list, por_projeto: int):
+    """
+    Aloca até `por_projeto` funcionários em cada projeto, durante todo o projeto, sem
+    alocar o mesmo funcionário em dois projetos ao mesmo tempo.
+    """
+    periodos = {funcionario_id: [] for funcionario_id in funcionario_ids}
+    alocacoes = []
+    for projeto, projeto_id in zip(projetos, projeto_ids):
+        inicio, fim = projeto["DataInicio"], projeto["DataPrevistaFim"]
+        candidatos = random.sample(funcionario_ids, min(len(funcionario_ids), por_projeto * 3))
+        escolhidos = 0
+        for funcionario_id in candidatos:
+            if escolhidos == por_projeto:
+                break
+            # Datas ISO comparam como texto
+            if any(inicio <= outro_fim and outro_inicio <= fim for outro_inicio, outro_fim in periodos[funcionario_id]):
+                continue
+            periodos[funcionario_id].append((inicio, fim))
+            alocacoes.append({"FuncionarioID": funcionario_id, "ProjetoID": projeto_id,
+                              "DataInicioAlocacao": inicio, "DataFimAlocacao": fim})
+            escolhidos += 1
+    return alocacoes
+
+# --------------------------------------------------------------------------
+# --- PROGRESSO ---
+# --------------------------------------------------------------------------
+
+class Progresso:
+    """Linhas enviadas de um tipo de dado, com a vazão, atualizadas no máximo a cada `intervalo` segundos."""
+
+    def __init__(self, nome: str, total: int, intervalo: float = 1.0):
+        self.nome = nome
+        self.total = total
+        self.intervalo = intervalo
+        self.feitas = 0
+        self.erros = 0
+        self.inicio = time.perf_counter()
+        self._ultima_impressao = self.inicio
+
+    def avancar(self, linhas: int):
+        self.feitas += linhas
+        agora = time.perf_counter()
+        if agora - self._ultima_impressao >= self.intervalo:
+            self._ultima_impressao = agora
+            self._imprimir(agora, fim="\r")
+
+    def _imprimir(self, agora: float, fim: str):
+        duracao = max(agora - self.inicio, 1e-9)
+        percentual = self.feitas / self.total if self.total else 1.0
+        print(f"  {self.nome:<20} {self.feitas:>9,}/{self.total:<9,} ({percentual:4.0%}) "
+              f"{self.feitas / duracao:>10,.0f} linhas/s", end=fim, flush=True)
+
+    def concluir(self) -> dict:
+        agora = time.perf_counter()
+        self._imprimir(agora, fim="\n")
+        duracao = agora - self.inicio
+        return {"linhas": self.feitas, "erros": self.erros, "segundos": duracao, "linhas_por_s": self.feitas / max(duracao, 1e-9)}
+
+# --------------------------------------------------------------------------
+# --- DESTINOS: API (httpx assíncrono) OU BANCO DIRETO ---
+# --------------------------------------------------------------------------
+
+class DestinoAPI:
+    """Envia pela API, com no máximo `concorrencia` requisições em andamento."""
+
+    ROTAS_LOTE = {"projetos": "/projetos/bulk", "tarefas": "/tarefas/bulk", "materiais": "/materiais/bulk",
+                  "recursos": "/recursos_financeiros/bulk", "funcionarios": "/funcionarios/bulk"}
+
+    def __init__(self, url: str, concorrencia: int, timeout: float):
+        self._semaforo = asyncio.Semaphore(concorrencia)
+        limites = httpx.Limits(max_connections=concorrencia, max_keepalive_connections=concorrencia)
+        self.cliente = httpx.AsyncClient(base_url=url, limits=limites, timeout=timeout)
+
+    async def inserir(self, tipo: str, itens: list, progresso: Progresso) -> list:
+        """Envia em lotes de ITENS_POR_REQUISICAO, em paralelo. Devolve os IDs na ordem dos itens (None nos lotes com erro)."""
+        async def enviar(lote: list) -> list:
+            async with self._semaforo:
+                resposta = await self.cliente.post(self.ROTAS_LOTE[tipo], json=lote)
+            if resposta.status_code != 201:
+                print(f"\n  ! Erro no lote de {tipo}. Status: {resposta.status_code}, Resposta: {resposta.text[:300]}")
+                progresso.erros += len(lote)
+                return [None] * len(lote)
+            progresso.avancar(len(lote))
+            return resposta.json()["ids"]
+
+        lotes = [itens[i:i + ITENS_POR_REQUISICAO] for i in range(0, len(itens), ITENS_POR_REQUISICAO)]
+        return [id_ for ids in await asyncio.gather(*(enviar(lote) for lote in lotes)) for id_ in ids]
+
+    async def inserir_alocacoes(self, alocacoes: list, progresso: Progresso):
+        # Uma por requisição: o endpoint de alocação aplica as regras de negócio a cada uma
+        async def enviar(alocacao: dict):
+            async with self._semaforo:
+                resposta = await self.cliente.post("/alocacoes/", json=alocacao)
+            if resposta.status_code != 201:
+                progresso.erros += 1
+                return
+            progresso.avancar(1)
+
+        await asyncio.gather(*(enviar(alocacao) for alocacao in alocacoes))
+
+    async def fechar(self):
+        await self.cliente.aclose()
+
+
+class DestinoBanco:
+    """Grava direto no banco com a inserção em lote da API (uma transação por lote, uma de cada vez)."""
+
+    def __init__(self, caminho_sqlite: str | None):
+        # Só este modo depende do pacote da API (e do pyodbc ou do banco local)
+        from app import insercao, listagem, schemas
+
+        if caminho_sqlite:
+            from benchmarks import banco_local
+            self.db = banco_local.conectar(caminho_sqlite)
+        else:
+            import pyodbc
+            from app import config
+            self.db = pyodbc.connect(config.DATABASE_URL)
+        self._inserir_lote = insercao.inserir_lote
+        # Uma conexão só: os tipos enviados "em paralelo" se revezam nela
+        self._trava = asyncio.Lock()
+        self._tabelas = {
+            "projetos": (listagem.PROJETOS, schemas.ProjetoCreate),
+            "tarefas": (listagem.TAREFAS, schemas.TarefaCreate),
+            "materiais": (listagem.MATERIAIS, schemas.MaterialCreate),
+            "recursos": (listagem.RECURSOS_FINANCEIROS, schemas.RecursoFinanceiroCreate),
+            "funcionarios": (listagem.FUNCIONARIOS, schemas.FuncionarioCreate),
+            "alocacoes": (listagem.ALOCACOES, schemas.AlocacaoFuncionarioCreate),
+        }
+
+    async def inserir(self, tipo: str, itens: list, progresso: Progresso) -> list:
+        tabela, schema = self._tabelas[tipo]
+        ids = []
+        for i in range(0, len(itens), ITENS_POR_REQUISICAO):
+            # Validados pelos mesmos schemas da API (converte as datas ISO)
+            lote = [schema.model_validate(item) for item in itens[i:i + ITENS_POR_REQUISICAO]]
+            async with self._trava:
+                ids += await asyncio.to_thread(self._inserir_lote, self.db, tabela, lote, ITENS_POR_REQUISICAO)
+            progresso.avancar(len(lote))
+        return ids
+
+    async def inserir_alocacoes(self, alocacoes: list, progresso: Progresso):
+        await self.inserir("alocacoes", alocacoes, progresso)
+
+    async def fechar(self):
+        self.db.close()
+
+# --------------------------------------------------------------------------
+# --- EXECUÇÃO ---
+# --------------------------------------------------------------------------
+
+async def popular(args) -> dict:
+    """Gera e envia os dados na ordem das dependências (projetos -> dados dos projetos -> alocações)."""
+    random.seed(args.seed)
+    Faker.seed(args.seed)
+    referencia = date.fromisoformat(args.data_referencia)
+    destino = DestinoBanco(args.sqlite) if args.direto else DestinoAPI(args.url, args.concorrencia, args.timeout)
+    resumo = {}
+    try:
+        projetos = [criar_projeto(referencia) for _ in range(args.projetos)]
+        progresso = Progresso("projetos", len(projetos))
+        projeto_ids = await destino.inserir("projetos", projetos, progresso)
+        resumo["projetos"] = progresso.concluir()
+
+        # Só os projetos criados recebem dados; a geração continua sequencial (determinística)
+        criados = [(projeto, projeto_id) for projeto, projeto_id in zip(projetos, projeto_ids) if projeto_id is not None]
+        dados = {"tarefas": [], "materiais": [], "recursos": []}
+        for projeto, projeto_id in criados:
+            dados["tarefas"] += criar_tarefas_para_projeto(projeto_id, referencia, args.tarefas_min, args.tarefas_max)
+            dados["materiais"] += criar_materiais_para_projeto(projeto_id, args.materiais_max)
+            dados["recursos"] += criar_recursos_para_projeto(projeto_id, projeto["DataInicio"], args.recursos_max)
+
+        # Os três tipos disputam o mesmo limite de concorrência
+        progressos = {tipo: Progresso(tipo, len(itens)) for tipo, itens in dados.items()}
+        await asyncio.gather(*(destino.inserir(tipo, itens, progressos[tipo]) for tipo, itens in dados.items()))
+        print()
+        for tipo, progresso in progressos.items():
+            resumo[tipo] = progresso.concluir()
+
+        if args.funcionarios:
+            funcionarios = [criar_funcionario() for _ in range(args.funcionarios)]
+            progresso = Progresso("funcionarios", len(funcionarios))
+            funcionario_ids = [id_ for id_ in await destino.inserir("funcionarios", funcionarios, progresso) if id_ is not None]
+            resumo["funcionarios"] = progresso.concluir()
+
+            alocacoes = criar_alocacoes([p for p, _ in criados], [i for _, i in criados], funcionario_ids, args.alocacoes_por_projeto)
+            progresso = Progresso("alocacoes", len(alocacoes))
+            await destino.inserir_alocacoes(alocacoes, progresso)
+            resumo["alocacoes"] = progresso.concluir()
+    finally:
+        await destino.fechar()
+    return resumo
+
+
+def popular_banco(num_projetos=10, **opcoes):
+    """Atalho para uso a partir do Python, com os mesmos padrões da linha de comando."""
+    args = criar_parser().parse_args([])
+    args.projetos = num_projetos
+    for nome, valor in opcoes.items():
+        setattr(args, nome, valor)
+    return executar(args)
+
+
+def executar(args) -> dict:
+    modo = "direto no banco" + (f" (SQLite {args.sqlite})" if args.sqlite else "") if args.direto else f"pela API em {args.url}"
+    print(f"Iniciando a criação de {args.projetos} projetos e seus dados ({modo}, seed {args.seed})...")
+    inicio = time.perf_counter()
+    try:
+        resumo = asyncio.run(popular(args))
+    except httpx.ConnectError:
+        print("\nERRO DE CONEXÃO: A API não parece estar rodando.")
+        print("Por favor, inicie o servidor com: uvicorn app.main:app --reload")
+        sys.exit(1)
+
+    duracao = time.perf_counter() - inicio
+    total = sum(tipo["linhas"] for tipo in resumo.values())
+    erros = sum(tipo["erros"] for tipo in resumo.values())
+    print(f"\nCriação de dados concluída: {total:,} linhas em {duracao:.1f} s ({total / max(duracao, 1e-9):,.0f} linhas/s), {erros} com erro.")
+    return resumo
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Gera dados fictícios (determinísticos) para a API SolarysAI.")
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--projetos", type=int, default=700)
+    parser.add_argument("--tarefas-min", type=int, default=5, help="Mínimo de tarefas por projeto.")
+    parser.add_argument("--tarefas-max", type=int, default=20, help="Máximo de tarefas por projeto.")
+    parser.add_argument("--materiais-max", type=int, default=6, help="Máximo de materiais por projeto.")
+    parser.add_argument("--recursos-max", type=int, default=8, help="Máximo de lançamentos financeiros por projeto.")
+    parser.add_argument("--funcionarios", type=int, default=300)
+    parser.add_argument("--alocacoes-por-projeto", type=int, default=3)
+    parser.add_argument("--concorrencia", type=int, default=8, help="Requisições simultâneas no modo API.")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-referencia", default="2025-06-01", help="Data base das datas geradas (AAAA-MM-DD).")
+    parser.add_argument("--direto", action="store_true", help="Grava direto no banco, sem passar pela API.")
+    parser.add_argument("--sqlite", help="Com --direto: caminho do banco local SQLite em vez do DATABASE_URL.")
+    return parser
+
 
 # --- Ponto de Entrada do Script ---
 if __name__ == "__main__":
-    # Agora podemos definir um número maior de uma vez!
-    # Vamos começar com 50 projetos para gerar um bom volume de tarefas.
-    popular_banco(num_projetos=700)
\ No newline at end of file
+    executar(criar_parser().parse_args())
@@ -0,0 +1,18 @@
+-- Arquivo: solarys_api/sql/001_indices_listagem.sql
+-- Índices usados pelas listagens paginadas (app/listagem.py).
+-- A paginação por cursor já usa a chave primária (ID); estes índices cobrem o filtro
+-- por ProjetoID (listas por projeto) e os filtros opcionais de status e de data.
+
+CREATE INDEX IX_Projetos_Status ON Projetos (Status, ProjetoID);
+CREATE INDEX IX_Projetos_DataInicio ON Projetos (DataInicio, ProjetoID);
+
+CREATE INDEX IX_Tarefas_ProjetoID ON Tarefas (ProjetoID, TarefaID);
+CREATE INDEX IX_Tarefas_Status ON Tarefas (Status, TarefaID);
+CREATE INDEX IX_Tarefas_DataInicioPrevista ON Tarefas (DataInicioPrevista, TarefaID);
+
+CREATE INDEX IX_RecursosFinanceiros_ProjetoID ON RecursosFinanceiros (ProjetoID, RecursoFinanceiroID);
+CREATE INDEX IX_Materiais_ProjetoID ON Materiais (ProjetoID, MaterialID);
+
+CREATE INDEX IX_Funcionarios_Status ON Funcionarios (Status, FuncionarioID);
+
+CREATE INDEX IX_AlocacaoFuncionarios_ProjetoID ON AlocacaoFuncionarios (ProjetoID, AlocacaoID);
@@ -0,0 +1,9 @@
+-- Arquivo: solarys_api/sql/002_indices_resumo.sql
+-- Índices de cobertura para o resumo de projetos (app/resumo.py): os agregados por
+-- projeto leem só estas colunas, então o SQL Server resolve cada SELECT do lote pelo
+-- índice, sem ir à tabela (key lookup) linha a linha.
+
+CREATE INDEX IX_Tarefas_ProjetoID_Resumo ON Tarefas (ProjetoID, Status) INCLUDE (DataFimPrevista, DataFimReal);
+CREATE INDEX IX_RecursosFinanceiros_ProjetoID_Tipo ON RecursosFinanceiros (ProjetoID, Tipo) INCLUDE (Valor);
+CREATE INDEX IX_Materiais_ProjetoID_Resumo ON Materiais (ProjetoID) INCLUDE (QuantidadeNecessaria, QuantidadeEmEstoque, NomeMaterial, Unidade);
+CREATE INDEX IX_AlocacaoFuncionarios_ProjetoID_Periodo ON AlocacaoFuncionarios (ProjetoID, DataInicioAlocacao) INCLUDE (DataFimAlocacao, FuncionarioID);
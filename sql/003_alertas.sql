@@ -0,0 +1,56 @@
+-- Arquivo: solarys_api/sql/003_alertas.sql
+-- Estrutura do motor de alertas (app/alertas.py):
+--   - Tarefas.VersaoLinha (rowversion): muda a cada INSERT/UPDATE da tarefa e permite ler
+--     só o que mudou desde a última execução, pelo índice, sem varrer a tabela.
+--   - AlertasAI / SugestoesAI: criadas se ainda não existirem; TarefaID e
+--     ProbabilidadeAtraso são acrescentadas se a tabela já existir sem elas.
+--   - MarcasProcessamento: a última VersaoLinha processada por cada processo.
+
+IF COL_LENGTH('Tarefas', 'VersaoLinha') IS NULL
+    ALTER TABLE Tarefas ADD VersaoLinha ROWVERSION;
+GO
+CREATE INDEX IX_Tarefas_VersaoLinha ON Tarefas (VersaoLinha);
+GO
+
+IF OBJECT_ID('AlertasAI', 'U') IS NULL
+    CREATE TABLE AlertasAI (
+        AlertaID INT IDENTITY(1,1) PRIMARY KEY,
+        ProjetoID INT NOT NULL REFERENCES Projetos(ProjetoID),
+        TarefaID INT NULL REFERENCES Tarefas(TarefaID),
+        TipoAlerta NVARCHAR(100) NOT NULL,
+        DescricaoAlerta NVARCHAR(MAX) NOT NULL,
+        NivelSeveridade NVARCHAR(20) NOT NULL,
+        Status NVARCHAR(20) NOT NULL,
+        ProbabilidadeAtraso FLOAT NULL,
+        DataGeracao DATETIME2 NOT NULL DEFAULT SYSDATETIME()
+    );
+GO
+IF COL_LENGTH('AlertasAI', 'TarefaID') IS NULL
+    ALTER TABLE AlertasAI ADD TarefaID INT NULL REFERENCES Tarefas(TarefaID);
+IF COL_LENGTH('AlertasAI', 'ProbabilidadeAtraso') IS NULL
+    ALTER TABLE AlertasAI ADD ProbabilidadeAtraso FLOAT NULL;
+GO
+-- Listagem por projeto (GET /projetos/{id}/alertas) e resolução dos abertos de cada tarefa
+CREATE INDEX IX_AlertasAI_ProjetoID ON AlertasAI (ProjetoID, AlertaID) INCLUDE (Status);
+CREATE INDEX IX_AlertasAI_TarefaID_Abertos ON AlertasAI (TarefaID) WHERE Status = 'Aberto';
+GO
+
+IF OBJECT_ID('SugestoesAI', 'U') IS NULL
+    CREATE TABLE SugestoesAI (
+        SugestaoID INT IDENTITY(1,1) PRIMARY KEY,
+        AlertaID INT NOT NULL REFERENCES AlertasAI(AlertaID),
+        DescricaoSugestao NVARCHAR(MAX) NOT NULL,
+        ImpactoEstimado NVARCHAR(50) NULL,
+        StatusAprovacao NVARCHAR(20) NOT NULL DEFAULT 'Pendente'
+    );
+GO
+CREATE INDEX IX_SugestoesAI_AlertaID ON SugestoesAI (AlertaID);
+GO
+
+IF OBJECT_ID('MarcasProcessamento', 'U') IS NULL
+    CREATE TABLE MarcasProcessamento (
+        Processo NVARCHAR(100) NOT NULL PRIMARY KEY,
+        Marca BIGINT NOT NULL,
+        AtualizadoEm DATETIME2 NOT NULL
+    );
+GO
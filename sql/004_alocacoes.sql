@@ -0,0 +1,9 @@
+-- Arquivo: solarys_api/sql/004_alocacoes.sql
+-- Verificação de conflitos de alocação (app/alocacoes.py): a cada escrita os períodos do
+-- funcionário são relidos com UPDLOCK/HOLDLOCK. Com este índice a leitura (e a trava de
+-- intervalo de chaves) fica restrita às linhas do funcionário, sem varrer a tabela.
+
+CREATE INDEX IX_AlocacaoFuncionarios_FuncionarioID
+    ON AlocacaoFuncionarios (FuncionarioID, DataInicioAlocacao)
+    INCLUDE (DataFimAlocacao, ProjetoID);
+GO